@@ -0,0 +1,15 @@
+from typing import Any, Tuple
+import pytest
+
+from frc.batch import BatchFlockers # pylint: disable=import-error
+
+STEPS = 20
+
+@pytest.mark.parametrize("matches", [1, 16, 256])
+def test_batch_step(benchmark: Any, matches: int) -> None:
+    """ compare the time per match with test_step[22] in bench_model """
+    def setup() -> Tuple[Tuple[BatchFlockers], dict]:
+        return (BatchFlockers(matches, seed=0),), {}
+    def run(batch: BatchFlockers) -> None:
+        batch.run(STEPS)
+    benchmark.pedantic(run, setup=setup, rounds=5)
@@ -0,0 +1,17 @@
+from typing import Any
+import pytest
+
+from frc import collision, kernels # pylint: disable=import-error
+
+@pytest.mark.parametrize("module", [collision, kernels], ids=["numpy", "kernels"])
+def test_collide(benchmark: Any, module: Any) -> None:
+    """ one ball-ball contact, velocity and position """
+    def contact() -> None:
+        module.collide((0.0, 0.0, 0.1), (1.0, 0.2, 0.0), 0.27, 0.5,
+                       (0.2, 0.1, 0.1), (-1.0, 0.0, 0.0), 0.27, 0.5)
+        module.collide_pos((0.0, 0.0, 0.1), 0.27, 0.12, (0.2, 0.1, 0.1), 0.27, 0.12)
+    benchmark(contact)
+
+@pytest.mark.parametrize("module", [collision, kernels], ids=["numpy", "kernels"])
+def test_overlap(benchmark: Any, module: Any) -> None:
+    benchmark(module.overlap, (0.0, 0.0, 0.1), (0.2, 0.1, 0.1), 0.12, 0.12)
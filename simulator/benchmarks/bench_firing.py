@@ -0,0 +1,30 @@
+import random
+from typing import Any
+import numpy as np
+import pytest
+
+import sweep # pylint: disable=import-error
+import trajectory # pylint: disable=import-error
+
+@pytest.mark.parametrize("target_range_m", [2, 4, 8])
+def test_trajectory(benchmark: Any, target_range_m: float) -> None:
+    """ one shot """
+    outcome, _, _ = benchmark(trajectory.run, target_range_m, 9, 60, False)
+    assert outcome in ("hit", "miss")
+
+@pytest.mark.parametrize("target_range_m", [2, 4, 8])
+def test_shoot(benchmark: Any, target_range_m: float) -> None:
+    """ one shot with the kernel, compiled if numba is there """
+    trajectory.shoot(target_range_m, 9, 60, 0.5) # compile first
+    hit, _ = benchmark(trajectory.shoot, target_range_m, 9, 60, 0.5)
+    assert hit in (True, False)
+
+@pytest.mark.parametrize("fast", [False, True], ids=["run", "shoot"])
+def test_sweep_cell(benchmark: Any, fast: bool) -> None:
+    """ one velocity and elevation, a hundred tries """
+    def cell() -> float:
+        np.random.seed(0)
+        random.seed(0)
+        p_hit, _ = sweep.sweep_cell(4, 9, 60, 0.01, 0.02, fast=fast)
+        return p_hit
+    assert 0 <= benchmark(cell) <= 1
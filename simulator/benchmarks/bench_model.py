@@ -0,0 +1,16 @@
+from typing import Any, Tuple
+import pytest
+
+from frc.model import RobotFlockers # pylint: disable=import-error
+
+STEPS = 20
+
+@pytest.mark.parametrize("cargo", [22, 100, 500])
+def test_step(benchmark: Any, cargo: int) -> None:
+    """ a fresh field each round, so every round runs the same steps """
+    def setup() -> Tuple[Tuple[RobotFlockers], dict]:
+        return (RobotFlockers(seed=0, cargo_per_alliance=cargo // 2),), {}
+    def run(model: RobotFlockers) -> None:
+        for _ in range(STEPS):
+            model.step()
+    benchmark.pedantic(run, setup=setup, rounds=5)
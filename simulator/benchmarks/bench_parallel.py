@@ -0,0 +1,22 @@
+from typing import Any, Tuple
+import pytest
+
+from frc.model import RobotFlockers # pylint: disable=import-error
+from frc.parallel import ParallelFlockers # pylint: disable=import-error
+
+STEPS = 20
+# laying out a big field takes a while, and it isn't changed by running
+MODEL = RobotFlockers(seed=0, cargo_per_alliance=250)
+
+@pytest.mark.parametrize("strips,processes", [(1, False), (4, False), (4, True)])
+def test_parallel_step(benchmark: Any, strips: int, processes: bool) -> None:
+    """ 500 balls, compare test_step[500] in bench_model """
+    fields = []
+    def setup() -> Tuple[Tuple[ParallelFlockers], dict]:
+        fields.append(ParallelFlockers(strips, seed=0, processes=processes, model=MODEL))
+        return (fields[-1],), {}
+    def run(field: ParallelFlockers) -> None:
+        field.run(STEPS)
+    benchmark.pedantic(run, setup=setup, rounds=3)
+    for field in fields:
+        field.close()
@@ -0,0 +1,25 @@
+from typing import Any
+import random
+import pytest
+
+from frc.model import RobotFlockers # pylint: disable=import-error
+from frc.placement import DiskPlacer # pylint: disable=import-error
+
+@pytest.mark.parametrize("cargo", [11, 250, 400])
+def test_make_agents(benchmark: Any, cargo: int) -> None:
+    """ nearly full at 400 """
+    model = RobotFlockers(seed=0, cargo_per_alliance=0)
+    def place() -> None:
+        placer = model.placer()
+        for _ in range(2 * cargo):
+            placer.place((1, 1, 15.46, 7.23), 0.12)
+    benchmark(place)
+
+@pytest.mark.parametrize("n", [1000, 5000])
+def test_place(benchmark: Any, n: int) -> None:
+    """ thousands of balls on a field big enough for them """
+    def place() -> None:
+        placer = DiskPlacer(random.Random(0))
+        for _ in range(n):
+            placer.place((0, 0, 40, 40), 0.12)
+    benchmark(place)
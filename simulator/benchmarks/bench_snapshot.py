@@ -0,0 +1,25 @@
+from typing import Any
+import pytest
+
+from frc.model import RobotFlockers # pylint: disable=import-error
+
+@pytest.mark.parametrize("cargo", [11, 250])
+def test_new(benchmark: Any, cargo: int) -> None:
+    """ starting over, to compare with the ones below """
+    benchmark(RobotFlockers, seed=0, cargo_per_alliance=cargo)
+
+@pytest.mark.parametrize("cargo", [11, 250])
+def test_restore(benchmark: Any, cargo: int) -> None:
+    model = RobotFlockers(seed=0, cargo_per_alliance=cargo)
+    for _ in range(20):
+        model.step()
+    snapshot = model.snapshot()
+    benchmark(model.restore, snapshot)
+
+@pytest.mark.parametrize("cargo", [11, 250])
+def test_fork(benchmark: Any, cargo: int) -> None:
+    model = RobotFlockers(seed=0, cargo_per_alliance=cargo)
+    for _ in range(20):
+        model.step()
+    snapshot = model.snapshot()
+    benchmark(model.fork, snapshot)
@@ -0,0 +1,47 @@
+from typing import Any, List
+import numpy as np
+import pytest
+
+from frc.space import LimitlessContinuous3dSpace # pylint: disable=import-error
+
+# the field
+X_MAX_M = 16.46
+Y_MAX_M = 8.23
+
+class MockAgent:
+    def __init__(self, unique_id: int) -> None:
+        self.unique_id = unique_id
+        self.pos: Any = None
+
+def make_space(n: int) -> LimitlessContinuous3dSpace:
+    rng = np.random.default_rng(0)
+    space = LimitlessContinuous3dSpace()
+    for i in range(n):
+        space.place_agent(MockAgent(i), (rng.uniform(0, X_MAX_M), rng.uniform(0, Y_MAX_M), 0))
+    return space
+
+@pytest.mark.parametrize("n", [50, 200, 1000])
+def test_get_neighbors(benchmark: Any, n: int) -> None:
+    space = make_space(n)
+    rng = np.random.default_rng(1)
+    centers = [(rng.uniform(0, X_MAX_M), rng.uniform(0, Y_MAX_M), 0) for _ in range(100)]
+    def query() -> int:
+        found = 0
+        for center in centers:
+            found += len(space.get_neighbors(center, 1.0, False))
+        return found
+    assert benchmark(query) > 0
+
+@pytest.mark.parametrize("n", [50, 200, 1000])
+def test_remove_agent_churn(benchmark: Any, n: int) -> None:
+    """ take out and put back a tenth of the agents, like cargo going through the delays """
+    space = make_space(n)
+    agents: List[Any] = list(space._agent_to_index) # pylint: disable=protected-access
+    churn = agents[::10]
+    def remove_and_place() -> None:
+        for agent in churn:
+            pos = agent.pos
+            space.remove_agent(agent)
+            space.place_agent(agent, pos)
+    benchmark(remove_and_place)
+    assert n == len(space._agent_to_index) # pylint: disable=protected-access
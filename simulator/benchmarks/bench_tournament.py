@@ -0,0 +1,23 @@
+import random
+from typing import Any, List
+
+from frc.tournament import Player, Rung, Tournament # pylint: disable=import-error
+
+# SVL2019 had 59 teams and 89 quals
+TEAMS = 59
+MATCHES = 89
+
+def regional(seed: int) -> List[int]:
+    """ play all the quals, one model each, like tournament.run does in parallel """
+    random.seed(seed)
+    teams = [Player(i, None, i/TEAMS, random.choice(list(Rung))) for i in range(TEAMS)]
+    scores: List[int] = []
+    for _ in range(MATCHES):
+        model = Tournament(tuple(random.sample(teams, 6)))
+        while model.running:
+            model.step()
+        scores.append(model.red_score() - model.blue_score())
+    return scores
+
+def test_regional(benchmark: Any) -> None:
+    assert MATCHES == len(benchmark(regional, 0))
@@ -0,0 +1,8 @@
+""" shared setup for the benchmarks, see run.py """
+import os
+import sys
+
+SIMULATOR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SIMULATOR)
+# the firing models are scripts, not a package
+sys.path.insert(0, os.path.join(SIMULATOR, "firing_models"))
@@ -0,0 +1,34 @@
+""" run the benchmarks from the simulator directory, and compare with the last run.
+
+    $ python3 benchmarks/run.py            # compare with the saved baseline, fail if slower
+    $ python3 benchmarks/run.py --baseline # save a new baseline
+    $ python3 benchmarks/run.py -k step    # other pytest arguments pass through
+
+results are kept in benchmarks/.results; a run fails if any mean is more than
+THRESHOLD slower than the baseline.
+"""
+import glob
+import os
+import sys
+import pytest
+
+THRESHOLD = "mean:20%"
+HERE = os.path.dirname(os.path.abspath(__file__))
+STORAGE = os.path.join(HERE, ".results")
+
+def main(args: list) -> int:
+    common = ["-o", "python_files=bench_*.py", "-p", "no:cacheprovider",
+              f"--benchmark-storage={STORAGE}", "--benchmark-columns=min,mean,stddev,rounds",
+              "--benchmark-sort=fullname", HERE]
+    if "--baseline" in args:
+        args.remove("--baseline")
+        return int(pytest.main(common + ["--benchmark-save=baseline"] + args))
+    baselines = sorted(glob.glob(os.path.join(STORAGE, "*", "*_baseline.json")))
+    if not baselines:
+        print("no baseline yet, saving one")
+        return int(pytest.main(common + ["--benchmark-save=baseline"] + args))
+    return int(pytest.main(common + [f"--benchmark-compare={baselines[-1]}",
+                                     f"--benchmark-compare-fail={THRESHOLD}"] + args))
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
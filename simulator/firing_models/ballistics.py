@@ -0,0 +1,36 @@
+""" drag and gravity on balls in flight, any number at once, in 3d with z up.
+
+the same integration as trajectory.fly(): the drag is against the velocity, in
+proportion to the speed squared, the velocity changes first, and then the position
+moves by the new velocity.  the sweep uses fly() for a cell's tries all together
+(see trajectory.shoot_all()), and the field simulation uses accelerate() for the
+airborne cargo, all of it, once a tick.
+"""
+from typing import Union
+import numpy as np
+from numpy.typing import NDArray
+
+try:
+    from . import constants # as firing_models.ballistics, from the simulator
+except ImportError:
+    import constants # as a script, from here
+
+# drag deceleration per speed squared, 1/m
+DRAG_PER_M: float = constants.DRAG_CONSTANT / constants.MASS_KG
+
+def accelerate(vel: NDArray[np.float64], dt: Union[float, NDArray[np.float64]]) -> None:
+    """ one step of drag and gravity, in place
+
+        vel: (n, 3)
+        dt: one for all, or (n,)
+    """
+    dt = np.reshape(dt, (-1, 1)) if np.ndim(dt) else dt
+    speed = np.sqrt(np.sum(vel * vel, axis=1, keepdims=True))
+    vel -= DRAG_PER_M * speed * vel * dt
+    vel[:, 2:] += constants.G_M_S_S * dt
+
+def fly(pos: NDArray[np.float64], vel: NDArray[np.float64],
+        dt: Union[float, NDArray[np.float64]]) -> None:
+    """ one step of flight, in place; pos and vel are (n, 3) """
+    accelerate(vel, dt)
+    pos += vel * (np.reshape(dt, (-1, 1)) if np.ndim(dt) else dt)
@@ -1,5 +1,7 @@
+import functools
 import multiprocessing
-from typing import Any, List, Optional
+import sys
+from typing import Any, List, Optional, Tuple
 import numpy as np
 import pandas as pd # type:ignore
 import constants
@@ -12,16 +14,16 @@ MUZZLE_VELOCITY_MAX_M_S: float = 14
 GUN_ELEVATION_MIN_DEGREES: float = 35
 GUN_ELEVATION_MAX_DEGREES: float = 85
 
-def run_multi() -> List[dict]:
+def run_multi(fast: bool = False) -> List[dict]:
     # pylint: disable=consider-using-with
     # multi-processing
     range_range: List = list(np.arange(constants.TARGET_MIN_RANGE_M, constants.TARGET_MAX_RANGE_M, 0.5))
     p: Any = multiprocessing.Pool(processes=6, maxtasksperchild=100)
-    return p.imap_unordered(sweep_with_precision, range_range)
+    return p.imap_unordered(functools.partial(sweep_with_precision, fast=fast), range_range)
 
-def run_all() -> None:
+def run_all(fast: bool = False) -> None:
     bf: List[dict] = []
-    multi_bf: List[List[dict]] = run_multi()
+    multi_bf: List[List[dict]] = run_multi(fast)
     bf.extend([i for s in multi_bf for i in s])
     print("the results")
     print(bf)
@@ -29,7 +31,7 @@ def run_all() -> None:
     bff.to_csv('new_results.csv')
     print(bff.to_csv())
 
-def sweep_with_precision(target_range) -> List[dict]:
+def sweep_with_precision(target_range, fast: bool = False) -> List[dict]:
     """
         range_precision jitters the range estimate.
             it doesn't matter that much, the target is pretty big.  the optimal shot gets a little
@@ -49,13 +51,51 @@ def sweep_with_precision(target_range) -> List[dict]:
             for i in range(3): # a few points for training
                 print(f"try {i} sweep range {target_range} gun_precision {gun_precision} "
                       f"range_precision {range_precision}")
-                one_sweep: Optional[dict] = sweep_gun(target_range, gun_precision, range_precision)
+                one_sweep: Optional[dict] = sweep_gun(target_range, gun_precision, range_precision,
+                                                      fast)
                 if one_sweep is not None:
                     bf.append(one_sweep)
     return bf
 
-def sweep_gun(target_range_m:float, gun_precision:float, range_precision:float) -> dict:
+def sweep_cell(target_range_m:float, muzzle_velocity_m_s:float, gun_elevation_degrees:float,
+               gun_precision:float, range_precision:float, tries:int = 100,
+               fast: bool = False) -> Tuple[float, float]:
     """
+    one velocity and elevation in the sweep.
+    returns the hit rate and the arrival energy of the last try.
+    fast uses trajectory.shoot_all(), with the capture table, for all the tries at once,
+    instead of trajectory.run() for each.
+    """
+    if fast:
+        # same draws, in the same order, as trajectory.shoot() one at a time
+        draws = np.array([(np.random.normal(1.0, gun_precision),
+                           np.random.normal(1.0, gun_precision),
+                           np.random.normal(1.0, range_precision),
+                           np.random.random()) for _ in range(tries)]).reshape(tries, 4)
+        hit, energy = trajectory.shoot_all(target_range_m * draws[:, 2],
+                                           muzzle_velocity_m_s * draws[:, 0],
+                                           gun_elevation_degrees * draws[:, 1], draws[:, 3])
+        return float(np.mean(hit)), float(energy[-1])
+    hits = 0
+    energy_J: float = 0
+    for _ in range(tries):
+        actual_muzzle_velocity_m_s = muzzle_velocity_m_s * np.random.normal(1.0, gun_precision)
+        actual_gun_elevation_degrees = gun_elevation_degrees * np.random.normal(1.0, gun_precision)
+        actual_target_range_m = target_range_m * np.random.normal(1.0, range_precision)
+        outcome, energy_J, _ = trajectory.run(
+            actual_target_range_m,
+            actual_muzzle_velocity_m_s,
+            actual_gun_elevation_degrees,
+            False # don't return each trajectory
+        )
+        if outcome == "hit":
+            hits += 1
+    return hits/tries, energy_J
+
+def sweep_gun(target_range_m:float, gun_precision:float, range_precision:float,
+              fast: bool = False) -> dict:
+    """
+    fast: see sweep_cell()
     gun_precision: std dev of angle and velocity.  1% = best possible, 10% = unusable
     range_precision std dev of range measurement.  2% = best possible, 10% = unusable
     """
@@ -75,25 +115,13 @@ def sweep_gun(target_range_m:float, gun_precision:float, range_precision:float)
             #print(f"range {target_range_m} "
             #      f"velocity {muzzle_velocity_m_s} "
             #      f"elevation {gun_elevation_degrees}")
-            tries = 100
-            hits = 0
-            for i in range(tries):
-                actual_muzzle_velocity_m_s = muzzle_velocity_m_s * np.random.normal(1.0, gun_precision)
-                actual_gun_elevation_degrees = gun_elevation_degrees * np.random.normal(1.0, gun_precision)
-                actual_target_range_m = target_range_m * np.random.normal(1.0, range_precision)
-                outcome, energy_J, _ = trajectory.run(
-                    actual_target_range_m,
-                    actual_muzzle_velocity_m_s,
-                    actual_gun_elevation_degrees,
-                    False # don't return each trajectory
-                )
-                if outcome == "hit":
-                    hits += 1
-            if hits == 0:
+            p_hit, energy_J = sweep_cell(target_range_m, muzzle_velocity_m_s,
+                                         gun_elevation_degrees, gun_precision, range_precision,
+                                         fast=fast)
+            if p_hit == 0:
                 print("skip zero")
                 skip = 5
                 continue
-            p_hit = hits/tries
             print(f"range {target_range_m} velocity {muzzle_velocity_m_s} "
                   f"elevation {gun_elevation_degrees} arrival energy {energy_J:.2f} "
                   f"p(hit) {p_hit}")
@@ -122,4 +150,5 @@ if __name__ == '__main__':
     # main is required to avoid mp deadlock
     multiprocessing.freeze_support()
     multiprocessing.set_start_method('forkserver')
-    run_all()
+    # --fast for the compiled kernel and the capture table, see trajectory.shoot()
+    run_all('--fast' in sys.argv)
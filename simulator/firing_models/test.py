@@ -43,5 +43,40 @@ class TestTrajectory(unittest.TestCase):
         self.assertAlmostEqual(0.107, compute_capture_probability(19.0), 2)
         self.assertAlmostEqual(0.124, compute_capture_probability(20.0), 2)
 
+    def test_capture_table(self) -> None:
+        random.seed(0)
+        for energy in (0.0, 3.0, 4.0, 5.0, 10.0, 20.0):
+            self.assertAlmostEqual(compute_capture_probability(energy),
+                                   trajectory.interpolate_capture(energy), 1)
+        self.assertAlmostEqual(0.5, trajectory.interpolate_capture(5.0), 3)
+
+    def test_fly(self) -> None:
+        """ the kernel agrees with run(), and compiled or not it's the same """
+        rng = np.random.default_rng(0)
+        for _ in range(200):
+            target_range_m, v, el = rng.uniform(1, 8), rng.uniform(5, 14), rng.uniform(35, 85)
+            outcome, energy, _ = trajectory.run(target_range_m, v, el, False)
+            fly_outcome, fly_energy = trajectory.fly(target_range_m, v, el)
+            if outcome == "hit":
+                self.assertEqual(trajectory.TOP, fly_outcome)
+                self.assertAlmostEqual(energy, fly_energy, 5)
+            self.assertEqual((fly_outcome, fly_energy),
+                             trajectory.fly_jit(target_range_m, v, el))
+        self.assertEqual((True, trajectory.fly(4, 9, 60)[1]), trajectory.shoot(4, 9, 60, 0.0))
+
+    def test_shoot_all(self) -> None:
+        """ all at once, with the ballistics kernel, is the same as one at a time """
+        rng = np.random.default_rng(0)
+        n = 300
+        target_range_m = rng.uniform(1, 8, n)
+        v = rng.uniform(5, 14, n)
+        el = rng.uniform(35, 85, n)
+        u = rng.uniform(0, 1, n)
+        hit, energy = trajectory.shoot_all(target_range_m, v, el, u)
+        for i in range(n):
+            one_hit, one_energy = trajectory.shoot(target_range_m[i], v[i], el[i], u[i])
+            self.assertEqual(one_hit, hit[i])
+            self.assertAlmostEqual(one_energy, energy[i], 9)
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,9 +1,18 @@
 from typing import Any, Tuple
+import math
+import os
 import random
 import numpy as np
+from numpy.typing import NDArray
 import pandas as pd # type:ignore
+import ballistics
 import constants
 
+try:
+    from numba import njit # type:ignore
+except ImportError:
+    njit = None
+
 # simulate some ballistic paths to make a range-velocity-elevation guide
 
 # simulate one trajectory
@@ -89,3 +98,141 @@ def is_captured(energy_J: float) -> bool:
         if vertical_component_J < - BUCKET_POTENTIAL_WELL_J:
             return True
         return False
+
+# the same flight, as a kernel for the sweep: plain floats, no trajectory, compiled if
+# numba is installed (set FRC_NO_JIT to skip it).  the bounce model is replaced by a
+# table of the capture probability by energy, worked out below, so a shot takes one
+# uniform draw from the caller and comes out the same compiled or not.
+
+JIT: bool = njit is not None and not os.environ.get("FRC_NO_JIT")
+
+# what fly() says happened
+MISS = 0
+TOP = 1 # came down through the top of the target, so maybe captured
+
+def fly(target_range_m: float, muzzle_velocity_m_s: float,
+        gun_elevation_degrees: float) -> Tuple[int, float]:
+    """ like run(), without the bounce at the end; returns MISS or TOP, and the energy """
+    # pylint: disable=chained-comparison
+    dt_s: float = constants.BALL_RADIUS_M / (2 * muzzle_velocity_m_s) # keep steps fine enough
+    elevation_rad = math.pi * gun_elevation_degrees / 180
+    vx_m_s: float = muzzle_velocity_m_s * math.cos(elevation_rad)
+    vy_m_s: float = muzzle_velocity_m_s * math.sin(elevation_rad)
+    x_m: float = 0.0
+    y_m: float = constants.FIRING_HEIGHT_M
+    # drag over mass, times speed, is the deceleration per unit of velocity
+    k: float = constants.DRAG_CONSTANT / constants.MASS_KG
+    v_m_s: float = math.sqrt(vx_m_s * vx_m_s + vy_m_s * vy_m_s)
+    energy_J: float = 0.0
+    for _ in range(math.ceil(10 / dt_s)):
+        vx_m_s += - k * v_m_s * vx_m_s * dt_s
+        vy_m_s += - k * v_m_s * vy_m_s * dt_s
+        vy_m_s += constants.G_M_S_S * dt_s
+        dx_m: float = vx_m_s * dt_s
+        dy_m: float = vy_m_s * dt_s
+        if dx_m > constants.BALL_RADIUS_M or dy_m > constants.BALL_RADIUS_M:
+            raise ValueError("step too big")
+        x_m += dx_m
+        y_m += dy_m
+        v_m_s = math.sqrt(vx_m_s * vx_m_s + vy_m_s * vy_m_s)
+        energy_J = constants.MASS_KG * v_m_s * v_m_s / 2
+
+        if vy_m_s < 0 and y_m + constants.BALL_RADIUS_M < constants.TARGET_HEIGHT_M:
+            return MISS, energy_J
+        if y_m < 0:
+            return MISS, energy_J
+        if (x_m + constants.BALL_RADIUS_M > target_range_m - constants.TARGET_RADIUS_M and
+            x_m - constants.BALL_RADIUS_M < target_range_m + constants.TARGET_RADIUS_M and
+            y_m > constants.TARGET_HEIGHT_M - constants.BALL_RADIUS_M and
+            y_m < constants.TARGET_HEIGHT_M + constants.BALL_RADIUS_M and vy_m_s >= 0):
+            return MISS, energy_J
+        if (x_m - constants.BALL_RADIUS_M > target_range_m - constants.TARGET_RADIUS_M and
+            x_m + constants.BALL_RADIUS_M < target_range_m + constants.TARGET_RADIUS_M and
+            y_m > constants.TARGET_HEIGHT_M and
+            y_m < constants.TARGET_HEIGHT_M + constants.BALL_RADIUS_M and vy_m_s < 0):
+            return TOP, energy_J
+    return MISS, 0.0
+
+fly_jit = njit(cache=True)(fly) if JIT else fly
+
+def capture_probability(energy_J: float) -> float:
+    """ what is_captured() does, on average.  each bounce halves the energy, half of
+    them hit the wall and bounce again, and the rest stay in if the energy over the sine
+    of the angle is less than the well. """
+    total: float = 0
+    for k in range(1, 64):
+        s = energy_J / 2**k / -BUCKET_POTENTIAL_WELL_J
+        if s <= np.sqrt(0.5):
+            p = 1.0
+        elif s >= 1:
+            p = 0.0
+        else:
+            p = (np.pi - 2 * np.arcsin(s)) / (np.pi / 2)
+        total += p / 2**k
+    return total
+
+CAPTURE_TABLE_STEP_J: float = 0.01
+# faster than any shot
+CAPTURE_TABLE_MAX_J: float = 40
+CAPTURE_TABLE = np.array([capture_probability(e) for e in
+                          np.arange(0, CAPTURE_TABLE_MAX_J + CAPTURE_TABLE_STEP_J,
+                                    CAPTURE_TABLE_STEP_J)])
+
+def shoot(target_range_m: float, muzzle_velocity_m_s: float, gun_elevation_degrees: float,
+          u: float) -> Tuple[bool, float]:
+    """ one shot, given a uniform random number; returns hit or not, and the energy """
+    outcome, energy_J = fly_jit(target_range_m, muzzle_velocity_m_s, gun_elevation_degrees)
+    if outcome == MISS:
+        return False, energy_J
+    return u < interpolate_capture(energy_J), energy_J
+
+def interpolate_capture(energy_J: float) -> float:
+    i = min(energy_J / CAPTURE_TABLE_STEP_J, len(CAPTURE_TABLE) - 1)
+    k = min(int(i), len(CAPTURE_TABLE) - 2)
+    return float(CAPTURE_TABLE[k] + (i - k) * (CAPTURE_TABLE[k + 1] - CAPTURE_TABLE[k]))
+
+def shoot_all(target_range_m: NDArray[np.float64], muzzle_velocity_m_s: NDArray[np.float64],
+              gun_elevation_degrees: NDArray[np.float64],
+              u: NDArray[np.float64]) -> Tuple[NDArray[np.bool_], NDArray[np.float64]]:
+    """ shoot() for many shots at once, flown together with ballistics.fly() """
+    # pylint: disable=chained-comparison
+    n = len(target_range_m)
+    dt_s = constants.BALL_RADIUS_M / (2 * muzzle_velocity_m_s)
+    steps = np.ceil(10 / dt_s)
+    elevation_rad = np.pi * gun_elevation_degrees / 180
+    # x downrange, z up; the ones still flying, the rest are dropped as they finish
+    pos = np.zeros((n, 3))
+    pos[:, 2] = constants.FIRING_HEIGHT_M
+    vel = np.zeros((n, 3))
+    vel[:, 0] = muzzle_velocity_m_s * np.cos(elevation_rad)
+    vel[:, 2] = muzzle_velocity_m_s * np.sin(elevation_rad)
+    near = target_range_m - constants.TARGET_RADIUS_M + constants.BALL_RADIUS_M
+    far = target_range_m + constants.TARGET_RADIUS_M - constants.BALL_RADIUS_M
+    flying = np.arange(n)
+    top = np.zeros(n, dtype=bool)
+    energy_J = np.zeros(n)
+    step = 0
+    while len(flying):
+        ballistics.fly(pos, vel, dt_s)
+        if np.any(vel * dt_s[:, np.newaxis] > constants.BALL_RADIUS_M):
+            raise ValueError("step too big")
+        step += 1
+        x_m, y_m, vy_m_s = pos[:, 0], pos[:, 2], vel[:, 2]
+        low = y_m + constants.BALL_RADIUS_M < constants.TARGET_HEIGHT_M
+        level = ~low & (y_m < constants.TARGET_HEIGHT_M + constants.BALL_RADIUS_M)
+        up = vy_m_s >= 0
+        # see fly() for these
+        done = ((~up & low) | (y_m < 0)
+                | (level & up & (x_m > near - 2 * constants.BALL_RADIUS_M)
+                   & (x_m < far + 2 * constants.BALL_RADIUS_M)))
+        down = level & ~up & (y_m > constants.TARGET_HEIGHT_M) & (x_m > near) & (x_m < far)
+        done |= down
+        if np.any(done) or step >= steps.min():
+            top[flying[down]] = True
+            energy_J[flying[done]] = constants.MASS_KG * np.sum(vel[done] ** 2, axis=1) / 2
+            keep = ~done & (step < steps)
+            flying, pos, vel, dt_s, steps = (flying[keep], pos[keep], vel[keep], dt_s[keep],
+                                             steps[keep])
+            near, far = near[keep], far[keep]
+    capture = np.array([interpolate_capture(e) for e in energy_J])
+    return top & (u < capture), energy_J
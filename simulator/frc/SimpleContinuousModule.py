@@ -1,6 +1,7 @@
-from typing import Any, Callable, Dict, List
+from typing import Any, Callable, Dict
 from mesa import Agent, Model # type: ignore
 from mesa.visualization.ModularVisualization import VisualizationElement # type: ignore
+from .frames import FrameEncoder
 
 class SimpleCanvas(VisualizationElement): # type:ignore
     local_includes = ["frc/simple_continuous_canvas.js"]
@@ -13,16 +14,12 @@ class SimpleCanvas(VisualizationElement): # type:ignore
         self._portrayal_method = portrayal_method
         self.canvas_height = canvas_height
         self.canvas_width = canvas_width
+        self.frames = FrameEncoder(portrayal_method, ("x", "y"))
         self.js_code = (
             "import {Simple_Continuous_Module} from './local/frc/simple_continuous_canvas.js';\n"
             f"elements.push(new Simple_Continuous_Module({self.canvas_width}, {self.canvas_height}));"
         )
 
-    def render(self, model: Model) -> List[Any]:
-        space_state = []
-        for obj in model.schedule.agents:
-            portrayal = self._portrayal_method(obj)
-            portrayal["x"] = obj.pos[0]
-            portrayal["y"] = obj.pos[1]
-            space_state.append(portrayal)
-        return space_state
+    def render(self, model: Model) -> Dict[str, Any]:
+        """ see frames.py """
+        return self.frames.frame(model)
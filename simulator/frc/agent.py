@@ -4,7 +4,9 @@ import numpy as np
 from mesa import Agent # type:ignore
 #from numpy.typing import NDArray
 from .alliance import Alliance
-from .collision import collide, collide_pos, overlap
+from .firing import FIRING_HEIGHT_M, solutions
+from .kernels import (collide, collide_cylindrical, collide_pos, collide_pos_cylindrical,
+                     overlap)
 
 R3 = Tuple[float, float, float]
 RN = List[float] # fix this with pep646 when 3.11 comes out
@@ -22,6 +24,8 @@ VERTICAL_ELASTICITY = 0.85
 
 END_WALL_HEIGHT_M = 1.97
 SIDE_WALL_HEIGHT_M = 0.51
+# max allowed robot height; balls above this fly over robots
+ROBOT_HEIGHT_M = 1.32
 
 GRAVITY_M_S_S = 9.8
 # measured with video and a few papers
@@ -29,8 +33,36 @@ GRAVITY_M_S_S = 9.8
 # https://www.resna.org/sites/default/files/conference/2018/wheelchair_seating/Dickey.html
 # https://archive.thepocketlab.com/educators/lesson/rolling-resistance-physics-lab
 ROLLING_FRICTION_COEFFICIENT = 0.0135
+# balls lower than this roll, higher ones fly
+FLOOR_TOLERANCE_M = 0.01
+
+# the lower hub is the biggest thing on the field, so nothing touches anything
+# further away than its own radius plus this.
+MAX_RADIUS_M = 0.86
+
+# robots pick up balls this close, if they're low enough
+INTAKE_RADIUS_M = 0.75
+INTAKE_HEIGHT_M = 0.4
+# robots drive randomly, this is the velocity noise per step
+DRIVE_NOISE_M_S = 0.05
+# robots with room head for the nearest ball of their color at this speed,
+# getting this fraction of the way there each step
+DRIVE_SPEED_M_S = 2.0
+DRIVE_GAIN = 0.1
+# shots aim for the hub opening, and don't go if something's in the way of a
+# straight line there, which is a rough stand-in for the real trajectory
+SHOT_TARGET: R3 = (X_MAX_M/2, Y_MAX_M/2, 2.64)
+# shots leave from this far outside the robot, at FIRING_HEIGHT_M
+SHOT_CLEARANCE_M = 0.14
+
+def shot_range_m(x: float, y: float, radius_m: float) -> float:
+    """ from where a robot's shot leaves to the middle of the hub, works on arrays too """
+    return np.hypot(CENTER[0] - x, CENTER[1] - y) - radius_m - SHOT_CLEARANCE_M # type:ignore
 
 class Thing(Agent): # type:ignore
+    # robots and obstacles are upright cylinders, cargo is a sphere
+    CYLINDER = False
+
     def __init__(self, unique_id: int, model: 'Model', # type: ignore
         pos: R3, elasticity: float
     ) -> None:
@@ -112,6 +144,16 @@ class Thing(Agent): # type:ignore
 
         self.model.space.move_agent(self, self._pos)
 
+    @property
+    def z_extent_m(self) -> Tuple[float, float]:
+        """ bottom and top """
+        return (self._pos[2], self._pos[2])
+
+    @property
+    def contact_range_m(self) -> float:
+        """ the furthest anything touching this could be """
+        return self.radius_m + MAX_RADIUS_M
+
     def is_colliding(self, other: Thing) -> bool:
         return overlap(other.pos, self.pos, other.radius_m, self.radius_m)
 
@@ -152,60 +194,103 @@ class Thing(Agent): # type:ignore
             self._pos[2] = 0
             self._velocity[2] = -self._velocity[2] * VERTICAL_ELASTICITY
 
+    def is_beside(self, other: Thing) -> bool:
+        """ overlapping vertically """
+        lo, hi = self.z_extent_m
+        other_lo, other_hi = other.z_extent_m
+        return lo <= other_hi and other_lo <= hi
+
+    def is_touching_side(self, other: Thing) -> bool:
+        """ closer than the radii in xy """
+        dx = other._pos[0] - self._pos[0]
+        dy = other._pos[1] - self._pos[1]
+        r = self.radius_m + other.radius_m
+        return dx * dx + dy * dy < r * r
+
     def check_ball_collision(self, other: Thing) -> bool: # if actually colliding
         if isinstance(self, Obstacle) and isinstance(other, Obstacle):
             return False
-        if not self.is_colliding(other):
+        # things above or below each other don't collide, e.g. balls above robots
+        if not self.is_beside(other):
             return False
-        # balls above robots don't collide (with each other either)
-        # TODO: handle the hub case separately
-        if self.pos[2] > 1.32 or other.pos[2] > 1.32:
-            return False
-        selfv, otherv = collide(
-            self.pos, self.velocity, self.mass_kg, self.elasticity,
-            other.pos, other.velocity, other.mass_kg, other.elasticity)
+        if self.CYLINDER or other.CYLINDER:
+            # the side of a robot or an obstacle, the normal is horizontal
+            if not self.is_touching_side(other):
+                return False
+            selfv, otherv = collide_cylindrical(
+                self.pos, self.velocity, self.mass_kg, self.elasticity,
+                other.pos, other.velocity, other.mass_kg, other.elasticity)
+            selfp, otherp = collide_pos_cylindrical(
+                self.pos, self.mass_kg, self.radius_m,
+                other.pos, other.mass_kg, other.radius_m)
+        else:
+            if not self.is_colliding(other):
+                return False
+            selfv, otherv = collide(
+                self.pos, self.velocity, self.mass_kg, self.elasticity,
+                other.pos, other.velocity, other.mass_kg, other.elasticity)
+            selfp, otherp = collide_pos(
+                self.pos, self.mass_kg, self.radius_m,
+                other.pos, other.mass_kg, other.radius_m)
         self.velocity = selfv
         other.velocity = otherv
-        selfp, otherp = collide_pos(
-            self.pos, self.mass_kg, self.radius_m,
-            other.pos, other.mass_kg, other.radius_m)
         self.pos = selfp
         other.pos = otherp
         return True
 
-# TODO: lower height too, for upper hub
 class Obstacle(Thing):
-    """ has infinite mass """
+    """ has infinite mass
+
+    contact_height_m: things above this pass over, even if the obstacle is taller,
+        for parts of the field that handle their own collisions, like the hub
+    """
+    CYLINDER = True
+
     def __init__(self, unique_id: int, model: 'Model', # type: ignore
-        pos: R3, radius_m: float, z_height_m: float
+        pos: R3, radius_m: float, z_height_m: float,
+        contact_height_m: Optional[float] = None
     ) -> None:
         super().__init__(unique_id, model, pos, 1.0)
         #self.pos = pos
         #self.radius_m = 0.045 # terminal posts are  ~4.5cm wide
+        if radius_m > MAX_RADIUS_M:
+            raise ValueError(f"obstacle radius {radius_m} is more than {MAX_RADIUS_M}")
         self.radius_m = radius_m
         self.mass_kg = np.inf
         self.z_height_m = z_height_m
         self.z_altitude_m = 0 # off the floor
+        self.contact_height_m = z_height_m if contact_height_m is None else contact_height_m
+
+    @property
+    def z_extent_m(self) -> Tuple[float, float]:
+        return (self.z_altitude_m, self.z_altitude_m + self.contact_height_m)
 
     def step(self) -> None: # override: never moves, so just check collisions
-        for other in self.model.space.get_neighbors(self.pos, 4, False): # 2m neighborhood
+        for other in self.model.space.get_agent_neighbors(self, self.contact_range_m,
+                                                          (Cargo, Robot)):
             if self.unique_id >= other.unique_id:
                 continue
             self.check_ball_collision(other)
 
 class Cargo(Thing):
+    RADIUS_M = 0.12
+
     def __init__(self, unique_id: int, model: 'Model', # type: ignore
         pos: R3, alliance: Alliance,
     ) -> None:
         super().__init__(unique_id, model, pos, 0.5) # elasticity 0.5
         # i measured elasticity of 0.5 for rolling collisions, using video
         self.alliance: Alliance = alliance
-        self.radius_m = 0.12
+        self.radius_m = Cargo.RADIUS_M
         self.mass_kg = 0.27
 
+    @property
+    def z_extent_m(self) -> Tuple[float, float]:
+        return (self._pos[2], self._pos[2] + 2 * self.radius_m)
+
     def update_velocity_for_rolling_friction(self) -> None:
         # balls in the air aren't affected by rolling friction
-        if self._pos[2] > 0.01:
+        if self._pos[2] > FLOOR_TOLERANCE_M:
             return
         accel = GRAVITY_M_S_S * ROLLING_FRICTION_COEFFICIENT
         dv = accel * self.model.seconds_per_step # delta v during this step
@@ -216,35 +301,55 @@ class Cargo(Thing):
             v_ratio = dv / v_scalar
             self.velocity = np.multiply(self.velocity, 1-v_ratio)
 
-    # TODO: also air resistance
+    @property
+    def airborne(self) -> bool:
+        return self._pos[2] > FLOOR_TOLERANCE_M
+
+    # in the air, RobotFlockers.fly_cargo() does this, with air resistance
     def update_v_z_for_gravity(self) -> None:
         self._velocity[2] -= GRAVITY_M_S_S * self.model.seconds_per_step
 
     def step(self) -> None:
         collided = False # don't try to apply any other forces in collisions
-        for other in self.model.space.get_neighbors(self.pos, 2, False): # 2m neighborhood
+        for other in self.model.space.get_agent_neighbors(self, self.contact_range_m):
             if self.unique_id >= other.unique_id:
                 continue
             if self.check_ball_collision(other):
                 collided = True
         if not collided:
             self.update_velocity_for_rolling_friction()
-            self.update_v_z_for_gravity()
+            if not self.airborne:
+                self.update_v_z_for_gravity()
         # do this regardless because walls are absolute
         self.check_wall_collision(X_MAX_M, Y_MAX_M)
         self.update_pos_for_velocity(X_MAX_M, Y_MAX_M)
 
 class Robot(Thing):
+    CYLINDER = True
+    RADIUS_M = 0.50
+
     def __init__(self, unique_id: int, model: 'Model', # type: ignore
         pos: R3, alliance: Alliance,
     ):
         super().__init__(unique_id, model, pos, 0.1)
         # seems like robot collisions are *really* inelastic
-        self.radius_m: float = 0.50
+        self.radius_m: float = Robot.RADIUS_M
         self.mass_kg: float = 56 # max allowed
         self.alliance: Alliance = alliance
         self.slot1: Optional[Cargo] = None # TODO: just make this a list
         self.slot2: Optional[Cargo] = None
+        # velocity and elevation for this tick's shot, see RobotFlockers.aim()
+        self.aim: Optional[Tuple[float, float]] = None
+        # what it's doing, an index into behaviour.STATES, and this tick's part of the
+        # plan, see RobotFlockers.behave()
+        self.state: int = 0
+        self.heading: Optional[Tuple[float, float]] = None
+        self.intaking: bool = True
+        self.shooting: bool = True
+
+    @property
+    def z_extent_m(self) -> Tuple[float, float]:
+        return (0, ROBOT_HEIGHT_M)
 
     # override
     @property
@@ -283,56 +388,83 @@ class Robot(Thing):
         self._velocity[2] = 0
 
 
+    def target(self) -> Optional[Cargo]:
+        """ the nearest ball of our color we could pick up, if there's room for it """
+        if self.slot1 is not None and self.slot2 is not None:
+            return None
+        nearest = self.model.space.get_nearest(self.pos, 1, Cargo, self.alliance,
+                                               z_range=(0, INTAKE_HEIGHT_M))
+        return nearest[0] if nearest else None
+
+    def has_clear_shot(self) -> bool:
+        """ no other robot or obstacle on the line to the hub opening """
+        start = (self._pos[0], self._pos[1], self.radius_m)
+        return not self.model.space.get_intersecting(start, SHOT_TARGET, Cargo.RADIUS_M,
+                                                     (Robot, Obstacle), self)
+
     def step(self) -> None:
         # pick up nearby balls TODO: make this a process that takes time
-        for item in self.model.space.get_neighbors(self.pos, 0.75, False):
-            if isinstance(item, Cargo):
-                # can only pick up balls that are close to the floor
-                if item.pos[2] > 0.4:
-                    continue
-                if self.slot1 is None:
-                    self.slot1 = item
-                    self.model.space.remove_agent(item)
-                    self.model.schedule.remove(item)
-                    break
-                if self.slot2 is None:
-                    self.slot2 = item
-                    self.model.space.remove_agent(item)
-                    self.model.schedule.remove(item)
-                    break
-                break # no space, stop iterating
-
-        # shoot balls randomly
+        for item in (self.model.space.get_agent_neighbors(self, INTAKE_RADIUS_M, Cargo)
+                     if self.intaking else ()):
+            # can only pick up balls that are close to the floor
+            if item.pos[2] > INTAKE_HEIGHT_M:
+                continue
+            if self.slot1 is None:
+                self.slot1 = item
+                self.model.space.remove_agent(item)
+                self.model.schedule.remove(item)
+                break
+            if self.slot2 is None:
+                self.slot2 = item
+                self.model.space.remove_agent(item)
+                self.model.schedule.remove(item)
+                break
+            break # no space, stop iterating
+
+        # shoot balls if the way is clear
         # TODO: make this take time
         # TODO: pay attention to color
-        # TODO: altitude
-        # TODO: shot velocity depends on distance
-        if self.slot1 is not None or self.slot2 is not None:
-            to_center_v = np.subtract(CENTER, self.pos)
-            to_center_dir = np.divide(to_center_v, np.linalg.norm(to_center_v))
-            velocity = np.multiply(12, to_center_dir) # 12 m/s towards the middle
-            newpos = np.add(np.multiply(self.radius_m + 0.14, to_center_dir), self.pos)
-        if self.slot1 is not None:
-            self.slot1.velocity = velocity
-            self.slot1._velocity[2] = 7 # TODO: ballistics
-            self.model.space.place_agent(self.slot1, newpos)
-            self.model.schedule.add(self.slot1)
-            self.slot1 = None
-        elif self.slot2 is not None:
-            self.slot2.velocity = velocity
-            self.slot2._velocity[2] = 7 # TODO: ballistics
-            self.model.space.place_agent(self.slot2, newpos)
-            self.model.schedule.add(self.slot2)
-            self.slot2 = None
+        if (self.shooting and (self.slot1 is not None or self.slot2 is not None)
+                and self.has_clear_shot()):
+            if self.aim is None: # not aimed with the others
+                v, el = solutions().solve(
+                    np.array([shot_range_m(self._pos[0], self._pos[1], self.radius_m)]))
+                self.aim = (float(v[0]), float(el[0]))
+            speed_m_s, elevation_deg = self.aim
+            dx = CENTER[0] - self._pos[0]
+            dy = CENTER[1] - self._pos[1]
+            d = np.hypot(dx, dy)
+            ux, uy = dx / d, dy / d
+            horizontal_m_s = speed_m_s * np.cos(np.radians(elevation_deg))
+            velocity = (horizontal_m_s * ux, horizontal_m_s * uy,
+                        speed_m_s * np.sin(np.radians(elevation_deg)))
+            out_m = self.radius_m + SHOT_CLEARANCE_M
+            newpos = (self._pos[0] + out_m * ux, self._pos[1] + out_m * uy, FIRING_HEIGHT_M)
+            if self.slot1 is not None:
+                self.slot1.velocity = velocity
+                self.model.space.place_agent(self.slot1, newpos)
+                self.model.schedule.add(self.slot1)
+                self.slot1 = None
+            elif self.slot2 is not None:
+                self.slot2.velocity = velocity
+                self.model.space.place_agent(self.slot2, newpos)
+                self.model.schedule.add(self.slot2)
+                self.slot2 = None
+        # good for this tick only, from wherever the robot is now
+        self.aim = None
 
         collided = False # don't try to apply any other forces in collisions
-        for other in self.model.space.get_neighbors(self.pos, 4, False): # 4m neighborhood
+        for other in self.model.space.get_agent_neighbors(self, self.contact_range_m):
             if self.unique_id >= other.unique_id:
                 continue
             if self.check_ball_collision(other):
                 collided = True
         if not collided:
-            v = np.random.normal(loc=0.00, scale=0.05, size=2)
+            if self.heading is not None:
+                hx, hy = self.heading
+                self._velocity[0] += DRIVE_GAIN * (DRIVE_SPEED_M_S * hx - self._velocity[0])
+                self._velocity[1] += DRIVE_GAIN * (DRIVE_SPEED_M_S * hy - self._velocity[1])
+            v = self.model.rng.normal(loc=0.00, scale=DRIVE_NOISE_M_S, size=2)
             self._velocity[0] += v[0]
             self._velocity[1] += v[1]
         self.check_wall_collision(X_MAX_M, Y_MAX_M)
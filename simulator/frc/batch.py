@@ -0,0 +1,606 @@
+""" many independent matches stepped together, as arrays.
+
+the state of M fields holding the same N agents is kept in (M, N, ...) arrays, and
+each step is a fixed sequence of numpy passes over all of them, so the python
+overhead is paid once per step rather than once per agent per match.
+
+    batch = BatchFlockers(1000, seed=0)
+    batch.run(3000)
+    print(batch.upper_count.mean())
+
+the physics follows agent.py, model.py and hub.py, with these differences:
+ * each step, contacts are found for every pair at once and resolved together,
+   rather than one agent at a time in random order.
+ * balls shot or released this step don't move until the next one.
+ * delays release things in order of release time, ties by agent order.
+"""
+from typing import Optional, Sequence, Tuple
+import numpy as np
+from numpy.typing import NDArray
+from firing_models.ballistics import accelerate
+from .agent import (Cargo, Robot, DRIVE_GAIN, DRIVE_NOISE_M_S, DRIVE_SPEED_M_S,
+                    END_WALL_HEIGHT_M, FLOOR_TOLERANCE_M, GRAVITY_M_S_S, INTAKE_HEIGHT_M,
+                    INTAKE_RADIUS_M, ROBOT_HEIGHT_M, ROLLING_FRICTION_COEFFICIENT,
+                    SHOT_CLEARANCE_M, SHOT_TARGET, SIDE_WALL_HEIGHT_M, VERTICAL_ELASTICITY,
+                    shot_range_m)
+from .alliance import Alliance
+from .behaviour import plan
+from .bucket import Bucket
+from .firing import FIRING_HEIGHT_M, solutions
+from .hub import (EXIT_DISTANCE_M, EXIT_ROTATION_RAD, EXIT_SPEED_M_S, FUNNEL_BASE_M,
+                  FUNNEL_BASE_RADIUS_M, FUNNEL_DEPTH_M, LOWER_HUB_CAPTURE_DEPTH_M,
+                  LOWER_HUB_HEIGHT_M, LOWER_HUB_RADIUS_M, UPPER_HUB_OUTER_RADIUS_M,
+                  UPPER_HUB_RADIUS_M)
+from .model import (BLUE_TERMINAL, RED_TERMINAL, RELEASE_SPACING_M, TERMINAL_RADIUS_M,
+                    X_MAX_M, Y_MAX_M, RobotFlockers)
+
+# agent kinds
+CARGO = 0
+ROBOT = 1
+OBSTACLE = 2
+
+# delays, in the same order as RobotFlockers.delays
+BLUE_TERMINAL_DELAY = 0
+RED_TERMINAL_DELAY = 1
+LOWER_HUB_DELAY = 2
+UPPER_HUB_DELAY = 3
+OUT_OF_BOUNDS_DELAY = 4
+NOT_DELAYED = -1
+
+HUB_BUCKET = Bucket.make_bucket(FUNNEL_BASE_RADIUS_M, UPPER_HUB_RADIUS_M, FUNNEL_DEPTH_M)
+
+# (delay, position, velocity), like RobotFlockers.step
+RELEASES = [
+    (BLUE_TERMINAL_DELAY, (2, Y_MAX_M - 2, 1.57), (2, -2, 0)),
+    (RED_TERMINAL_DELAY, (X_MAX_M - 2, 2, 1.57), (-2, 2, 0)),
+    (OUT_OF_BOUNDS_DELAY, (X_MAX_M - 2, 2, 1.57), (-2, 2, 0)),
+]
+
+def ranks(mask: NDArray[np.bool_], key: NDArray[np.float64]) -> NDArray[np.int64]:
+    """ the place of each masked item in its row, in order of key, then column """
+    order = np.argsort(np.where(mask, key, np.inf), axis=1, kind='stable')
+    result = np.empty_like(order)
+    np.put_along_axis(result, order, np.broadcast_to(np.arange(mask.shape[1]), mask.shape),
+                      axis=1)
+    return result
+
+def impulses(displacement: NDArray[np.float64], vel_a: NDArray[np.float64],
+             vel_b: NDArray[np.float64], reach: NDArray[np.float64],
+             elasticity: NDArray[np.float64], share_a: NDArray[np.float64],
+             share_b: NDArray[np.float64]) -> Tuple[NDArray[np.float64], ...]:
+    """ velocity and position changes for touching pairs, like collide() and collide_pos()
+        in collision.py, for P pairs at once.
+
+        displacement: (P, 3) from a to b, with z zeroed for cylinders
+        vel_a, vel_b: (P, 3)
+        reach: (P,) sum of the radii
+        share_a, share_b: (P,) each one's part of the inverse mass, zero for obstacles
+        returns dv_a, dv_b, dp_a, dp_b, each (P, 3)
+    """
+    d = np.sqrt(np.sum(displacement * displacement, axis=1))
+    n = displacement / d[:, np.newaxis]
+    vn_a = np.sum(vel_a * n, axis=1)
+    vn_b = np.sum(vel_b * n, axis=1)
+    exchange = (1 + elasticity) * (vn_b - vn_a)
+    squish = reach - d
+    return ((exchange * share_a)[:, np.newaxis] * n,
+            -(exchange * share_b)[:, np.newaxis] * n,
+            -(squish * share_a)[:, np.newaxis] * n,
+            (squish * share_b)[:, np.newaxis] * n)
+
+class BatchFlockers:
+    def __init__(self, matches: int, seed: Optional[int] = None,
+                 cargo_per_alliance: Optional[int] = None) -> None:
+        """ matches: number of independent fields, each laid out by RobotFlockers
+            seed: for repeatable runs, seeds the layouts and the robot noise
+            cargo_per_alliance: passed to RobotFlockers if given
+        """
+        models = []
+        for i in range(matches):
+            kwargs = {}
+            if seed is not None:
+                kwargs['seed'] = seed + i
+            if cargo_per_alliance is not None:
+                kwargs['cargo_per_alliance'] = cargo_per_alliance
+            models.append(RobotFlockers(**kwargs))
+        self.load(models, seed)
+
+    @classmethod
+    def from_models(cls, models: Sequence[RobotFlockers],
+                    seed: Optional[int] = None) -> 'BatchFlockers':
+        """ start from fresh models, which should all have the same agents """
+        batch = cls.__new__(cls)
+        batch.load(models, seed)
+        return batch
+
+    def load(self, models: Sequence[RobotFlockers], seed: Optional[int]) -> None:
+        if len(models) == 0:
+            raise ValueError("no models")
+        template = sorted(models[0].space._agent_to_index, # pylint: disable=protected-access
+                          key=lambda a: a.unique_id)
+        self.ids: NDArray[np.int64] = np.array([a.unique_id for a in template])
+        n = len(template)
+        m = len(models)
+        self.kind = np.array([CARGO if isinstance(a, Cargo)
+                              else ROBOT if isinstance(a, Robot) else OBSTACLE
+                              for a in template], dtype=np.int8)
+        self.alliance = np.array([{Alliance.RED: 0, Alliance.BLUE: 1}.get(
+            getattr(a, 'alliance', None), -1) for a in template], dtype=np.int8)
+        self.radius = np.array([a.radius_m for a in template])
+        self.mass = np.array([a.mass_kg for a in template])
+        self.elasticity = np.array([a.elasticity for a in template])
+        # obstacles stay put, robots are always the same height
+        self.static_extent = np.array([a.z_extent_m if not isinstance(a, Cargo) else (0, 0)
+                                       for a in template])
+        self.pos = np.zeros((m, n, 3))
+        self.vel = np.zeros((m, n, 3))
+        # (M, R) what each robot is doing, and may do this tick, see steer()
+        self.state = np.zeros((m, np.sum(self.kind == ROBOT)), dtype=np.int64)
+        for i, model in enumerate(models):
+            agents = sorted(model.space._agent_to_index, # pylint: disable=protected-access
+                            key=lambda a: a.unique_id)
+            if [a.unique_id for a in agents] != list(self.ids):
+                raise ValueError(f"model {i} has different agents")
+            self.pos[i] = [a.pos for a in agents]
+            self.vel[i] = [a.velocity for a in agents]
+            self.state[i] = [a.state for a in agents if isinstance(a, Robot)]
+        # the obstacles are the same everywhere, and the robots don't get in the way
+        self.navigator = models[0].navigator
+        self.intaking = np.ones(self.state.shape, dtype=bool)
+        self.shooting = np.ones(self.state.shape, dtype=bool)
+        self.on_field = np.ones((m, n), dtype=bool)
+        # cargo held by a robot: the robot's column, and slot 1 or 2
+        self.holder = np.full((m, n), -1, dtype=np.int64)
+        self.slot = np.zeros((m, n), dtype=np.int8)
+        # cargo waiting in a delay, and when it comes out
+        self.delay = np.full((m, n), NOT_DELAYED, dtype=np.int8)
+        self.release_at = np.full((m, n), np.inf)
+        delays = models[0].delays
+        self.latency = [d.latency for d in delays]
+        self.worker_period = [d.worker_period for d in delays]
+        self.free_times = [np.zeros((m, d.workers)) for d in delays]
+        self.upper_count = np.zeros(m, dtype=np.int64)
+        self.lower_count = np.zeros(m, dtype=np.int64)
+        self.exit = np.array([model.hub.exit for model in models], dtype=np.int64)
+        self.steps = 0
+        self.seconds_per_step = models[0].seconds_per_step
+        self.rng = np.random.default_rng(seed)
+
+        self.cargo = np.flatnonzero(self.kind == CARGO)
+        self.robots = np.flatnonzero(self.kind == ROBOT)
+        self.movers = np.flatnonzero(self.kind != OBSTACLE)
+        self.blockers = np.flatnonzero(self.kind != CARGO)
+        # every pair that can touch, i.e. not two obstacles
+        i, j = np.triu_indices(n, 1)
+        keep = (self.kind[i] != OBSTACLE) | (self.kind[j] != OBSTACLE)
+        self.pair_i = i[keep]
+        self.pair_j = j[keep]
+        self.pair_cylinder = (self.kind[self.pair_i] != CARGO) | (self.kind[self.pair_j] != CARGO)
+        self.pair_reach = self.radius[self.pair_i] + self.radius[self.pair_j]
+        self.pair_elasticity = np.maximum(self.elasticity[self.pair_i],
+                                          self.elasticity[self.pair_j])
+        inverse_mass = 1 / self.mass
+        total = inverse_mass[self.pair_i] + inverse_mass[self.pair_j]
+        self.pair_share_i = inverse_mass[self.pair_i] / total
+        self.pair_share_j = inverse_mass[self.pair_j] / total
+
+    @property
+    def matches(self) -> int:
+        return self.pos.shape[0]
+
+    @property
+    def model_time(self) -> float:
+        return self.steps * self.seconds_per_step
+
+    @property
+    def mean_speed(self) -> NDArray[np.float64]:
+        """ per match, over the things on the field """
+        speed = np.linalg.norm(self.vel, axis=2)
+        return np.sum(speed * self.on_field, axis=1) / np.sum(self.on_field, axis=1)
+
+    def population(self, delay: int) -> NDArray[np.int64]:
+        """ per match, the number of things in the delay """
+        return np.sum(self.delay == delay, axis=1)
+
+    def extent(self) -> Tuple[NDArray[np.float64], NDArray[np.float64]]:
+        """ bottom and top of everything, (M, N) each """
+        lo = np.broadcast_to(self.static_extent[:, 0], self.on_field.shape).copy()
+        hi = np.broadcast_to(self.static_extent[:, 1], self.on_field.shape).copy()
+        lo[:, self.cargo] = self.pos[:, self.cargo, 2]
+        hi[:, self.cargo] = self.pos[:, self.cargo, 2] + 2 * self.radius[self.cargo]
+        return lo, hi
+
+    def run(self, steps: int) -> None:
+        for _ in range(steps):
+            self.step()
+
+    def step(self) -> None:
+        t = self.model_time
+        self.terminals(t)
+        self.hub(t)
+        for delay, pos, velocity in RELEASES:
+            self.release(delay, t, pos, velocity)
+        self.hub_release(t)
+        stepping = self.on_field & (self.kind != OBSTACLE)
+        heading, chasing, noise = self.steer()
+        self.intake()
+        self.shoot()
+        stepping &= self.on_field
+        self.fly(stepping)
+        collided = self.collide(stepping)
+        free = stepping & ~collided
+        self.drive(free, heading, chasing, noise)
+        self.roll(free)
+        out = self.walls(stepping)
+        self.put(OUT_OF_BOUNDS_DELAY, out, t)
+        self.move(stepping & ~out)
+        self.steps += 1
+
+    def put(self, delay: int, mask: NDArray[np.bool_], t: float) -> None:
+        """ take the masked things off the field into the delay, like MultiDelay.put() """
+        mask = mask.copy()
+        self.on_field[mask] = False
+        free_times = self.free_times[delay]
+        while True:
+            rows = np.flatnonzero(mask.any(axis=1))
+            if len(rows) == 0:
+                return
+            cols = mask[rows].argmax(axis=1)
+            worker = free_times[rows].argmin(axis=1)
+            release = np.maximum(t + self.latency[delay], free_times[rows, worker])
+            free_times[rows, worker] = release + self.worker_period[delay]
+            self.delay[rows, cols] = delay
+            self.release_at[rows, cols] = release
+            mask[rows, cols] = False
+
+    def ready(self, delay: int, t: float) -> NDArray[np.bool_]:
+        """ things in the delay ready to come out, like MultiDelay.get_all() """
+        return (self.delay == delay) & (t > self.release_at)
+
+    def place(self, mask: NDArray[np.bool_], pos: NDArray[np.float64],
+              vel: NDArray[np.float64]) -> None:
+        self.pos[mask] = pos
+        self.vel[mask] = vel
+        self.on_field[mask] = True
+        self.delay[mask] = NOT_DELAYED
+        self.release_at[mask] = np.inf
+
+    def terminals(self, t: float) -> None:
+        cargo = np.zeros_like(self.on_field)
+        cargo[:, self.cargo] = self.on_field[:, self.cargo]
+        for delay, corner in ((BLUE_TERMINAL_DELAY, BLUE_TERMINAL),
+                              (RED_TERMINAL_DELAY, RED_TERMINAL)):
+            d2 = (self.pos[:, :, 0] - corner[0]) ** 2 + (self.pos[:, :, 1] - corner[1]) ** 2
+            inside = cargo & (d2 <= TERMINAL_RADIUS_M ** 2) & (d2 > 0)
+            self.put(delay, inside, t)
+            cargo &= ~inside
+
+    def hub(self, t: float) -> None:
+        """ catch balls in the funnel or the lower ring, and bounce them off the funnel
+        and the outside, like Hub.step() """
+        c = self.cargo
+        r = self.radius[c]
+        pos = self.pos[:, c]
+        vel = self.vel[:, c]
+        dt = self.seconds_per_step
+        x = pos[:, :, 0] - X_MAX_M / 2
+        y = pos[:, :, 1] - Y_MAX_M / 2
+        rxy = np.hypot(x, y)
+        # ball center relative to the funnel base, and where it was a step ago
+        cz = pos[:, :, 2] + r - FUNNEL_BASE_M
+        bucket = HUB_BUCKET
+        prev_x = x - vel[:, :, 0] * dt
+        prev_y = y - vel[:, :, 1] * dt
+        prev_cz = cz - vel[:, :, 2] * dt
+        on = self.on_field[:, c]
+        funnel = on & (cz - r <= bucket.height) & (
+            self.in_funnel(rxy, cz) | self.in_funnel(np.hypot(prev_x, prev_y), prev_cz))
+        upper = funnel & (cz - r <= 0) # reached the bottom
+        inside = funnel & ~upper & (rxy > 0.001) & (cz <= bucket.height)
+        if np.any(inside):
+            m, k = np.nonzero(inside)
+            # the cone wall normal, pointing in, and the distance from the wall
+            nz = np.sin(bucket.theta_rad)
+            nx = -np.cos(bucket.theta_rad) * x[m, k] / rxy[m, k]
+            ny = -np.cos(bucket.theta_rad) * y[m, k] / rxy[m, k]
+            d = nx * x[m, k] + ny * y[m, k] + nz * (cz[m, k] - bucket.vertex)
+            touching = d < r[k]
+            m, k, nx, ny, d = m[touching], k[touching], nx[touching], ny[touching], d[touching]
+            squish = r[k] - d
+            self.pos[m, c[k], 0] += squish * nx
+            self.pos[m, c[k], 1] += squish * ny
+            self.pos[m, c[k], 2] += squish * nz
+            vn = (self.vel[m, c[k], 0] * nx + self.vel[m, c[k], 1] * ny
+                  + self.vel[m, c[k], 2] * nz)
+            bounce = (1 + self.elasticity[c[k]]) * np.minimum(vn, 0)
+            self.vel[m, c[k], 0] -= bounce * nx
+            self.vel[m, c[k], 1] -= bounce * ny
+            self.vel[m, c[k], 2] -= bounce * nz
+        lower = on & ~funnel & (
+            (UPPER_HUB_OUTER_RADIUS_M < rxy) & (rxy < LOWER_HUB_RADIUS_M) & (vel[:, :, 2] < 0)
+            & (LOWER_HUB_HEIGHT_M - LOWER_HUB_CAPTURE_DEPTH_M < pos[:, :, 2])
+            & (pos[:, :, 2] <= LOWER_HUB_HEIGHT_M))
+        side = (on & ~funnel & (cz - r <= bucket.height) & (rxy < UPPER_HUB_OUTER_RADIUS_M + r)
+                & (pos[:, :, 2] > ROBOT_HEIGHT_M) & (rxy > 0))
+        rim = side & (prev_cz - r >= bucket.height)
+        if np.any(rim):
+            m, k = np.nonzero(rim)
+            self.pos[m, c[k], 2] = FUNNEL_BASE_M + bucket.height
+            self.vel[m, c[k], 2] = -self.vel[m, c[k], 2] * self.elasticity[c[k]]
+        outside = side & ~rim
+        if np.any(outside):
+            m, k = np.nonzero(outside)
+            nx = x[m, k] / rxy[m, k]
+            ny = y[m, k] / rxy[m, k]
+            squish = UPPER_HUB_OUTER_RADIUS_M + r[k] - rxy[m, k]
+            self.pos[m, c[k], 0] += squish * nx
+            self.pos[m, c[k], 1] += squish * ny
+            vn = self.vel[m, c[k], 0] * nx + self.vel[m, c[k], 1] * ny
+            bounce = (1 + self.elasticity[c[k]]) * np.minimum(vn, 0)
+            self.vel[m, c[k], 0] -= bounce * nx
+            self.vel[m, c[k], 1] -= bounce * ny
+        upper_mask = np.zeros_like(self.on_field)
+        upper_mask[:, c] = upper
+        lower_mask = np.zeros_like(self.on_field)
+        lower_mask[:, c] = lower
+        self.upper_count += np.sum(upper, axis=1)
+        self.lower_count += np.sum(lower, axis=1)
+        self.put(UPPER_HUB_DELAY, upper_mask, t)
+        self.put(LOWER_HUB_DELAY, lower_mask, t)
+
+    @staticmethod
+    def in_funnel(rxy: NDArray[np.float64], cz: NDArray[np.float64]) -> NDArray[np.bool_]:
+        """ ball center inside the funnel, or above it within the opening, like Hub """
+        cone = rxy <= (cz - HUB_BUCKET.vertex) * np.tan(HUB_BUCKET.theta_rad)
+        return (cz > 0) & np.where(cz > HUB_BUCKET.height, rxy < UPPER_HUB_RADIUS_M, cone)
+
+    def release(self, delay: int, t: float, pos: Tuple[float, float, float],
+                velocity: Tuple[float, float, float]) -> None:
+        """ put ready cargo on the field, spaced out along the velocity """
+        ready = self.ready(delay, t)
+        if not np.any(ready):
+            return
+        k = ranks(ready, self.release_at)[ready]
+        offset = k * RELEASE_SPACING_M / np.hypot(velocity[0], velocity[1])
+        n = len(k)
+        new_pos = np.empty((n, 3))
+        new_pos[:, 0] = pos[0] + offset * velocity[0]
+        new_pos[:, 1] = pos[1] + offset * velocity[1]
+        new_pos[:, 2] = pos[2]
+        self.place(ready, new_pos, np.broadcast_to(velocity, (n, 3)))
+
+    def hub_release(self, t: float) -> None:
+        """ scored cargo goes out the exits, round robin, like Hub.release() """
+        upper = self.ready(UPPER_HUB_DELAY, t)
+        lower = self.ready(LOWER_HUB_DELAY, t)
+        if not np.any(upper) and not np.any(lower):
+            return
+        k = np.where(upper, ranks(upper, self.release_at),
+                     ranks(lower, self.release_at) + np.sum(upper, axis=1)[:, np.newaxis])
+        ready = upper | lower
+        k = k[ready]
+        r = np.broadcast_to(self.radius, ready.shape)[ready]
+        exit_k = self.exit[np.nonzero(ready)[0]] + k
+        self.exit = (self.exit + np.sum(ready, axis=1)) % 4
+        angle = EXIT_ROTATION_RAD + (exit_k % 4) * np.pi / 2
+        distance = EXIT_DISTANCE_M + (k // 4) * 2 * r
+        dx = -np.sin(angle)
+        dy = -np.cos(angle)
+        new_pos = np.stack((X_MAX_M / 2 + distance * dx, Y_MAX_M / 2 + distance * dy,
+                            np.zeros(len(k))), axis=1)
+        new_vel = np.stack((EXIT_SPEED_M_S * dx, EXIT_SPEED_M_S * dy, np.zeros(len(k))), axis=1)
+        self.place(ready, new_pos, new_vel)
+
+    def held(self, robot: int, slot: int) -> NDArray[np.bool_]:
+        """ (M,) true if the robot has something in the slot """
+        return np.any((self.holder == robot) & (self.slot == slot), axis=1)
+
+    def intake(self) -> None:
+        """ each robot picks up the nearest low ball in reach, if it has room """
+        c = self.cargo
+        for k, robot in enumerate(self.robots):
+            d2 = ((self.pos[:, c, 0] - self.pos[:, robot, 0][:, np.newaxis]) ** 2
+                  + (self.pos[:, c, 1] - self.pos[:, robot, 1][:, np.newaxis]) ** 2)
+            reachable = (self.on_field[:, c] & (d2 <= INTAKE_RADIUS_M ** 2) & (d2 > 0)
+                         & (self.pos[:, c, 2] <= INTAKE_HEIGHT_M)
+                         & (self.on_field[:, robot] & self.intaking[:, k])[:, np.newaxis])
+            slot1 = self.held(robot, 1)
+            slot2 = self.held(robot, 2)
+            rows = np.flatnonzero(np.any(reachable, axis=1) & ~(slot1 & slot2))
+            if len(rows) == 0:
+                continue
+            cols = c[np.argmin(np.where(reachable[rows], d2[rows], np.inf), axis=1)]
+            self.on_field[rows, cols] = False
+            self.holder[rows, cols] = robot
+            self.slot[rows, cols] = np.where(slot1[rows], 2, 1)
+
+    def clear_shots(self) -> NDArray[np.bool_]:
+        """ (M, R) true if nothing stands on the robot's line to the hub opening """
+        robots = self.robots
+        b = self.blockers
+        lo, hi = self.extent()
+        sx = self.pos[:, robots, 0][:, :, np.newaxis]
+        sy = self.pos[:, robots, 1][:, :, np.newaxis]
+        sz = self.radius[robots][np.newaxis, :, np.newaxis]
+        dx = SHOT_TARGET[0] - sx
+        dy = SHOT_TARGET[1] - sy
+        dz = SHOT_TARGET[2] - sz
+        bx = self.pos[:, np.newaxis, b, 0]
+        by = self.pos[:, np.newaxis, b, 1]
+        length_squared = dx * dx + dy * dy
+        tt = np.clip(((bx - sx) * dx + (by - sy) * dy) / np.maximum(length_squared, 1e-12), 0, 1)
+        cx = sx + tt * dx - bx
+        cy = sy + tt * dy - by
+        pad = Cargo.RADIUS_M
+        reach = self.radius[b] + pad
+        z = sz + tt * dz
+        blocked = ((cx * cx + cy * cy <= reach * reach)
+                   & (lo[:, np.newaxis, b] - pad <= z) & (z <= hi[:, np.newaxis, b] + pad)
+                   & self.on_field[:, np.newaxis, b]
+                   & (robots[:, np.newaxis] != b[np.newaxis, :])[np.newaxis])
+        return ~np.any(blocked, axis=2)
+
+    def shoot(self) -> None:
+        """ each robot with a clear shot fires one ball, slot 1 first, like Robot.step() """
+        if len(self.robots) == 0:
+            return
+        clear = self.clear_shots()
+        # every robot in every match aimed at once, like RobotFlockers.aim()
+        robots = self.robots
+        speed, elevation = solutions().solve(shot_range_m(
+            self.pos[:, robots, 0], self.pos[:, robots, 1], self.radius[robots]))
+        elevation = np.radians(elevation)
+        for k, robot in enumerate(self.robots):
+            mine = self.holder == robot
+            loaded = (np.any(mine, axis=1) & clear[:, k] & self.on_field[:, robot]
+                      & self.shooting[:, k])
+            rows = np.flatnonzero(loaded)
+            if len(rows) == 0:
+                continue
+            # slot 1 sorts first
+            cols = np.argmin(np.where(mine[rows], self.slot[rows], 3), axis=1)
+            to_center = np.stack((X_MAX_M / 2 - self.pos[rows, robot, 0],
+                                  Y_MAX_M / 2 - self.pos[rows, robot, 1]), axis=1)
+            direction = to_center / np.linalg.norm(to_center, axis=1)[:, np.newaxis]
+            self.pos[rows, cols, :2] = (self.pos[rows, robot, :2]
+                                        + (self.radius[robot] + SHOT_CLEARANCE_M) * direction)
+            self.pos[rows, cols, 2] = FIRING_HEIGHT_M
+            horizontal = speed[rows, k] * np.cos(elevation[rows, k])
+            self.vel[rows, cols, :2] = horizontal[:, np.newaxis] * direction
+            self.vel[rows, cols, 2] = speed[rows, k] * np.sin(elevation[rows, k])
+            self.on_field[rows, cols] = True
+            self.holder[rows, cols] = -1
+            self.slot[rows, cols] = 0
+
+    def collide(self, stepping: NDArray[np.bool_]) -> NDArray[np.bool_]:
+        """ resolve every contact at once, returns (M, N) true for the ones involved """
+        i = self.pair_i
+        j = self.pair_j
+        lo, hi = self.extent()
+        pi = self.pos[:, i]
+        pj = self.pos[:, j]
+        dx = pj[:, :, 0] - pi[:, :, 0]
+        dy = pj[:, :, 1] - pi[:, :, 1]
+        dz = np.where(self.pair_cylinder, 0, pj[:, :, 2] - pi[:, :, 2])
+        d2 = dx * dx + dy * dy + dz * dz
+        # obstacles don't step, but they collide with things that do
+        active = ((stepping[:, i] | stepping[:, j])
+                  & (stepping[:, i] | (self.kind[i] == OBSTACLE))
+                  & (stepping[:, j] | (self.kind[j] == OBSTACLE)))
+        touching = (active & (lo[:, i] <= hi[:, j]) & (lo[:, j] <= hi[:, i])
+                    & (d2 < self.pair_reach ** 2) & (d2 > 0))
+        m, p = np.nonzero(touching)
+        collided = np.zeros_like(stepping)
+        if len(m) == 0:
+            return collided
+        a = i[p]
+        b = j[p]
+        dv_a, dv_b, dp_a, dp_b = impulses(
+            np.stack((dx[m, p], dy[m, p], dz[m, p]), axis=1), self.vel[m, a], self.vel[m, b],
+            self.pair_reach[p], self.pair_elasticity[p], self.pair_share_i[p],
+            self.pair_share_j[p])
+        np.add.at(self.vel, (m, a), dv_a)
+        np.add.at(self.vel, (m, b), dv_b)
+        np.add.at(self.pos, (m, a), dp_a)
+        np.add.at(self.pos, (m, b), dp_b)
+        collided[m, a] = True
+        collided[m, b] = True
+        self.upright(collided)
+        return collided
+
+    def upright(self, mask: NDArray[np.bool_]) -> None:
+        """ robots stay on the floor, like the Robot pos and velocity setters """
+        m, k = np.nonzero(mask[:, self.robots])
+        robots = self.robots[k]
+        self.vel[m, robots, 2] = 0
+        self.pos[m, robots, 2] = self.radius[robots]
+
+    def steer(self) -> Tuple[NDArray[np.float64], NDArray[np.bool_], NDArray[np.float64]]:
+        """ every robot's next state, like RobotFlockers.behave(), and where it's headed:
+        (M, R, 2) unit vectors, (M, R) true for the ones driving there, and (M, R, 2)
+        velocity noise.  also sets which robots may pick up cargo and shoot. """
+        c = self.cargo
+        robots = self.robots
+        noise = self.rng.normal(0, DRIVE_NOISE_M_S, (self.matches, len(robots), 2))
+        held = np.sum(self.holder[:, np.newaxis, :] == robots[np.newaxis, :, np.newaxis], axis=2)
+        self.state, heading, driving, self.intaking, self.shooting = plan(
+            self.state, self.model_time, self.pos[:, robots, :2], self.alliance[robots], held,
+            self.pos[:, c, :2], self.alliance[c],
+            self.on_field[:, c] & (self.pos[:, c, 2] <= INTAKE_HEIGHT_M), self.navigator)
+        return heading, driving, noise
+
+    def drive(self, free: NDArray[np.bool_], heading: NDArray[np.float64],
+              chasing: NDArray[np.bool_], noise: NDArray[np.float64]) -> None:
+        """ free robots speed up towards their heading, plus noise, see steer() """
+        m, k = np.nonzero(free[:, self.robots])
+        robots = self.robots[k]
+        v = self.vel[m, robots, :2]
+        gain = np.where(chasing[m, k], DRIVE_GAIN, 0)[:, np.newaxis]
+        v += gain * (DRIVE_SPEED_M_S * heading[m, k] - v) + noise[m, k]
+        self.vel[m, robots, :2] = v
+
+    def fly(self, stepping: NDArray[np.bool_]) -> None:
+        """ drag and gravity on the cargo in the air, like RobotFlockers.fly_cargo() """
+        m, k = np.nonzero(stepping[:, self.cargo])
+        cargo = self.cargo[k]
+        airborne = self.pos[m, cargo, 2] > FLOOR_TOLERANCE_M
+        m = m[airborne]
+        cargo = cargo[airborne]
+        vel = self.vel[m, cargo]
+        accelerate(vel, self.seconds_per_step)
+        self.vel[m, cargo] = vel
+
+    def roll(self, free: NDArray[np.bool_]) -> None:
+        """ rolling friction and gravity on the cargo on the floor, like Cargo.step() """
+        m, k = np.nonzero(free[:, self.cargo])
+        cargo = self.cargo[k]
+        rolling = self.pos[m, cargo, 2] <= FLOOR_TOLERANCE_M
+        m = m[rolling]
+        cargo = cargo[rolling]
+        vel = self.vel[m, cargo]
+        dv = GRAVITY_M_S_S * ROLLING_FRICTION_COEFFICIENT * self.seconds_per_step
+        speed = np.linalg.norm(vel, axis=1)
+        stopped = dv > speed
+        scale = np.where(stopped, 0, 1 - dv / np.where(stopped, 1, speed))
+        vel *= scale[:, np.newaxis]
+        vel[:, 2] -= GRAVITY_M_S_S * self.seconds_per_step
+        self.vel[m, cargo] = vel
+
+    def walls(self, stepping: NDArray[np.bool_]) -> NDArray[np.bool_]:
+        """ bounce off the walls, like Thing.check_wall_collision(), returns (M, N) true
+        for the ones that went over, which are left for put() """
+        m, n = np.nonzero(stepping)
+        pos = self.pos[m, n]
+        vel = self.vel[m, n]
+        r = self.radius[n]
+        out = np.zeros(len(m), dtype=bool)
+        for axis, size, height in ((0, X_MAX_M, END_WALL_HEIGHT_M),
+                                   (1, Y_MAX_M, SIDE_WALL_HEIGHT_M)):
+            lo = pos[:, axis] <= r
+            hi = ~lo & (pos[:, axis] >= size - r)
+            wall = lo | hi
+            out |= wall & (pos[:, 2] > height)
+            pos[:, axis] = np.where(lo, r, np.where(hi, size - r, pos[:, axis]))
+            vel[:, axis] = np.where(wall, -vel[:, axis] * self.elasticity[n], vel[:, axis])
+        below = ~out & (pos[:, 2] < 0)
+        pos[:, 2] = np.where(below, 0, pos[:, 2])
+        vel[:, 2] = np.where(below, -vel[:, 2] * VERTICAL_ELASTICITY, vel[:, 2])
+        self.pos[m, n] = pos
+        self.vel[m, n] = vel
+        result = np.zeros_like(stepping)
+        result[m[out], n[out]] = True
+        return result
+
+    def move(self, stepping: NDArray[np.bool_]) -> None:
+        """ like Thing.update_pos_for_velocity() """
+        m, n = np.nonzero(stepping)
+        r = self.radius[n]
+        vel = self.vel[m, n]
+        pos = self.pos[m, n] + vel * self.seconds_per_step
+        pos[:, 0] = np.clip(pos[:, 0], r, X_MAX_M - r)
+        pos[:, 1] = np.clip(pos[:, 1], r, Y_MAX_M - r)
+        below = pos[:, 2] < 0
+        vel[:, 2] = np.where(below, -vel[:, 2] * VERTICAL_ELASTICITY, vel[:, 2])
+        pos[:, 2] = np.where(below, 0, pos[:, 2])
+        self.pos[m, n] = pos
+        self.vel[m, n] = vel
@@ -0,0 +1,164 @@
+""" what the robots are doing, as a table of states and guarded transitions, for all
+the robots at once.
+
+every robot's state is one integer in an array, (M, R) for M matches of R robots.
+each tick, the transitions are tried in order, each one as a mask over the whole array:
+the robots in one of its source states, where its guard (a boolean array of the same
+shape) is true, that haven't already moved, go to its destination.  then each state's
+action runs once, on the mask of the robots in it.  the loops are over the rows of the
+table, never over the robots, so a richer strategy is just more rows.
+
+the field's strategy (see plan()) is the one sketched for the transitions library:
+chase cargo of your color, shoot once you're full or there's nothing left to chase,
+push the other alliance's robots around when you're empty and there's nothing to
+chase (and shoot anything you pick up on the way), and climb in the endgame.
+"""
+from typing import Callable, Dict, List, Sequence, Tuple, Union
+import numpy as np
+from numpy.typing import NDArray
+from .agent import X_MAX_M, Y_MAX_M
+from .navigation import Navigator
+
+States = NDArray[np.int64]
+Mask = NDArray[np.bool_]
+# trigger, source state or states ('*' for any), destination state
+Transition = Tuple[str, Union[str, Sequence[str]], str]
+
+STATES = ['chasing_cargo', 'chasing_bots', 'shooting', 'climbing']
+CHASING_CARGO, CHASING_BOTS, SHOOTING, CLIMBING = range(len(STATES))
+
+# the first one that fires wins; the trigger names the guard, see plan()
+TRANSITIONS: List[Transition] = [
+    ('endgame', '*', 'climbing'),
+    ('hunt_cargo', ['shooting', 'chasing_bots'], 'chasing_cargo'),
+    ('defending', ['chasing_cargo', 'shooting'], 'chasing_bots'),
+    ('loaded', 'chasing_cargo', 'shooting'),
+    # defenders keep their intakes down, so they can pick up cargo on the way
+    ('picked_up', 'chasing_bots', 'shooting'),
+]
+
+# a match is 150 seconds, the last 30 are the endgame
+ENDGAME_S = 120
+# shooters close in to about where the sweep says shots go in most often
+SHOOTING_RANGE_M = 3.0
+# the middle of each alliance's hangar, red then blue, see make_obstacles()
+HANGARS_M = np.array([[X_MAX_M - 3.07 / 2, Y_MAX_M - 2.75 / 2], [3.07 / 2, 2.75 / 2]])
+# climbers stop driving this close to the middle
+HANGAR_TOLERANCE_M = 0.5
+# shooters and climbers follow the navigator's flow fields there, see GOALS in model.py
+
+class StateMachine:
+    def __init__(self, states: List[str], transitions: List[Transition]) -> None:
+        index = {name: i for i, name in enumerate(states)}
+        def lookup(name: str) -> int:
+            if name not in index:
+                raise ValueError(f"unknown state {name}")
+            return index[name]
+        self.states = states
+        self.triggers = [trigger for trigger, _, _ in transitions]
+        # (T, S) true where the transition starts from the state
+        self.sources = np.zeros((len(transitions), len(states)), dtype=bool)
+        for i, (_, sources, _) in enumerate(transitions):
+            if sources == '*':
+                self.sources[i] = True
+            else:
+                names = [sources] if isinstance(sources, str) else sources
+                self.sources[i, [lookup(name) for name in names]] = True
+        self.destinations = np.array([lookup(dest) for _, _, dest in transitions],
+                                     dtype=np.int64)
+
+    def step(self, state: States, guards: Dict[str, Mask]) -> States:
+        """ the next states, same shape; guards: by trigger, broadcast against state """
+        after = state.copy()
+        moved = np.zeros(state.shape, dtype=bool)
+        for i, trigger in enumerate(self.triggers):
+            fire = ~moved & self.sources[i][state] & guards[trigger]
+            after[fire] = self.destinations[i]
+            moved |= fire
+        return after
+
+    def dispatch(self, state: States, actions: Dict[str, Callable[[Mask], None]]) -> None:
+        """ each action once, with the mask of the robots in its state, if there are any """
+        for i, name in enumerate(self.states):
+            mask = state == i
+            if name in actions and np.any(mask):
+                actions[name](mask)
+
+MACHINE = StateMachine(STATES, TRANSITIONS)
+
+def nearest(xy: NDArray[np.float64], targets: NDArray[np.float64],
+            wanted: Mask) -> Tuple[NDArray[np.float64], Mask]:
+    """ offset to the nearest wanted target, and whether there is one.
+
+        xy: (M, R, 2)
+        targets: (M, N, 2)
+        wanted: (M, R, N)
+    """
+    if targets.shape[1] == 0:
+        return np.zeros(xy.shape), np.zeros(xy.shape[:2], dtype=bool)
+    d = targets[:, np.newaxis, :, :] - xy[:, :, np.newaxis, :]
+    d2 = np.sum(d * d, axis=3)
+    k = np.argmin(np.where(wanted, d2, np.inf), axis=2)[:, :, np.newaxis, np.newaxis]
+    return np.take_along_axis(d, k, axis=2)[:, :, 0], np.any(wanted, axis=2)
+
+def plan(state: States, t: float, robot_xy: NDArray[np.float64],
+         robot_alliance: NDArray[np.int8], held: NDArray[np.int64],
+         cargo_xy: NDArray[np.float64], cargo_alliance: NDArray[np.int8],
+         cargo_low: Mask,
+         navigator: Navigator) -> Tuple[States, NDArray[np.float64], Mask, Mask, Mask]:
+    """ the next states, where the robots head, (M, R, 2) unit vectors, and (M, R) masks
+    of the ones driving there (the rest just drift), the ones that may pick up cargo,
+    and the ones that may shoot.
+
+        state, held: (M, R), held is the number of balls each robot has
+        robot_xy: (M, R, 2)
+        robot_alliance: (R,) 0 red, 1 blue, like BatchFlockers.alliance
+        cargo_xy: (M, C, 2)
+        cargo_alliance: (C,)
+        cargo_low: (M, C) on the field and low enough to pick up
+        navigator: the way around the obstacles to the hub and the hangars
+    """
+    wanted = (cargo_low[:, np.newaxis, :]
+              & (cargo_alliance[np.newaxis, :] == robot_alliance[:, np.newaxis])[np.newaxis]
+              & (held < 2)[:, :, np.newaxis])
+    to_cargo, found = nearest(robot_xy, cargo_xy, wanted)
+    empty = held == 0
+    state = MACHINE.step(state, {
+        'endgame': np.asarray(t >= ENDGAME_S),
+        'hunt_cargo': empty & found,
+        'defending': empty & ~found,
+        'loaded': (held == 2) | ((held > 0) & ~found),
+        'picked_up': held > 0,
+    })
+    heading = np.zeros(robot_xy.shape)
+    driving = np.zeros(state.shape, dtype=bool)
+
+    def go(mask: Mask, offset: NDArray[np.float64], far: Mask) -> None:
+        d = np.hypot(offset[..., 0], offset[..., 1])
+        moving = mask & far & (d > 0)
+        heading[moving] = offset[moving] / d[moving][:, np.newaxis]
+        driving[moving] = True
+
+    def chase_cargo(mask: Mask) -> None:
+        go(mask, to_cargo, found)
+
+    def chase_bots(mask: Mask) -> None:
+        rivals = robot_alliance[np.newaxis, :] != robot_alliance[:, np.newaxis]
+        to_bot, any_bot = nearest(robot_xy, robot_xy,
+                                  np.broadcast_to(rivals, (len(state),) + rivals.shape))
+        go(mask, to_bot, any_bot)
+
+    def shoot(mask: Mask) -> None:
+        to_hub, there = navigator.steer('hub', robot_xy)
+        go(mask, to_hub, ~there)
+
+    def climb(mask: Mask) -> None:
+        red = (robot_alliance == 0)[np.newaxis, :]
+        to_red, red_there = navigator.steer('red_hangar', robot_xy)
+        to_blue, blue_there = navigator.steer('blue_hangar', robot_xy)
+        go(mask, np.where(red[..., np.newaxis], to_red, to_blue),
+           ~np.where(red, red_there, blue_there))
+
+    MACHINE.dispatch(state, {'chasing_cargo': chase_cargo, 'chasing_bots': chase_bots,
+                             'shooting': shoot, 'climbing': climb})
+    return state, heading, driving, state != CLIMBING, state == SHOOTING
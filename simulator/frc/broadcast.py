@@ -0,0 +1,161 @@
+""" one model, any number of viewers.
+
+the model runs on a worker, like the live server, and each frame is turned into
+bytes once and written to every viewer, so another viewer costs only the write.
+frames are mostly changes (see frames.py), so a viewer has to get every one of them
+in order.  viewers who join late, press reset, or can't keep up are sent a keyframe
+instead, made from a copy of what the frames so far add up to, and then get the
+changes again from there.
+
+    $ python3 run.py --broadcast
+"""
+import json
+from typing import Any, Dict, List, Optional, Set
+import tornado.escape
+import tornado.ioloop
+from mesa.visualization.ModularVisualization import ModularServer, SocketHandler # type: ignore
+from .live import END, LiveServer, ModelWorker
+
+class Mirror:
+    """ what one canvas's frames add up to, the same as frames.js keeps """
+    def __init__(self) -> None:
+        self.objects: Dict[Any, Dict[str, Any]] = {}
+        self.scales: Dict[str, int] = {}
+
+    def apply(self, frame: Dict[str, Any]) -> None:
+        if frame["keyframe"]:
+            self.objects = {}
+            self.scales = frame["scales"]
+        for i in frame["removed"]:
+            self.objects.pop(i, None)
+        for i, change in frame["changes"].items():
+            p = self.objects.get(i)
+            if p is None:
+                self.objects[i] = dict(change)
+            else:
+                p.update(change)
+
+    def keyframe(self) -> Dict[str, Any]:
+        return {"keyframe": True, "scales": self.scales, "changes": self.objects, "removed": []}
+
+def is_frame(state: Any) -> bool:
+    return isinstance(state, dict) and "keyframe" in state
+
+class Broadcaster:
+    def __init__(self, worker: ModelWorker) -> None:
+        self.worker = worker
+        self.viewers: Set[Any] = set()
+        # viewers who need a keyframe before any more changes
+        self.stale: Set[Any] = set()
+        # the last write to each viewer, which has to finish before the next one
+        self.pending: Dict[Any, Any] = {}
+        self.mirrors: List[Optional[Mirror]] = []
+        self.latest: List[Any] = [] # the states of the elements that aren't frames
+        self.ended = False
+        self.sent = 0 # messages serialized
+        self.writes = 0 # messages written, to all the viewers
+
+    def leave(self, viewer: Any) -> None:
+        self.viewers.discard(viewer)
+        self.stale.discard(viewer)
+        self.pending.pop(viewer, None)
+
+    def join(self, viewer: Any) -> None:
+        """ the viewer starts over, with a keyframe, now if there's one to make """
+        self.viewers.add(viewer)
+        self.stale.add(viewer)
+        if self.mirrors and self.ready(viewer):
+            self.write(viewer, self.encode(self.keyframe()))
+            self.stale.discard(viewer)
+
+    def ready(self, viewer: Any) -> bool:
+        pending = self.pending.get(viewer)
+        return pending is None or pending.done()
+
+    def write(self, viewer: Any, message: bytes) -> None:
+        # bytes go out as they are, as a text message
+        self.pending[viewer] = viewer.write_message(message)
+        self.writes += 1
+
+    def encode(self, data: Any) -> bytes:
+        self.sent += 1
+        return json.dumps({"type": "viz_state", "data": data}).encode()
+
+    def keyframe(self) -> List[Any]:
+        return [state if mirror is None else mirror.keyframe()
+                for mirror, state in zip(self.mirrors, self.latest)]
+
+    def publish(self, data: List[Any]) -> None:
+        """ one frame, to everyone who can take it """
+        if not self.mirrors:
+            self.mirrors = [Mirror() if is_frame(state) else None for state in data]
+        for mirror, state in zip(self.mirrors, data):
+            if mirror is not None:
+                mirror.apply(state)
+        self.latest = data
+        message: Optional[bytes] = None
+        keyframe: Optional[bytes] = None
+        for viewer in list(self.viewers):
+            if not self.ready(viewer):
+                self.stale.add(viewer) # missed this one
+            elif viewer in self.stale:
+                if keyframe is None:
+                    keyframe = self.encode(self.keyframe())
+                self.write(viewer, keyframe)
+                self.stale.discard(viewer)
+            else:
+                if message is None:
+                    message = self.encode(data)
+                self.write(viewer, message)
+
+    def end(self) -> None:
+        self.ended = True
+        message = json.dumps({"type": "end"}).encode()
+        for viewer in list(self.viewers):
+            viewer.write_message(message)
+
+    async def run(self) -> None:
+        """ pass along the worker's frames until the model stops """
+        loop = tornado.ioloop.IOLoop.current()
+        while True:
+            data = await loop.run_in_executor(None, self.worker.next_frame)
+            if data is END:
+                self.end()
+                return
+            self.publish(data)
+
+class BroadcastSocketHandler(SocketHandler): # type:ignore
+    """ frames are pushed, so stepping does nothing, and reset just asks for a keyframe.
+    the page always resets when it opens, so that's when it joins. """
+    def open(self) -> None:
+        super().open()
+        self.application.start()
+
+    def on_close(self) -> None:
+        self.application.broadcaster.leave(self)
+
+    def on_message(self, message: str) -> None:
+        msg = tornado.escape.json_decode(message)
+        if msg["type"] == "get_step":
+            if self.application.broadcaster.ended:
+                self.write_message({"type": "end"})
+        elif msg["type"] == "reset":
+            self.application.broadcaster.join(self)
+        else:
+            super().on_message(message)
+
+class BroadcastServer(LiveServer):
+    handlers = [ModularServer.page_handler, (r"/ws", BroadcastSocketHandler),
+                ModularServer.static_handler, ModularServer.local_handler]
+
+    def reset_model(self) -> None:
+        super().reset_model()
+        assert self.worker is not None
+        self.broadcaster = Broadcaster(self.worker) # pylint: disable=attribute-defined-outside-init
+        self.started = False # pylint: disable=attribute-defined-outside-init
+
+    def start(self) -> None:
+        """ the first viewer starts the show """
+        if not self.started:
+            self.started = True # pylint: disable=attribute-defined-outside-init
+            tornado.ioloop.IOLoop.current().spawn_callback(self.broadcaster.run)
@@ -1,4 +1,5 @@
-# collision calculations
+# collision calculations, with numpy.  the agents use the same thing in plain float
+# arithmetic, in kernels.py, which is tested against these.
 from typing import Tuple
 import numpy as np
 from numpy.typing import NDArray
@@ -1,5 +1,6 @@
+import heapq
 from collections import deque
-from typing import Deque, Generic, Optional, Tuple, TypeVar
+from typing import Deque, Generic, List, Optional, Tuple, TypeVar
 
 T = TypeVar('T')
 
@@ -38,3 +39,62 @@ class Delay(Generic[T]):
             self.latest_get_time = as_of
             return self.deque.popleft()[0]
         return None
+
+class MultiDelay(Generic[T]):
+    def __init__(self, latency: float, throughput: float, workers: int = 1) -> None:
+        """
+            latency: items remain at least this long
+            throughput: items released per time, across all the workers
+            workers: independent servers, each one releases an item every workers/throughput
+
+            the release time is decided by put(), using the earliest free worker.
+            puts are in time order, so release times are too, and a deque is enough.
+        """
+        if workers < 1:
+            raise ValueError(f"workers {workers} < 1")
+        self.latency: float = latency
+        self.workers: int = workers
+        self.worker_period: float = workers/throughput
+        self.latest_put_time: float = 0
+        self.latest_get_time: float = 0
+        self.free_times: List[float] = [0] * workers # heap
+        self.deque: Deque[Tuple[T, float]] = deque() # (item, release time)
+
+    @property
+    def length(self) -> int:
+        return len(self.deque)
+
+    @property
+    def next_release_time(self) -> Optional[float]:
+        """ items come out the first get() *after* this time """
+        if len(self.deque) == 0:
+            return None
+        return self.deque[0][1]
+
+    def put(self, item: T, item_time: float) -> None:
+        if item_time < self.latest_put_time: # inserts must be in time order
+            raise ValueError(f"item_time {item_time} < latest put_time {self.latest_put_time}")
+        self.latest_put_time = item_time
+        release_time = max(item_time + self.latency, heapq.heappop(self.free_times))
+        heapq.heappush(self.free_times, release_time + self.worker_period)
+        self.deque.append((item, release_time))
+
+    def get(self, as_of: float) -> Optional[T]:
+        """ one item, if any is ready """
+        self._check_get_time(as_of)
+        if len(self.deque) > 0 and as_of > self.deque[0][1]:
+            return self.deque.popleft()[0]
+        return None
+
+    def get_all(self, as_of: float) -> List[T]:
+        """ every item that is ready """
+        self._check_get_time(as_of)
+        items: List[T] = []
+        while len(self.deque) > 0 and as_of > self.deque[0][1]:
+            items.append(self.deque.popleft()[0])
+        return items
+
+    def _check_get_time(self, as_of: float) -> None:
+        if as_of < self.latest_get_time:
+            raise ValueError(f"as_of {as_of} < latest get_time {self.latest_get_time}")
+        self.latest_get_time = as_of
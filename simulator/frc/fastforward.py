@@ -0,0 +1,98 @@
+""" predicts free motion, so quiet stretches of a match can be skipped.
+
+how long a stretch is quiet is worked out once, up front, from how fast things could
+close the gaps between them, see RobotFlockers.fast_forward().
+"""
+import numpy as np
+from numpy.typing import NDArray
+from firing_models.ballistics import accelerate
+from .agent import (DRIVE_GAIN, DRIVE_SPEED_M_S, END_WALL_HEIGHT_M, FLOOR_TOLERANCE_M,
+                    GRAVITY_M_S_S, ROLLING_FRICTION_COEFFICIENT, SIDE_WALL_HEIGHT_M,
+                    VERTICAL_ELASTICITY)
+
+# extra clearance on top of the distance covered in one step
+CLEARANCE_M = 0.01
+# room for robots to speed up from the drive noise, see speed_limits()
+SPEED_SLACK_M_S = 0.5
+
+def free_step(pos: NDArray[np.float64], vel: NDArray[np.float64],
+              radii: NDArray[np.float64], elasticity: NDArray[np.float64],
+              cargo: NDArray[np.bool_], heading: NDArray[np.float64],
+              driving: NDArray[np.bool_], noise: NDArray[np.float64], dt: float,
+              size_x: float, size_y: float) -> None:
+    """ one step of motion without touching anything but the walls and the floor, in
+        place, the same way the agents do it.
+
+        pos, vel: (n, 3)
+        radii, elasticity: (n,)
+        cargo: (n,) true for cargo, false for robots
+        heading: (n, 2) unit vectors for the robots driving, see Robot.step()
+        driving: (n,) true for the robots driving
+        noise: (n, 2) robot velocity noise, ignored for cargo
+    """
+    rolling = cargo & (pos[:, 2] <= FLOOR_TOLERANCE_M)
+    airborne = cargo & ~rolling
+    if np.any(airborne):
+        flying = vel[airborne]
+        accelerate(flying, dt)
+        vel[airborne] = flying
+    if np.any(rolling):
+        dv = GRAVITY_M_S_S * ROLLING_FRICTION_COEFFICIENT * dt
+        speed = np.linalg.norm(vel[rolling], axis=1)
+        stopped = dv > speed
+        scale = np.where(stopped, 0, 1 - dv / np.where(stopped, 1, speed))
+        vel[rolling] *= scale[:, np.newaxis]
+    vel[rolling, 2] -= GRAVITY_M_S_S * dt
+    vel[driving, :2] += DRIVE_GAIN * (DRIVE_SPEED_M_S * heading[driving] - vel[driving, :2])
+    robots = ~cargo
+    vel[robots, :2] += noise[robots]
+    # bounce off the walls
+    for axis, size in ((0, size_x), (1, size_y)):
+        lo = pos[:, axis] <= radii
+        hi = ~lo & (pos[:, axis] >= size - radii)
+        pos[lo, axis] = radii[lo]
+        pos[hi, axis] = size - radii[hi]
+        wall = lo | hi
+        vel[wall, axis] = -vel[wall, axis] * elasticity[wall]
+    pos += vel * dt
+    for axis, size in ((0, size_x), (1, size_y)):
+        pos[:, axis] = np.clip(pos[:, axis], radii, size - radii)
+    below = pos[:, 2] < 0
+    vel[below, 2] = -vel[below, 2] * VERTICAL_ELASTICITY
+    pos[below, 2] = 0
+
+def speed_limits(vel: NDArray[np.float64], cargo: NDArray[np.bool_],
+                 robot_speed: float) -> NDArray[np.float64]:
+    """ (n,) the most each thing is assumed to go, in xy, for a while.  cargo only slows
+    down, from friction, drag, and walls, so it's the speed now.  robots get noise, so
+    it's the speed now or robot_speed, plus SPEED_SLACK_M_S; fast_forward() stops if one
+    goes faster. """
+    speed = np.hypot(vel[:, 0], vel[:, 1])
+    return np.where(cargo, speed, np.maximum(speed, robot_speed) + SPEED_SLACK_M_S)
+
+def distances(pos: NDArray[np.float64], others: NDArray[np.float64]) -> NDArray[np.float64]:
+    """ (n, m) from each of pos, (n, 3), to each of others, (m, 3), in xy """
+    d = pos[:, np.newaxis, :2] - others[np.newaxis, :, :2]
+    return np.hypot(d[:, :, 0], d[:, :, 1]) # type:ignore
+
+def clear_steps(gap: NDArray[np.float64], speed: NDArray[np.float64],
+                dt: float) -> NDArray[np.float64]:
+    """ how many steps things closing a gap at up to speed can certainly take with more
+    than a step's travel, plus clearance, still between them at the start of each one;
+    inf if they're not closing. """
+    room = gap - 2 * CLEARANCE_M
+    with np.errstate(divide='ignore', invalid='ignore'):
+        steps = np.ceil(room / (dt * speed)) - 1
+    steps = np.where(speed > 0, steps, np.inf)
+    return np.where(room > 0, np.maximum(steps, 0), 0) # type:ignore
+
+def wall_gaps(pos: NDArray[np.float64], vel: NDArray[np.float64],
+              radii: NDArray[np.float64], size_x: float, size_y: float) -> NDArray[np.float64]:
+    """ (n,) how far each thing is, in xy, from the nearest wall it could go over at
+    the top of its flight, inf if it can't get that high.  drag and floor bounces only
+    make the top lower. """
+    top = pos[:, 2] + np.maximum(vel[:, 2], 0) ** 2 / (2 * GRAVITY_M_S_S)
+    x = np.minimum(pos[:, 0] - radii, size_x - radii - pos[:, 0])
+    y = np.minimum(pos[:, 1] - radii, size_y - radii - pos[:, 1])
+    gap = np.where(top > END_WALL_HEIGHT_M, x, np.inf)
+    return np.where(top > SIDE_WALL_HEIGHT_M, np.minimum(gap, y), gap) # type:ignore
@@ -0,0 +1,79 @@
+""" firing solutions by range, from the sweep's output.
+
+the sweep (firing_models/sweep.py) finds the best muzzle velocity and elevation, and
+the chance of a hit, at ranges half a meter apart, a few tries each at a few
+precisions.  the tries at one precision are averaged into a table by range, and
+interpolated, once, into buckets a few centimeters wide.  every robot's range is
+looked up together, once a tick, so shooting costs about an index per robot.
+"""
+import csv
+import os
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from numpy.typing import NDArray
+from firing_models import constants
+
+SWEEP_OUTPUT = os.path.join(os.path.dirname(__file__), '..', 'firing_models',
+                            'simulation_output')
+# the sweep's middle precisions, see sweep_with_precision()
+GUN_PRECISION = 0.03
+RANGE_PRECISION = 0.04
+BUCKET_M = 0.05
+# where the sweep's shots start, above the floor
+FIRING_HEIGHT_M = constants.FIRING_HEIGHT_M
+
+Solution = Tuple[NDArray[np.float64], NDArray[np.float64]]
+
+class FiringSolutions:
+    def __init__(self, range_m: NDArray[np.float64], velocity_m_s: NDArray[np.float64],
+                 elevation_deg: NDArray[np.float64], p_hit: NDArray[np.float64],
+                 bucket_m: float = BUCKET_M) -> None:
+        """ the table, by increasing range; outside it, the nearest end is used """
+        if len(range_m) == 0:
+            raise ValueError("empty table")
+        if np.any(np.diff(range_m) <= 0):
+            raise ValueError("ranges must increase")
+        self.bucket_m = bucket_m
+        centers = np.arange(0, range_m[-1] + bucket_m, bucket_m)
+        self.velocity_m_s = np.interp(centers, range_m, velocity_m_s)
+        self.elevation_deg = np.interp(centers, range_m, elevation_deg)
+        self.p_hit = np.interp(centers, range_m, p_hit)
+
+    @classmethod
+    def from_sweep(cls, path: str = SWEEP_OUTPUT, gun_precision: float = GUN_PRECISION,
+                   range_precision: float = RANGE_PRECISION) -> 'FiringSolutions':
+        """ the mean of the sweep's tries at each range, at one precision """
+        rows: Dict[float, List[Tuple[float, float, float]]] = {}
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                if (np.isclose(float(row['gp']), gun_precision)
+                        and np.isclose(float(row['rp']), range_precision)):
+                    rows.setdefault(float(row['r']), []).append(
+                        (float(row['v']), float(row['l']), float(row['h'])))
+        if not rows:
+            raise ValueError(f"no sweep rows at precision {gun_precision} {range_precision}")
+        range_m = np.array(sorted(rows))
+        mean = np.array([np.mean(rows[r], axis=0) for r in range_m])
+        return cls(range_m, mean[:, 0], mean[:, 1], mean[:, 2])
+
+    def bucket(self, range_m: NDArray[np.float64]) -> NDArray[np.int64]:
+        return np.clip(np.rint(np.asarray(range_m) / self.bucket_m).astype(np.int64),
+                       0, len(self.p_hit) - 1)
+
+    def solve(self, range_m: NDArray[np.float64]) -> Solution:
+        """ velocity (m/s) and elevation (degrees) for each range (m) """
+        bucket = self.bucket(range_m)
+        return self.velocity_m_s[bucket], self.elevation_deg[bucket]
+
+    def chance(self, range_m: NDArray[np.float64]) -> NDArray[np.float64]:
+        """ p(hit) for each range (m), for reporting, the robots shoot regardless """
+        return self.p_hit[self.bucket(range_m)]
+
+_SOLUTIONS: Optional[FiringSolutions] = None
+
+def solutions() -> FiringSolutions:
+    """ the table from the sweep output in the repo, read once """
+    global _SOLUTIONS # pylint: disable=global-statement
+    if _SOLUTIONS is None:
+        _SOLUTIONS = FiringSolutions.from_sweep()
+    return _SOLUTIONS
@@ -0,0 +1,52 @@
+// puts the field back together from the frames sent by frames.py:
+// a keyframe has everything, the rest have only the changes, by id.
+// coordinates come as integers, and go back to meters here.
+class Frames {
+    constructor() {
+        this.reset();
+    }
+
+    reset() {
+        this.objects = new Map(); // id => portrayal, as sent
+        this.scales = {};
+        this.keyframe = true;
+        this.changed = []; // ids, in the last frame
+        this.removed = [];
+    }
+
+    // keeps track of what changed, see changed, removed and keyframe
+    update(frame) {
+        this.keyframe = frame.keyframe;
+        if (frame.keyframe) {
+            this.objects = new Map();
+            this.scales = frame.scales;
+        }
+        this.removed = frame.removed.map(String);
+        for (const id of this.removed) this.objects.delete(id);
+        this.changed = Object.keys(frame.changes);
+        for (const [id, change] of Object.entries(frame.changes)) {
+            var p = this.objects.get(id);
+            if (p === undefined) this.objects.set(id, Object.assign({}, change));
+            else Object.assign(p, change);
+        }
+    }
+
+    // returns all the portrayals, like the canvases used to get them
+    apply(frame) {
+        this.update(frame);
+        var result = [];
+        for (const id of this.objects.keys()) result.push(this.portrayal(id));
+        return result;
+    }
+
+    // in meters and radians, like the portrayal method made it
+    portrayal(id) {
+        var q = Object.assign({ id: Number(id) }, this.objects.get(id));
+        for (const [key, scale] of Object.entries(this.scales)) {
+            if (key in q) q[key] = q[key] / scale;
+        }
+        return q;
+    }
+}
+
+export { Frames };
@@ -0,0 +1,132 @@
+""" the canvases send changes, not the whole field, every tick.
+
+the first frame for a model is a keyframe, with every portrayal in full.  after that a
+frame has only what changed, by unique_id: the fields that differ for things that
+moved, whole portrayals for things that came back onto the field, and the ids of the
+ones that left.  coordinates and angles are sent as integers, in centimeters and
+milliradians, so tiny moves don't count as changes and the numbers are short.
+portrayals with "static" set, like the obstacles, are made once and never sent again.
+frames.js puts the field back together on the other end.
+
+the canvases are shared, so with more than one browser open each frame goes to
+whichever one asks first, and the others miss it.  so every frame also carries the
+whole field as it was, and each connection sends a keyframe made from that instead of
+changes to a frame it never got, see FrameSync.
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from mesa import Agent, Model # type: ignore
+from mesa.visualization.ModularVisualization import ModularServer, SocketHandler # type: ignore
+
+Portrayal = Dict[str, Any]
+
+# integer units per real one, the browser divides these back out
+SCALES: Dict[str, int] = {"x": 100, "y": 100, "z": 100, "angle": 1000}
+
+def quantise(portrayal: Portrayal) -> Portrayal:
+    for key, scale in SCALES.items():
+        if key in portrayal:
+            portrayal[key] = round(portrayal[key] * scale)
+    return portrayal
+
+class Frame(Dict[str, Any]):
+    """ what goes to the browser, plus what it takes to start over from here """
+    def __init__(self, n: int, state: Dict[int, Portrayal], **fields: Any) -> None:
+        """
+            n: counts the frames from one encoder
+            state: every portrayal on the field, by unique_id, not sent
+        """
+        super().__init__(fields)
+        self.n = n
+        self.state = state
+
+    def keyframe(self) -> 'Frame':
+        return Frame(self.n, self.state, keyframe=True, changes=self.state, removed=[],
+                     scales=SCALES)
+
+class FrameEncoder:
+    def __init__(self, portrayal_method: Callable[[Agent], Portrayal],
+                 axes: Tuple[str, ...] = ("x", "y")) -> None:
+        """
+            portrayal_method: makes the portrayal of one agent
+            axes: the names of the position coordinates to send
+        """
+        self.portrayal_method = portrayal_method
+        self.axes = axes
+        self.model: Optional[Model] = None
+        # what the browser has now, by unique_id
+        self.sent: Dict[int, Portrayal] = {}
+        self.static: Dict[int, Portrayal] = {}
+        self.n = 0
+
+    def portray(self, agent: Agent) -> Portrayal:
+        portrayal = self.static.get(agent.unique_id)
+        if portrayal is not None:
+            return portrayal
+        portrayal = self.portrayal_method(agent)
+        p = agent.pos
+        for k, axis in enumerate(self.axes):
+            portrayal[axis] = p[k]
+        quantise(portrayal)
+        if portrayal.get("static"):
+            self.static[agent.unique_id] = portrayal
+        return portrayal
+
+    def frame(self, model: Model) -> Frame:
+        """ a keyframe for a new model, otherwise the changes since the last frame """
+        keyframe = model is not self.model
+        if keyframe:
+            self.model = model
+            self.sent = {}
+            self.static = {}
+        changes: Dict[int, Portrayal] = {}
+        current: Dict[int, Portrayal] = {}
+        for agent in model.schedule.agents:
+            i = agent.unique_id
+            portrayal = self.portray(agent)
+            current[i] = portrayal
+            old = self.sent.get(i)
+            if old is None:
+                changes[i] = portrayal
+            elif old is not portrayal:
+                changed = {k: v for k, v in portrayal.items() if old.get(k) != v}
+                if changed:
+                    changes[i] = changed
+        removed: List[int] = [i for i in self.sent if i not in current]
+        self.sent = current
+        self.n += 1
+        frame = Frame(self.n, current, keyframe=keyframe, changes=changes, removed=removed)
+        if keyframe:
+            frame["scales"] = SCALES
+        return frame
+
+class FrameSync:
+    """ the last frame one connection got from each canvas """
+    def __init__(self) -> None:
+        self.last: Dict[int, int] = {}
+
+    def fit(self, data: List[Any]) -> List[Any]:
+        """ the rendered elements, with a keyframe for any canvas this connection fell
+        behind on, or hasn't had anything from yet """
+        fitted = []
+        for k, state in enumerate(data):
+            if isinstance(state, Frame):
+                if not state["keyframe"] and self.last.get(k) != state.n - 1:
+                    state = state.keyframe()
+                self.last[k] = state.n
+            fitted.append(state)
+        return fitted
+
+class FrameSocketHandler(SocketHandler): # type:ignore
+    """ keeps each browser's frames in step with what it has """
+    def open(self) -> None:
+        self.sync = FrameSync() # pylint: disable=attribute-defined-outside-init
+        super().open()
+
+    @property
+    def viz_state_message(self) -> Dict[str, Any]:
+        return {"type": "viz_state", "data": self.sync.fit(self.application.render_model())}
+
+class FrameServer(ModularServer): # type:ignore
+    """ ModularServer for more than one browser at a time """
+    handlers = [ModularServer.page_handler, (r"/ws", FrameSocketHandler),
+                ModularServer.static_handler, ModularServer.local_handler]
@@ -0,0 +1,149 @@
+""" models cargo entering the hub: the upper funnel, the lower ring, and the exits """
+from typing import List, Optional, Tuple
+import numpy as np
+from .agent import Cargo, ROBOT_HEIGHT_M
+from .bucket import Bucket
+from .delay import MultiDelay
+
+R3 = Tuple[float, float, float]
+
+# the upper hub opening is 122cm across, at 264cm.
+UPPER_HUB_HEIGHT_M = 2.64
+UPPER_HUB_RADIUS_M = 0.61
+# the outside of the upper hub, same as the obstacle
+UPPER_HUB_OUTER_RADIUS_M = 0.67
+# guessing from the game manual, same as the firing model
+FUNNEL_DEPTH_M = 0.8
+FUNNEL_BASE_RADIUS_M = 0.3
+FUNNEL_BASE_M = UPPER_HUB_HEIGHT_M - FUNNEL_DEPTH_M
+
+# the lower hub is the ring between the upper hub and the fenders
+LOWER_HUB_HEIGHT_M = 1.04
+LOWER_HUB_RADIUS_M = 0.86
+# only balls this close to the lower hub rim count as falling into it
+LOWER_HUB_CAPTURE_DEPTH_M = 0.25
+
+# the four exits, rotated like the obstacles in the model
+EXIT_ROTATION_RAD = 0.35
+EXIT_DISTANCE_M = 1.36 + 0.19 + 0.12 + 0.05 # outside the exit obstacle
+EXIT_SPEED_M_S = 2
+
+class Hub:
+    """ The hub at the center of the field.
+
+    Balls are found with one query on the space, so the per-tick cost depends on
+    the number of balls over the hub, not the number of balls in the air.
+    """
+    def __init__(self, center: R3, upper: MultiDelay[Cargo], lower: MultiDelay[Cargo]) -> None:
+        self.center = center
+        self.upper = upper
+        self.lower = lower
+        self.bucket = Bucket.make_bucket(FUNNEL_BASE_RADIUS_M, UPPER_HUB_RADIUS_M, FUNNEL_DEPTH_M)
+        self.upper_count: int = 0
+        self.lower_count: int = 0
+        self.exit: int = 0 # round robin, the next one to use
+
+    def local(self, p: R3, radius_m: float) -> R3:
+        """ ball center relative to the funnel base; agent z is the bottom of the ball """
+        return (p[0] - self.center[0], p[1] - self.center[1], p[2] + radius_m - FUNNEL_BASE_M)
+
+    def in_funnel(self, c: R3) -> bool:
+        """ ball center inside the funnel, or above it within the opening """
+        if c[2] <= 0:
+            return False
+        if c[2] > self.bucket.height:
+            return bool(np.hypot(c[0], c[1]) < UPPER_HUB_RADIUS_M)
+        return self.bucket.is_inside_cone(c)
+
+    def check(self, cargo: Cargo, dt: float) -> Optional[MultiDelay[Cargo]]:
+        """ bounce the cargo off the hub, return the delay it falls into, if any """
+        r = cargo.radius_m
+        c = self.local(cargo.pos, r)
+        if c[2] - r > self.bucket.height:
+            return None # above everything
+        v = cargo.velocity
+        rxy = np.hypot(c[0], c[1])
+        prev: R3 = (c[0] - v[0] * dt, c[1] - v[1] * dt, c[2] - v[2] * dt)
+        if self.in_funnel(c) or self.in_funnel(prev):
+            if c[2] - r <= 0:
+                return self.upper # reached the bottom
+            if rxy > 0.001 and c[2] <= self.bucket.height:
+                self.bounce_funnel(cargo, c)
+            return None
+        if rxy < UPPER_HUB_OUTER_RADIUS_M + r and cargo.pos[2] > ROBOT_HEIGHT_M:
+            if prev[2] - r >= self.bucket.height:
+                # landed on the rim
+                cargo._pos[2] = FUNNEL_BASE_M + self.bucket.height # pylint: disable=protected-access
+                cargo._velocity[2] = -v[2] * cargo.elasticity # pylint: disable=protected-access
+            else:
+                self.bounce_outside(cargo, c, rxy)
+            return None
+        if (UPPER_HUB_OUTER_RADIUS_M < rxy < LOWER_HUB_RADIUS_M and v[2] < 0
+            and LOWER_HUB_HEIGHT_M - LOWER_HUB_CAPTURE_DEPTH_M < cargo.pos[2] <= LOWER_HUB_HEIGHT_M):
+            return self.lower
+        return None
+
+    def bounce_funnel(self, cargo: Cargo, c: R3) -> None:
+        """ push the cargo back inside the funnel wall and reflect the normal velocity """
+        r = cargo.radius_m
+        d = self.bucket.distance(c) # positive inside
+        if d >= r:
+            return
+        n = self.bucket.unit_normal(c)
+        squish = r - d
+        cargo.pos = (cargo.pos[0] + squish * n[0],
+                     cargo.pos[1] + squish * n[1],
+                     cargo.pos[2] + squish * n[2])
+        v = cargo.velocity
+        vn = v[0] * n[0] + v[1] * n[1] + v[2] * n[2]
+        if vn < 0:
+            k = (1 + cargo.elasticity) * vn
+            cargo.velocity = (v[0] - k * n[0], v[1] - k * n[1], v[2] - k * n[2])
+
+    def bounce_outside(self, cargo: Cargo, c: R3, rxy: float) -> None:
+        """ push the cargo off the outside of the upper hub """
+        r = cargo.radius_m
+        nx = c[0] / rxy
+        ny = c[1] / rxy
+        squish = UPPER_HUB_OUTER_RADIUS_M + r - rxy
+        cargo.pos = (cargo.pos[0] + squish * nx, cargo.pos[1] + squish * ny, cargo.pos[2])
+        v = cargo.velocity
+        vn = v[0] * nx + v[1] * ny
+        if vn < 0:
+            k = (1 + cargo.elasticity) * vn
+            cargo.velocity = (v[0] - k * nx, v[1] - k * ny, v[2])
+
+    def step(self, model: 'Model') -> None: # type:ignore
+        """ collide and capture cargo over the hub """
+        captured: List[Tuple[Cargo, MultiDelay[Cargo]]] = []
+        # nothing lower than the lower hub capture zone can go in or bounce off
+        for item in model.space.get_neighbors(
+                self.center, LOWER_HUB_RADIUS_M + Cargo.RADIUS_M, False,
+                (LOWER_HUB_HEIGHT_M - LOWER_HUB_CAPTURE_DEPTH_M, np.inf), Cargo):
+            delay = self.check(item, model.seconds_per_step)
+            if delay is not None:
+                captured.append((item, delay))
+        for cargo, delay in captured:
+            model.space.remove_agent(cargo)
+            model.schedule.remove(cargo)
+            delay.put(cargo, model.model_time)
+            if delay is self.upper:
+                self.upper_count += 1
+            else:
+                self.lower_count += 1
+
+    def release(self, model: 'Model') -> None: # type:ignore
+        """ return scored cargo to the field through the exits """
+        k = 0 # further out if more than four come out at once
+        for delay in (self.upper, self.lower):
+            for cargo in delay.get_all(model.model_time):
+                angle = EXIT_ROTATION_RAD + self.exit * np.pi / 2
+                distance = EXIT_DISTANCE_M + (k // 4) * 2 * cargo.radius_m
+                self.exit = (self.exit + 1) % 4
+                k += 1
+                dx = -np.sin(angle)
+                dy = -np.cos(angle)
+                cargo.velocity = (EXIT_SPEED_M_S * dx, EXIT_SPEED_M_S * dy, 0)
+                model.space.place_agent(cargo, (self.center[0] + distance * dx,
+                                                self.center[1] + distance * dy, 0))
+                model.schedule.add(cargo)
@@ -0,0 +1,196 @@
+""" optional timing of the hot paths in the field simulation.
+
+nothing is wrapped until enable() is called, and disable() puts the original
+functions back, so there's no cost at all when it's off.
+
+    profiler = Profiler()
+    with profiler:
+        for _ in range(1000):
+            model.step()
+    print(profiler.report())
+    profiler.write_folded("profile.folded") # for flamegraph.pl or speedscope
+"""
+import functools
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from mesa.datacollection import DataCollector # type: ignore
+from mesa.time import RandomActivation # type: ignore
+from . import agent
+from .agent import Cargo, Obstacle, Robot, Thing
+from .delay import Delay, MultiDelay
+from .hub import Hub
+from .model import RobotFlockers
+from .space import LimitlessContinuous3dSpace
+
+# (owner, attribute, label)
+TARGETS: List[Tuple[Any, str, str]] = [
+    (RobotFlockers, 'step', 'step'),
+    (RobotFlockers, 'fast_forward', 'fast_forward'),
+    (RobotFlockers, 'behave', 'behave'),
+    (RobotFlockers, 'aim', 'aim'),
+    (RobotFlockers, 'fly_cargo', 'fly_cargo'),
+    (RandomActivation, 'step', 'agents'),
+    (Cargo, 'step', 'Cargo.step'),
+    (Robot, 'step', 'Robot.step'),
+    (Obstacle, 'step', 'Obstacle.step'),
+    (Hub, 'step', 'Hub.step'),
+    (Hub, 'release', 'Hub.release'),
+    (LimitlessContinuous3dSpace, 'get_neighbors', 'get_neighbors'),
+    (LimitlessContinuous3dSpace, 'get_agent_neighbors', 'get_agent_neighbors'),
+    (LimitlessContinuous3dSpace, 'get_nearest', 'get_nearest'),
+    (LimitlessContinuous3dSpace, 'get_intersecting', 'get_intersecting'),
+    (Thing, 'check_ball_collision', 'check_ball_collision'),
+    (agent, 'collide', 'collide'),
+    (agent, 'collide_pos', 'collide_pos'),
+    (agent, 'collide_cylindrical', 'collide_cylindrical'),
+    (agent, 'collide_pos_cylindrical', 'collide_pos_cylindrical'),
+    (Delay, 'get', 'Delay.get'),
+    (Delay, 'put', 'Delay.put'),
+    (MultiDelay, 'get', 'MultiDelay.get'),
+    (MultiDelay, 'get_all', 'MultiDelay.get_all'),
+    (MultiDelay, 'put', 'MultiDelay.put'),
+    (DataCollector, 'collect', 'collect'),
+]
+# these return lists of neighbors, which are counted
+NEIGHBOR_QUERIES = {'get_neighbors', 'get_agent_neighbors'}
+
+class Profiler:
+    def __init__(self) -> None:
+        self.calls: Dict[str, int] = {}
+        self.total_s: Dict[str, float] = {} # including the calls inside
+        self.self_s: Dict[str, float] = {} # excluding the calls inside
+        self.stacks: Dict[Tuple[str, ...], float] = {} # self time by call stack
+        # one row per step: (step, neighbor queries, neighbors found, most found)
+        self.neighbors: List[Tuple[int, int, int, int]] = []
+        self._queries: int = 0
+        self._found: int = 0
+        self._most: int = 0
+        self._stack: List[str] = []
+        self._inner_s: List[float] = [] # time spent in calls inside each open call
+        self._originals: List[Tuple[Any, str, Any]] = []
+
+    @property
+    def enabled(self) -> bool:
+        return len(self._originals) > 0
+
+    def enable(self) -> None:
+        if self.enabled:
+            return
+        for owner, attribute, label in TARGETS:
+            original = owner.__dict__[attribute]
+            self._originals.append((owner, attribute, original))
+            setattr(owner, attribute, self.wrap(original, label))
+
+    def disable(self) -> None:
+        for owner, attribute, original in reversed(self._originals):
+            setattr(owner, attribute, original)
+        self._originals = []
+
+    def __enter__(self) -> 'Profiler':
+        self.enable()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.disable()
+
+    def wrap(self, fn: Callable[..., Any], label: str) -> Callable[..., Any]:
+        profiler = self
+        @functools.wraps(fn)
+        def wrapped(*args: Any, **kwargs: Any) -> Any:
+            profiler._stack.append(label)
+            profiler._inner_s.append(0.0)
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            finally:
+                profiler.record(label, time.perf_counter() - start)
+            if label in NEIGHBOR_QUERIES:
+                profiler.record_neighbors(len(result))
+            elif label == 'step':
+                profiler.record_step(args[0].model_steps)
+            return result
+        return wrapped
+
+    def record(self, label: str, elapsed_s: float) -> None:
+        inner_s = self._inner_s.pop()
+        self.calls[label] = self.calls.get(label, 0) + 1
+        self.total_s[label] = self.total_s.get(label, 0) + elapsed_s
+        self.self_s[label] = self.self_s.get(label, 0) + elapsed_s - inner_s
+        stack = tuple(self._stack)
+        self.stacks[stack] = self.stacks.get(stack, 0) + elapsed_s - inner_s
+        self._stack.pop()
+        if self._inner_s:
+            self._inner_s[-1] += elapsed_s
+
+    def record_neighbors(self, found: int) -> None:
+        self._queries += 1
+        self._found += found
+        self._most = max(self._most, found)
+
+    def record_step(self, step: int) -> None:
+        self.neighbors.append((step, self._queries, self._found, self._most))
+        self._queries = 0
+        self._found = 0
+        self._most = 0
+
+    def report(self) -> str:
+        lines = [f"{'phase':<24}{'calls':>10}{'total s':>10}{'self s':>10}{'mean us':>10}"]
+        for label in sorted(self.total_s, key=lambda k: -self.total_s[k]):
+            calls = self.calls[label]
+            lines.append(f"{label:<24}{calls:>10}{self.total_s[label]:>10.3f}"
+                         f"{self.self_s[label]:>10.3f}{1e6 * self.total_s[label] / calls:>10.1f}")
+        if self.neighbors:
+            steps = len(self.neighbors)
+            queries = sum(row[1] for row in self.neighbors)
+            found = sum(row[2] for row in self.neighbors)
+            lines.append(f"neighbors: {queries / steps:.1f} queries per step, "
+                         f"{found / max(queries, 1):.1f} found per query, "
+                         f"{max(row[3] for row in self.neighbors)} most found")
+        return "\n".join(lines)
+
+    def csv(self) -> str:
+        lines = ["phase,calls,total_s,self_s"]
+        for label in sorted(self.total_s):
+            lines.append(f"{label},{self.calls[label]},{self.total_s[label]:.6f},"
+                         f"{self.self_s[label]:.6f}")
+        return "\n".join(lines) + "\n"
+
+    def neighbors_csv(self) -> str:
+        lines = ["step,queries,found,most"]
+        lines.extend(",".join(str(x) for x in row) for row in self.neighbors)
+        return "\n".join(lines) + "\n"
+
+    def folded(self) -> str:
+        """ collapsed stacks with self time in microseconds, one per line """
+        return "".join(f"{';'.join(stack)} {round(1e6 * s)}\n"
+                       for stack, s in sorted(self.stacks.items()) if round(1e6 * s) > 0)
+
+    def write_csv(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.csv())
+
+    def write_neighbors_csv(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.neighbors_csv())
+
+    def write_folded(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.folded())
+
+def run(steps: int, prefix: Optional[str] = None) -> Profiler:
+    """ profile a match; python -m frc.instrument [steps] [output prefix] """
+    model = RobotFlockers()
+    profiler = Profiler()
+    with profiler:
+        for _ in range(steps):
+            model.step()
+    if prefix is not None:
+        profiler.write_csv(prefix + ".csv")
+        profiler.write_neighbors_csv(prefix + "_neighbors.csv")
+        profiler.write_folded(prefix + ".folded")
+    return profiler
+
+if __name__ == '__main__':
+    print(run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000,
+              sys.argv[2] if len(sys.argv) > 2 else None).report())
@@ -0,0 +1,22 @@
+""" compiles the hot little functions with numba, if it's installed.
+
+numba isn't a requirement: without it, or with FRC_NO_JIT set in the environment,
+jit() hands back the function as it is, so the same source runs as plain python.
+functions for jit() should stick to floats, ints and tuples of them.
+"""
+import os
+from typing import Any, Callable, TypeVar
+
+try:
+    import numba # type: ignore
+except ImportError:
+    numba = None
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+ENABLED: bool = numba is not None and not os.environ.get("FRC_NO_JIT")
+
+def jit(f: F) -> F:
+    if not ENABLED:
+        return f
+    return numba.njit(cache=True)(f) # type: ignore
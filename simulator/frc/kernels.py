@@ -0,0 +1,96 @@
+""" the collision calculations in collision.py, in plain float arithmetic.
+
+numpy takes much longer to get started on a 3-tuple than to do the sums, so these do
+the same sums one float at a time, and numba compiles them if it's there (see
+jit.py).  the agents use these; collision.py stays as the reference they're tested
+against.  results are tuples.
+"""
+import math
+from typing import Tuple
+from .jit import jit
+
+R3 = Tuple[float, float, float]
+
+@jit
+def overlap(p1: R3, p2: R3, r1: float, r2: float) -> bool:
+    dx = p1[0] - p2[0]
+    dy = p1[1] - p2[1]
+    dz = p1[2] - p2[2]
+    return math.sqrt(dx * dx + dy * dy + dz * dz) < r1 + r2
+
+@jit
+def unit(dx: float, dy: float, dz: float) -> R3:
+    """ nan for zero, like numpy """
+    d = math.sqrt(dx * dx + dy * dy + dz * dz)
+    if d == 0:
+        return (math.nan, math.nan, math.nan)
+    return (dx / d, dy / d, dz / d)
+
+@jit
+def collide_int(v1: R3, m1: float, v2: R3, m2: float, elasticity: float,
+                n: R3) -> Tuple[R3, R3]:
+    """ n is the unit normal """
+    before_1 = v1[0] * n[0] + v1[1] * n[1] + v1[2] * n[2]
+    before_2 = v2[0] * n[0] + v2[1] * n[1] + v2[2] * n[2]
+    if math.isinf(m1):
+        after_1 = before_1
+        after_2 = - before_2 * elasticity + (elasticity + 1) * before_1
+    elif math.isinf(m2):
+        after_1 = - before_1 * elasticity + (elasticity + 1) * before_2
+        after_2 = before_2
+    else:
+        after_1 = ((before_1 * (m1 - elasticity * m2))
+                   + ((elasticity + 1) * m2 * before_2)) / (m1 + m2)
+        after_2 = ((before_2 * (m2 - elasticity * m1))
+                   + ((elasticity + 1) * m1 * before_1)) / (m1 + m2)
+    # the tangent part stays, the normal part changes
+    t1 = (v1[0] - before_1 * n[0], v1[1] - before_1 * n[1], v1[2] - before_1 * n[2])
+    t2 = (v2[0] - before_2 * n[0], v2[1] - before_2 * n[1], v2[2] - before_2 * n[2])
+    return ((after_1 * n[0] + t1[0], after_1 * n[1] + t1[1], after_1 * n[2] + t1[2]),
+            (after_2 * n[0] + t2[0], after_2 * n[1] + t2[1], after_2 * n[2] + t2[2]))
+
+@jit
+def collide(p1: R3, v1: R3, m1: float, e1: float,
+            p2: R3, v2: R3, m2: float, e2: float) -> Tuple[R3, R3]:
+    n = unit(p2[0] - p1[0], p2[1] - p1[1], p2[2] - p1[2])
+    return collide_int(v1, m1, v2, m2, max(e1, e2), n)
+
+@jit
+def collide_cylindrical(p1: R3, v1: R3, m1: float, e1: float,
+                        p2: R3, v2: R3, m2: float, e2: float) -> Tuple[R3, R3]:
+    n = unit(p2[0] - p1[0], p2[1] - p1[1], 0.0) # ignore z displacement
+    return collide_int(v1, m1, v2, m2, max(e1, e2), n)
+
+@jit
+def collide_pos_int(p1: R3, m1: float, r1: float, p2: R3, m2: float, r2: float,
+                    displacement: R3, n: R3) -> Tuple[R3, R3]:
+    min_distance = r1 + r2
+    sx = min_distance * n[0] - displacement[0]
+    sy = min_distance * n[1] - displacement[1]
+    sz = min_distance * n[2] - displacement[2]
+    if math.isinf(m1):
+        k1 = 0.0
+        k2 = 1.0
+    elif math.isinf(m2):
+        k1 = 1.0
+        k2 = 0.0
+    else:
+        # scale the fix-up by mass
+        k1 = m2 / (m1 + m2)
+        k2 = m1 / (m1 + m2)
+    return ((p1[0] - k1 * sx, p1[1] - k1 * sy, p1[2] - k1 * sz),
+            (p2[0] + k2 * sx, p2[1] + k2 * sy, p2[2] + k2 * sz))
+
+@jit
+def collide_pos(p1: R3, m1: float, r1: float,
+                p2: R3, m2: float, r2: float) -> Tuple[R3, R3]:
+    displacement = (p2[0] - p1[0], p2[1] - p1[1], p2[2] - p1[2])
+    n = unit(displacement[0], displacement[1], displacement[2])
+    return collide_pos_int(p1, m1, r1, p2, m2, r2, displacement, n)
+
+@jit
+def collide_pos_cylindrical(p1: R3, m1: float, r1: float,
+                            p2: R3, m2: float, r2: float) -> Tuple[R3, R3]:
+    displacement = (p2[0] - p1[0], p2[1] - p1[1], 0.0) # ignore z displacement
+    n = unit(displacement[0], displacement[1], 0.0)
+    return collide_pos_int(p1, m1, r1, p2, m2, r2, displacement, n)
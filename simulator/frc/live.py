@@ -0,0 +1,184 @@
+""" the visualization with the model running on its own thread.
+
+normally the browser asks for each step, and the server runs it and renders it, so a
+slow browser slows the model down, and the model can't go faster than the browser
+draws.  here a worker steps the model at its own pace, real time or as fast as it
+can, and puts frames in a short queue for the browser to take.  when the queue is
+full the worker just doesn't render that tick, so the next frame it makes has the
+changes since the last one that went out, and nothing is lost.
+
+    $ python3 run.py --live      # real time
+    $ python3 run.py --live 0    # as fast as possible
+"""
+import queue
+import threading
+import time
+from typing import Any, Callable, List, Optional
+import tornado.escape
+import tornado.ioloop
+from mesa import Model # type: ignore
+from mesa.visualization.ModularVisualization import ModularServer # type: ignore
+from mesa.visualization.modules import TextElement # type: ignore
+from .frames import FrameSocketHandler
+
+# the queue says the model stopped with this
+END = None
+
+class ModelWorker:
+    def __init__(self, model: Model, render: Callable[[], Any],
+                 ticks_per_second: Optional[float] = None, queue_size: int = 2) -> None:
+        """
+            render: makes a frame of the model as it is now
+            ticks_per_second: the pace, None or zero for as fast as possible
+            queue_size: frames ready to go, the rest aren't made
+        """
+        if queue_size < 1:
+            raise ValueError(f"queue_size {queue_size} < 1")
+        self.model = model
+        self.render = render
+        self.ticks_per_second = ticks_per_second
+        self.frames: queue.Queue[Any] = queue.Queue(queue_size)
+        self.ticks = 0
+        self.made = 0 # frames put in the queue
+        self.delivered = 0 # frames taken out
+        self.skipped = 0 # ticks not rendered because the queue was full
+        self.start_time = time.perf_counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self) -> None:
+        self.start_time = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        # put() gives up once stopped, so make room for END here, or anyone waiting in
+        # next_frame() waits forever
+        while True:
+            try:
+                self.frames.get_nowait()
+            except queue.Empty:
+                break
+        self.frames.put_nowait(END)
+
+    def put(self, frame: Any) -> bool:
+        """ wait for room, unless stopped """
+        while not self._stop.is_set():
+            try:
+                self.frames.put(frame, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def run(self) -> None:
+        if not self.put(self.render()):
+            return
+        self.made += 1
+        next_time = time.perf_counter()
+        behind = False
+        while not self._stop.is_set() and self.model.running:
+            self.model.step()
+            self.ticks += 1
+            behind = self.frames.full()
+            if behind:
+                self.skipped += 1
+            else:
+                self.frames.put(self.render())
+                self.made += 1
+            if self.ticks_per_second:
+                next_time = max(next_time + 1 / self.ticks_per_second, time.perf_counter() - 1)
+                self._stop.wait(max(0, next_time - time.perf_counter()))
+        # the browser should end up with the last tick
+        if behind and self.put(self.render()):
+            self.made += 1
+        self.put(END)
+
+    def next_frame(self, timeout: Optional[float] = None) -> Any:
+        """ the oldest frame not taken yet, waiting for one if need be; END at the end """
+        frame = self.frames.get(timeout=timeout)
+        if frame is END:
+            # leave it there for anyone else waiting
+            try:
+                self.frames.put_nowait(END)
+            except queue.Full:
+                pass
+        else:
+            self.delivered += 1
+        return frame
+
+    @property
+    def ticks_per_s(self) -> float:
+        return self.ticks / max(time.perf_counter() - self.start_time, 1e-9)
+
+    @property
+    def frames_per_s(self) -> float:
+        return self.delivered / max(time.perf_counter() - self.start_time, 1e-9)
+
+    def report(self) -> str:
+        return (f"{self.ticks_per_s:.0f} ticks/s, {self.frames_per_s:.0f} frames/s delivered, "
+                f"{self.skipped} ticks not rendered")
+
+class PaceText(TextElement): # type:ignore
+    """ how the worker is keeping up """
+    def __init__(self) -> None:
+        super().__init__()
+        self.worker: Optional[ModelWorker] = None
+
+    def render(self, model: Model) -> str:
+        if self.worker is None:
+            return ""
+        return self.worker.report()
+
+class LiveSocketHandler(FrameSocketHandler):
+    """ takes frames from the worker instead of stepping the model.  with more than one
+    browser they take turns at the queue, see frames.FrameSync """
+    async def next_frame(self) -> Any:
+        """ off the ioloop, and from the new worker if the model was reset meanwhile """
+        loop = tornado.ioloop.IOLoop.current()
+        while True:
+            worker = self.application.worker
+            frame = await loop.run_in_executor(None, worker.next_frame)
+            if frame is not END or worker is self.application.worker:
+                return frame
+
+    async def on_message(self, message: str) -> None:
+        msg = tornado.escape.json_decode(message)
+        if msg["type"] == "get_step":
+            frame = await self.next_frame()
+            if frame is END:
+                self.write_message({"type": "end"})
+            else:
+                self.write_message({"type": "viz_state", "data": self.sync.fit(frame)})
+        elif msg["type"] == "reset":
+            self.application.reset_model()
+            frame = await self.next_frame()
+            self.write_message({"type": "viz_state", "data": self.sync.fit(frame)})
+        else:
+            super().on_message(message)
+
+class LiveServer(ModularServer): # type:ignore
+    handlers = [ModularServer.page_handler, (r"/ws", LiveSocketHandler),
+                ModularServer.static_handler, ModularServer.local_handler]
+
+    def __init__(self, model_cls: Any, visualization_elements: List[Any],
+                 name: str = "Mesa Model", model_params: Optional[dict] = None,
+                 ticks_per_second: Optional[float] = None, queue_size: int = 2) -> None:
+        """ like ModularServer, plus the worker's pace and queue size, see ModelWorker """
+        self.ticks_per_second = ticks_per_second
+        self.queue_size = queue_size
+        self.worker: Optional[ModelWorker] = None
+        self.pace_text = PaceText()
+        super().__init__(model_cls, visualization_elements + [self.pace_text], name,
+                         model_params or {})
+
+    def reset_model(self) -> None:
+        if self.worker is not None:
+            self.worker.stop()
+        super().reset_model()
+        self.worker = ModelWorker(self.model, self.render_model, self.ticks_per_second,
+                                  self.queue_size)
+        self.pace_text.worker = self.worker
+        self.worker.start()
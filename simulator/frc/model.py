@@ -1,28 +1,81 @@
-from typing import Optional, Tuple
+from typing import Any, List, Optional, Tuple
 import numpy as np
 from mesa import Model # type: ignore
 #from mesa.space import ContinuousSpace # type: ignore
 from mesa.time import RandomActivation # type: ignore
 from mesa.datacollection import DataCollector # type: ignore
-#from numpy.typing import NDArray # no shape indicator
-from .agent import Cargo, Obstacle, Robot
+from firing_models.ballistics import accelerate
+from numpy.typing import NDArray
+from .agent import (Cargo, Obstacle, Robot, Thing, INTAKE_RADIUS_M, DRIVE_NOISE_M_S,
+                    DRIVE_SPEED_M_S, INTAKE_HEIGHT_M, ROBOT_HEIGHT_M, shot_range_m)
 from .alliance import Alliance
-from .collision import overlap
-from .delay import Delay
+from .behaviour import (ENDGAME_S, HANGAR_TOLERANCE_M, HANGARS_M, SHOOTING_RANGE_M,
+                        plan)
+from .delay import MultiDelay
+from .fastforward import clear_steps, distances, free_step, speed_limits, wall_gaps
+from .firing import solutions
+from .hub import Hub, LOWER_HUB_CAPTURE_DEPTH_M, LOWER_HUB_HEIGHT_M
+from .navigation import NAVIGATORS, Goals, Navigator
+from .placement import DiskPlacer, Region
+from .snapshot import Snapshot, fork, restore
 from .space import LimitlessContinuous3dSpace
+from .template import TEMPLATES, FieldTemplate
 
 R3 = Tuple[float, float, float]
 
 X_MAX_M: float = 16.46
 Y_MAX_M: float = 8.23
 Z_MAX_M: float = 10
+# cargo this close to the terminal corners gets put in the terminal
+TERMINAL_RADIUS_M: float = 1.75
+BLUE_TERMINAL: R3 = (0, Y_MAX_M, 0)
+RED_TERMINAL: R3 = (X_MAX_M, 0, 0)
+# cargo released together is spread out by this much, so it doesn't overlap
+RELEASE_SPACING_M: float = 0.3
+# the game has eleven balls per alliance, with these ids; any extras are numbered
+# from the extra ids so they don't run into the obstacles.
+CARGO_PER_ALLIANCE: int = 11
+RED_CARGO_ID: int = 100
+BLUE_CARGO_ID: int = 200
+RED_EXTRA_CARGO_ID: int = 10000
+BLUE_EXTRA_CARGO_ID: int = 20000
+# where robots drive to, see make_navigator()
+GOALS: Goals = {
+    'hub': ((X_MAX_M/2, Y_MAX_M/2), SHOOTING_RANGE_M),
+    'red_hangar': ((HANGARS_M[0, 0], HANGARS_M[0, 1]), HANGAR_TOLERANCE_M),
+    'blue_hangar': ((HANGARS_M[1, 0], HANGARS_M[1, 1]), HANGAR_TOLERANCE_M),
+    'red_terminal': ((RED_TERMINAL[0], RED_TERMINAL[1]), TERMINAL_RADIUS_M + Robot.RADIUS_M),
+    'blue_terminal': ((BLUE_TERMINAL[0], BLUE_TERMINAL[1]), TERMINAL_RADIUS_M + Robot.RADIUS_M),
+}
+
+# behaviour.plan() codes
+ALLIANCE_CODES = {Alliance.RED: 0, Alliance.BLUE: 1}
+
+def cargo_id(first: int, extra: int, k: int) -> int:
+    """ the id of the kth ball of an alliance """
+    if k < CARGO_PER_ALLIANCE:
+        return first + k
+    return extra + k
 
 class RobotFlockers(Model): # type:ignore
-    def __init__(self) -> None:
+    def __init__(self, collect_period: int = 1, seed: Optional[int] = None,
+                 cargo_per_alliance: int = CARGO_PER_ALLIANCE, traffic: bool = False) -> None:
+        """
+            collect_period: steps between datacollector samples
+            seed: for repeatable runs, of mesa's generator and the model's own rng
+            cargo_per_alliance: more than the game has, for scaling tests
+            traffic: robots standing still block the way for the others, see behave()
+        """
         super().__init__()
+        # the noise, this model's own, so forks and other models don't share it
+        self.rng = np.random.default_rng(seed)
+        self.collect_period = collect_period
+        self.cargo_per_alliance = cargo_per_alliance
         self.schedule = RandomActivation(self)
         self.space = LimitlessContinuous3dSpace()
         self.make_agents()
+        self.traffic = traffic
+        self.navigator = self.make_navigator()
         # datacollector member is needed for charts
         self.datacollector = DataCollector(
             model_reporters = { # key: variable name, value: function
@@ -30,7 +83,9 @@ class RobotFlockers(Model): # type:ignore
                 "mean_speed": lambda m: m.mean_speed,
                 "blue_terminal_population": lambda m: m.blue_terminal.length,
                 "red_terminal_population": lambda m: m.red_terminal.length,
-                "out_of_bounds_population": lambda m: m.out_of_bounds.length
+                "out_of_bounds_population": lambda m: m.out_of_bounds.length,
+                "upper_hub_count": lambda m: m.hub.upper_count,
+                "lower_hub_count": lambda m: m.hub.lower_count
             },
             agent_reporters = {
                 "speed": lambda a: a.speed # time series doesn't work for agent data
@@ -38,16 +93,17 @@ class RobotFlockers(Model): # type:ignore
         )
 
         # terminal retrieval is a five-second task, two workers
-        self.blue_terminal: Delay[Cargo] = Delay(5, 2/5)
-        self.red_terminal: Delay[Cargo] = Delay(5, 2/5)
+        self.blue_terminal: MultiDelay[Cargo] = MultiDelay(5, 2/5, 2)
+        self.red_terminal: MultiDelay[Cargo] = MultiDelay(5, 2/5, 2)
         # manual says return in 5 seconds, four shallow ramps though
-        self.lower_hub: Delay[Cargo] = Delay(5, 4/5)
+        self.lower_hub: MultiDelay[Cargo] = MultiDelay(5, 4/5, 4)
         # manual says return in 7 seconds, four shallow ramps though
-        self.upper_hub: Delay[Cargo] = Delay(7, 4/7)
+        self.upper_hub: MultiDelay[Cargo] = MultiDelay(7, 4/7, 4)
+        self.hub = Hub((X_MAX_M/2, Y_MAX_M/2, 0), self.upper_hub, self.lower_hub)
 
         # TODO: make wall collisions respect altitude
         # TODO: do this as four separate delays
-        self.out_of_bounds: Delay[Cargo] = Delay(5, 2/5)
+        self.out_of_bounds: MultiDelay[Cargo] = MultiDelay(5, 2/5, 2)
 
         self.running = True
         self.datacollector.collect(self)
@@ -68,23 +124,23 @@ class RobotFlockers(Model): # type:ignore
     def model_time(self) -> float:
         return self.model_steps * self.seconds_per_step
 
-    def is_overlapping(self, pos: R3, r: float) -> bool:
+    def placer(self) -> DiskPlacer:
+        """ for putting more things down at random, around what's there now """
+        placer = DiskPlacer(self.random)
         for a in self.space._agent_to_index: # pylint: disable=protected-access
-            if overlap(pos, a.pos, r, a.radius_m):
-                return True
-        return False
+            placer.add(a.pos[0], a.pos[1], a.radius_m)
+        return placer
 
-    # TODO: lower height too, for upper hub
     def place_obstacle(self, i: int, pos: R3,
-        radius_m: float, z_height_m: float) -> None:
-        obstacle = Obstacle(i, self, pos, radius_m, z_height_m)
+        radius_m: float, z_height_m: float, contact_height_m: Optional[float] = None) -> None:
+        obstacle = Obstacle(i, self, pos, radius_m, z_height_m, contact_height_m)
         self.space.place_agent(obstacle, pos)
         self.schedule.add(obstacle)
 
     def place_robot(self, i: int, pos: R3,
         alliance: Alliance) -> None:
         robot = Robot(i, self, pos, alliance)
-        v = np.random.normal(loc=0.00, scale=0.5, size=2)
+        v = self.rng.normal(loc=0.00, scale=0.5, size=2)
         robot.velocity = (v[0], v[1], 0)
         self.space.place_agent(robot, pos)
         self.schedule.add(robot)
@@ -92,19 +148,41 @@ class RobotFlockers(Model): # type:ignore
     def place_cargo(self, i: int, pos: R3,
         alliance: Alliance) -> None:
         cargo = Cargo(i, self, pos, alliance)
-        v = np.random.normal(loc=0.00, scale=0.5, size=2)
+        v = self.rng.normal(loc=0.00, scale=0.5, size=2)
         cargo.velocity = (v[0], v[1], 0)
         self.space.place_agent(cargo, pos)
         self.schedule.add(cargo)
 
-    def make_agents(self) -> None:
+    def make_field(self) -> None:
+        """ the obstacles, made by the first model of each class and copied after that """
+        template = TEMPLATES.get(type(self))
+        if template is None:
+            self.make_obstacles()
+            TEMPLATES[type(self)] = FieldTemplate(list(self.schedule.agents))
+        else:
+            template.stamp(self)
+
+    def make_navigator(self) -> Navigator:
+        """ the flow fields around the obstacles, worked out by the first model of each
+        class, like make_field() """
+        navigator = NAVIGATORS.get(type(self))
+        if navigator is None:
+            obstacles = [(a.pos[0], a.pos[1], a.radius_m) for a in self.schedule.agents
+                         if isinstance(a, Obstacle)]
+            navigator = Navigator((X_MAX_M, Y_MAX_M), obstacles, Robot.RADIUS_M, GOALS)
+            NAVIGATORS[type(self)] = navigator
+        return navigator.copy()
+
+    def make_obstacles(self) -> None:
         # the hub is several obstacles
         # rotate 20 degrees ccw
         ctr: R3 = (X_MAX_M/2, Y_MAX_M/2, 0)
-        # one for the lower hub and fenders
-        self.place_obstacle(300, ctr, 0.86, 1.04)
+        # one for the lower hub and fenders; above the capture ring, the hub catches
+        self.place_obstacle(300, ctr, 0.86, 1.04,
+                            LOWER_HUB_HEIGHT_M - LOWER_HUB_CAPTURE_DEPTH_M)
         # one for the upper hub
-        self.place_obstacle(301, ctr, 0.67, 2.64) # opening is 122, rim is 6
+        # opening is 122, rim is 6; above robots, the hub does the bouncing.
+        self.place_obstacle(301, ctr, 0.67, 2.64, ROBOT_HEIGHT_M)
         # lower exits
         rot_rad: float = 0.35
         o_m: float = 1.36
@@ -152,82 +230,293 @@ class RobotFlockers(Model): # type:ignore
             self.place_obstacle(i, (X_MAX_M -T_D + p, p, 0), T_R, 0.3)
             i += 1
 
+    def make_agents(self) -> None:
+        self.make_field()
+        placer = self.placer()
         # red robots
+        red: Region = (X_MAX_M / 2 + 2, 1, X_MAX_M - 1, Y_MAX_M - 1)
         for i in range(0, 3):
-            while True: # avoid overlap
-                x = X_MAX_M / 2 + 2 + self.random.random() * (X_MAX_M/2 - 3)
-                y = 1 + self.random.random() * (Y_MAX_M - 2)
-                pos: R3 = (x, y, 0)
-                if not self.is_overlapping(pos, 0.5):
-                    break
-            self.place_robot(i, pos, Alliance.RED)
+            x, y = placer.place(red, Robot.RADIUS_M)
+            self.place_robot(i, (x, y, 0), Alliance.RED)
 
         # blue robots
+        blue: Region = (1, 1, X_MAX_M / 2 - 2, Y_MAX_M - 1)
         for i in range(10, 13):
-            while True: # avoid overlap
-                x = 1 + self.random.random() * (X_MAX_M/2 - 3)
-                y = 1 + self.random.random() * (Y_MAX_M - 2)
-                pos = (x, y, 0)
-                if not self.is_overlapping(pos, 0.5):
-                    break
-            self.place_robot(i, pos, Alliance.BLUE)
+            x, y = placer.place(blue, Robot.RADIUS_M)
+            self.place_robot(i, (x, y, 0), Alliance.BLUE)
 
         # red cargo
-        for i in range(100,111):
-            while True: # avoid overlap
-                x = 1 + self.random.random() * (X_MAX_M - 2)
-                y = 1 + self.random.random() * (Y_MAX_M - 2)
-                pos = (x, y, 0)
-                if not self.is_overlapping(pos, 0.12):
-                    break
-            self.place_cargo(i, pos, Alliance.RED)
+        for k in range(self.cargo_per_alliance):
+            self.place_random_cargo(cargo_id(RED_CARGO_ID, RED_EXTRA_CARGO_ID, k), Alliance.RED,
+                                    placer)
 
         # blue cargo
-        for i in range(200,211):
-            while True: # avoid overlap
-                x = 1 + self.random.random() * (X_MAX_M - 2)
-                y = 1 + self.random.random() * (Y_MAX_M - 2)
-                pos = (x, y, 0)
-                if not self.is_overlapping(pos, 0.12):
-                    break
-            self.place_cargo(i, pos, Alliance.BLUE)
+        for k in range(self.cargo_per_alliance):
+            self.place_random_cargo(cargo_id(BLUE_CARGO_ID, BLUE_EXTRA_CARGO_ID, k), Alliance.BLUE,
+                                    placer)
+
+    def place_random_cargo(self, i: int, alliance: Alliance, placer: DiskPlacer) -> None:
+        x, y = placer.place((1, 1, X_MAX_M - 1, Y_MAX_M - 1), Cargo.RADIUS_M)
+        self.place_cargo(i, (x, y, 0), alliance)
+
+    def release(self, delay: MultiDelay[Cargo], pos: R3, velocity: R3) -> None:
+        """ put all the ready cargo back on the field, spaced out along the velocity """
+        speed = np.hypot(velocity[0], velocity[1])
+        for k, cargo in enumerate(delay.get_all(self.model_time)):
+            offset = k * RELEASE_SPACING_M / speed
+            cargo.velocity = velocity
+            self.space.place_agent(cargo, (pos[0] + offset * velocity[0],
+                                           pos[1] + offset * velocity[1], pos[2]))
+            self.schedule.add(cargo)
 
     def step(self) -> None:
         # move balls into terminal delays
-        for item in self.space.get_neighbors((0, Y_MAX_M, 0), 1.75, False): # blue terminal
-            if isinstance(item, Cargo):
-                self.space.remove_agent(item)
-                self.schedule.remove(item)
-                self.blue_terminal.put(item, self.model_time)
-        for item in self.space.get_neighbors((X_MAX_M, 0, 0), 1.75, False): # red terminal
-            if isinstance(item, Cargo):
-                self.space.remove_agent(item)
-                self.schedule.remove(item)
-                self.red_terminal.put(item, self.model_time)
+        for item in self.space.get_neighbors(BLUE_TERMINAL, TERMINAL_RADIUS_M, False, kind=Cargo):
+            self.space.remove_agent(item)
+            self.schedule.remove(item)
+            self.blue_terminal.put(item, self.model_time)
+        for item in self.space.get_neighbors(RED_TERMINAL, TERMINAL_RADIUS_M, False, kind=Cargo):
+            self.space.remove_agent(item)
+            self.schedule.remove(item)
+            self.red_terminal.put(item, self.model_time)
+        # catch balls in the hub, and bounce the ones that miss
+        self.hub.step(self)
         # spit out any available cargo
         # ramp potential energy is ~0.5J, which is 2m/s, probably an overestimate, but human
         # players can also add energy
         # TODO: add altitude here
-        bc: Optional[Cargo] = self.blue_terminal.get(self.model_time)
-        if bc is not None:
-            bc.velocity = (2, -2, 0)
-            self.space.place_agent(bc, (2, Y_MAX_M - 2, 1.57))
-            self.schedule.add(bc)
-        rc: Optional[Cargo] = self.red_terminal.get(self.model_time)
-        if rc is not None:
-            rc.velocity = (-2, 2, 0)
-            self.space.place_agent(rc, (X_MAX_M - 2, 2, 1.57))
-            self.schedule.add(rc)
-        oc: Optional[Cargo] = self.out_of_bounds.get(self.model_time)
-        if oc is not None:
-            # TODO: re-enter somewhere close to where you went out
-            # FIXME for now just duplicate one of the terminals
-            oc.velocity = (-2, 2, 0)
-            self.space.place_agent(oc, (X_MAX_M - 2, 2, 1.57))
-            self.schedule.add(oc)
+        self.release(self.blue_terminal, (2, Y_MAX_M - 2, 1.57), (2, -2, 0))
+        self.release(self.red_terminal, (X_MAX_M - 2, 2, 1.57), (-2, 2, 0))
+        # TODO: re-enter somewhere close to where you went out
+        # FIXME for now just duplicate one of the terminals
+        self.release(self.out_of_bounds, (X_MAX_M - 2, 2, 1.57), (-2, 2, 0))
+        self.hub.release(self)
 
+        self.behave()
+        self.aim()
+        self.fly_cargo()
         self.schedule.step()
-        self.datacollector.collect(self)
+        if self.model_steps % self.collect_period == 0:
+            self.datacollector.collect(self)
+
+    def behave(self) -> None:
+        """ every robot's next state, and its part of the plan for this tick, all at once,
+        see behaviour.plan() """
+        robots = [a for a in self.schedule.agents if isinstance(a, Robot)]
+        if not robots:
+            return
+        cargo = [a for a in self.schedule.agents if isinstance(a, Cargo)]
+        self.put_plan(robots, *self.plan_match(
+            self.model_time,
+            np.array([a.state for a in robots], dtype=np.int64),
+            np.array([a._pos[:2] for a in robots], dtype=float), # pylint: disable=protected-access
+            np.array([ALLIANCE_CODES[a.alliance] for a in robots], dtype=np.int8),
+            np.array([(a.slot1 is not None) + (a.slot2 is not None) for a in robots]),
+            np.array([a._pos for a in cargo], dtype=float).reshape(-1, 3), # pylint: disable=protected-access
+            np.array([ALLIANCE_CODES[a.alliance] for a in cargo], dtype=np.int8),
+            np.array([a.heading is None for a in robots])))
+
+    def plan_match(self, t: float, state: NDArray[np.int64], robot_xy: NDArray[np.float64],
+                   robot_alliance: NDArray[np.int8], held: NDArray[np.int64],
+                   cargo_pos: NDArray[np.float64], cargo_alliance: NDArray[np.int8],
+                   still: NDArray[np.bool_]) -> Tuple[NDArray[Any], ...]:
+        """ behaviour.plan() for just this match, so (R,) for (M, R) and so on, with
+        cargo_pos (C, 3).  if there's traffic, the robots that were still, the ones that
+        weren't going anywhere last time, are in the way. """
+        if self.traffic:
+            self.navigator.block(robot_xy[still])
+        return tuple(x[0] for x in plan(
+            state[np.newaxis], t, robot_xy[np.newaxis], robot_alliance, held[np.newaxis],
+            cargo_pos[np.newaxis, :, :2], cargo_alliance,
+            cargo_pos[np.newaxis, :, 2] <= INTAKE_HEIGHT_M, self.navigator))
+
+    def put_plan(self, robots: List[Robot], state: NDArray[np.int64],
+                 heading: NDArray[np.float64], driving: NDArray[np.bool_],
+                 intaking: NDArray[np.bool_], shooting: NDArray[np.bool_]) -> None:
+        """ plan_match() into the robots """
+        for k, a in enumerate(robots):
+            a.state = int(state[k])
+            a.heading = (float(heading[k, 0]), float(heading[k, 1])) if driving[k] else None
+            a.intaking = bool(intaking[k])
+            a.shooting = bool(shooting[k])
+
+    def aim(self) -> None:
+        """ firing solutions for all the robots that might shoot this tick, at once """
+        robots = [a for a in self.schedule.agents if isinstance(a, Robot) and a.shooting
+                  and (a.slot1 is not None or a.slot2 is not None)]
+        if not robots:
+            return
+        xyr = np.array([(a._pos[0], a._pos[1], a.radius_m) for a in robots]) # pylint: disable=protected-access
+        v, el = solutions().solve(shot_range_m(xyr[:, 0], xyr[:, 1], xyr[:, 2]))
+        for a, aim in zip(robots, zip(v.tolist(), el.tolist())):
+            a.aim = aim
+
+    def fly_cargo(self) -> None:
+        """ drag and gravity on all the cargo in the air, at once """
+        airborne = [a for a in self.schedule.agents if isinstance(a, Cargo) and a.airborne]
+        if not airborne:
+            return
+        vel = np.array([a._velocity for a in airborne], dtype=float) # pylint: disable=protected-access
+        accelerate(vel, self.seconds_per_step)
+        for a, v in zip(airborne, vel):
+            a._velocity[0] = float(v[0]) # pylint: disable=protected-access
+            a._velocity[1] = float(v[1]) # pylint: disable=protected-access
+            a._velocity[2] = float(v[2]) # pylint: disable=protected-access
+
+    @property
+    def delays(self) -> List[MultiDelay[Cargo]]:
+        return [self.blue_terminal, self.red_terminal, self.lower_hub, self.upper_hub,
+                self.out_of_bounds]
+
+    def steps_until_release(self) -> int:
+        """ the number of steps that can run before any delay releases anything """
+        steps = 1000000
+        for delay in self.delays:
+            release_time = delay.next_release_time
+            if release_time is None:
+                continue
+            # release happens in the first step whose time is after the release time
+            release_step = max(self.model_steps, int(release_time / self.seconds_per_step) - 1)
+            while release_step * self.seconds_per_step <= release_time:
+                release_step += 1
+            steps = min(steps, release_step - self.model_steps)
+        return steps
+
+    def steps_until_endgame(self) -> int:
+        """ the number of steps that can run before the robots start climbing """
+        endgame_step = int(ENDGAME_S / self.seconds_per_step) - 1
+        while endgame_step * self.seconds_per_step < ENDGAME_S:
+            endgame_step += 1
+        if self.model_steps > endgame_step:
+            return 1000000 # already there
+        return endgame_step - self.model_steps
+
+    def fast_forward(self, max_steps: int) -> int:
+        """ skip up to max_steps steps in which nothing touches anything, returns the
+        number skipped, zero if something is about to happen.
+
+        how many is worked out once, up front: the steps before any two things, closing at
+        their top speeds (see speed_limits()), could touch, or cargo could reach a terminal,
+        an intake, or a wall it could go over, or a delay releases something.  the motion
+        in between, including bounces off the walls and the floor, is worked out a step at
+        a time, the same way the agents do it, with the robots driving by plans made again
+        every step, like behave() does, checking only the speeds, and stopping before any
+        robot would shoot.  samples are collected on the way, like step() does.  robot
+        noise comes from the same generator but in a different order, so the result isn't
+        the same as calling step().
+        """
+        max_steps = min(max_steps, self.steps_until_release(), self.steps_until_endgame())
+        if max_steps <= 0:
+            return 0
+        movers: List[Thing] = []
+        obstacles: List[Thing] = []
+        for a in self.schedule.agents:
+            if isinstance(a, Obstacle):
+                obstacles.append(a)
+            else:
+                movers.append(a)
+        n = len(movers)
+        everything = movers + obstacles
+        cargo = np.array([isinstance(a, Cargo) for a in movers], dtype=bool)
+        pos = np.array([a._pos for a in movers], dtype=float).reshape(n, 3) # pylint: disable=protected-access
+        vel = np.array([a._velocity for a in movers], dtype=float).reshape(n, 3) # pylint: disable=protected-access
+        radii = np.array([a.radius_m for a in everything])
+        reach = radii[:n, np.newaxis] + radii[np.newaxis, :]
+        intake = cargo[:, np.newaxis] ^ np.array(
+            [isinstance(a, Cargo) for a in everything], dtype=bool)[np.newaxis, :]
+        intake[:, n:] = False
+        reach = np.where(intake, np.maximum(reach, INTAKE_RADIUS_M), reach)
+        reach[np.arange(n), np.arange(n)] = -np.inf # not itself
+        static = np.array([a.pos for a in obstacles], dtype=float).reshape(len(obstacles), 3)
+        terminals = np.array([BLUE_TERMINAL, RED_TERMINAL])
+        speed = speed_limits(vel, cargo, DRIVE_SPEED_M_S)
+        dt = self.seconds_per_step
+        # movers against everything, cargo against the terminals, and cargo against the walls
+        contact = clear_steps(distances(pos, np.concatenate((pos, static))) - reach,
+                              speed[:, np.newaxis] + np.concatenate(
+                                  (speed, np.zeros(len(obstacles))))[np.newaxis, :], dt)
+        terminal = clear_steps(np.where(cargo[:, np.newaxis], distances(pos, terminals)
+                                        - TERMINAL_RADIUS_M - radii[:n, np.newaxis], np.inf),
+                               speed[:, np.newaxis], dt)
+        wall = clear_steps(wall_gaps(pos, vel, radii[:n], X_MAX_M, Y_MAX_M), speed, dt)
+        window = min(max_steps, *(np.min(steps, initial=np.inf)
+                                  for steps in (contact, terminal, wall)))
+        elasticity = np.array([a.elasticity for a in movers])
+        # the robots' plans are made again every step, as they go, like behave() does
+        robots = [a for a in movers if isinstance(a, Robot)]
+        driven = ~cargo
+        state = np.array([a.state for a in robots], dtype=np.int64)
+        alliance = np.array([ALLIANCE_CODES[a.alliance] for a in robots], dtype=np.int8)
+        held = np.array([(a.slot1 is not None) + (a.slot2 is not None) for a in robots])
+        cargo_alliance = np.array([ALLIANCE_CODES[a.alliance] for a in movers
+                                   if isinstance(a, Cargo)], dtype=np.int8)
+        still = np.array([a.heading is None for a in robots])
+        planned: Optional[Tuple[NDArray[Any], ...]] = None
+        heading = np.zeros((n, 2))
+        driving = np.zeros(n, dtype=bool)
+        skipped = 0
+        while skipped < window:
+            if robots:
+                step_plan = self.plan_match(self.model_time, state, pos[driven, :2], alliance,
+                                            held, pos[cargo], cargo_alliance, still)
+                if np.any(step_plan[4] & (held > 0)):
+                    break # about to shoot
+                heading[driven] = step_plan[1]
+                driving[driven] = step_plan[2]
+            noise = self.rng.normal(loc=0.00, scale=DRIVE_NOISE_M_S, size=(n, 2))
+            before = (pos.copy(), vel.copy())
+            free_step(pos, vel, radii[:n], elasticity, cargo, heading, driving, noise, dt,
+                      X_MAX_M, Y_MAX_M)
+            if np.any(np.hypot(vel[:, 0], vel[:, 1]) > speed + 1e-9):
+                pos, vel = before # faster than the window allows for
+                break
+            if robots:
+                planned = step_plan
+                state = step_plan[0]
+                still = ~step_plan[2]
+            skipped += 1
+            self.schedule.steps += 1
+            self.schedule.time += 1
+            if self.model_steps % self.collect_period == 0:
+                self.put_back(movers, pos, vel)
+                self.datacollector.collect(self)
+        if skipped == 0:
+            return 0
+        self.put_back(movers, pos, vel)
+        for a in movers:
+            self.space.move_agent(a, a._pos) # pylint: disable=protected-access
+        if planned is not None:
+            self.put_plan(robots, *planned)
+        return skipped
+
+    def put_back(self, movers: List[Thing], pos: NDArray[np.float64],
+                 vel: NDArray[np.float64]) -> None:
+        """ positions and velocities from fast_forward() into the agents """
+        for i, a in enumerate(movers):
+            for j in range(3):
+                a._pos[j] = float(pos[i, j]) # pylint: disable=protected-access
+                a._velocity[j] = float(vel[i, j]) # pylint: disable=protected-access
+
+    def advance(self, max_steps: int = 200) -> int:
+        """ event-driven alternative to step(): jump over the quiet steps, up to max_steps,
+        or just step if something is happening.  returns the number of steps taken. """
+        skipped = self.fast_forward(max_steps)
+        if skipped == 0:
+            self.step()
+            return 1
+        return skipped
+
+    def snapshot(self) -> Snapshot:
+        """ the state of the match now, see snapshot.py """
+        return Snapshot(self)
+
+    def restore(self, snapshot: Snapshot) -> None:
+        """ go back to a snapshot of this model """
+        restore(self, snapshot)
+
+    def fork(self, snapshot: Optional[Snapshot] = None) -> 'RobotFlockers':
+        """ a new model starting from the snapshot, or from now """
+        return fork(self.snapshot() if snapshot is None else snapshot) # type:ignore
 
 
 # to calibrate ball movement
@@ -0,0 +1,171 @@
+""" flow fields for driving to the standard places on the field around the obstacles.
+
+the field is cut into square cells, and a cell is blocked if a robot centered there
+would touch an obstacle or a wall.  for each goal, a set of free cells near some point,
+the distance from every cell to the nearest goal cell, going around the blocked ones,
+is worked out once, by relaxing the whole grid against its eight neighbors, in numpy,
+until nothing changes.  each cell then points at its best neighbor, so steering is a
+lookup of the cell a robot is in.  cells that can't reach the goal, like blocked ones,
+point straight at the goal's point instead.
+
+the fields only depend on the obstacles, so they're made once per model class, see
+RobotFlockers.make_navigator().  robots standing still can also block cells, with
+block(): the cells whose way to the goal went through a newly blocked cell are
+cleared, and only those are worked out again.
+"""
+from typing import Dict, List, Tuple
+import numpy as np
+from numpy.typing import NDArray
+
+R2 = Tuple[float, float]
+# name: the point, and how close to it counts as there
+Goals = Dict[str, Tuple[R2, float]]
+
+CELL_M = 0.2
+# neighbor offsets in cells, and the distance to each
+OFFSETS = np.array([(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)])
+STEPS = np.hypot(OFFSETS[:, 0], OFFSETS[:, 1])
+
+class Field:
+    def __init__(self, point: R2, goal: NDArray[np.bool_], centers: NDArray[np.float64],
+                 blocked: NDArray[np.bool_]) -> None:
+        """ point: where the goal is
+            goal: (W, H) true for the goal cells, free or not
+            centers: (W, H, 2) cell centers
+            blocked: (W, H)
+        """
+        self.point = point
+        self.goal = goal
+        self.centers = centers
+        # distance to the goal in cells, inf if there's no way
+        self.distance = np.full(goal.shape, np.inf)
+        # (W, H) index into OFFSETS of the next cell on the way
+        self.next = np.zeros(goal.shape, dtype=np.int64)
+        # (W, H, 2) unit vectors
+        self.direction = np.zeros(goal.shape + (2,))
+        # (W, H) true in the goal
+        self.arrived = np.zeros(goal.shape, dtype=bool)
+        self.repair(blocked, blocked)
+
+    def copy(self) -> 'Field':
+        """ with its own distances and directions, for repair() """
+        twin = object.__new__(Field)
+        twin.__dict__ = dict(self.__dict__)
+        for name in ('distance', 'next', 'direction', 'arrived'):
+            setattr(twin, name, getattr(self, name).copy())
+        return twin
+
+    def around(self, distance: NDArray[np.float64]) -> NDArray[np.float64]:
+        """ (8, W, H) the distance by way of each neighbor """
+        w, h = distance.shape
+        padded = np.pad(distance, 1, constant_values=np.inf)
+        return np.stack([padded[1 + dx:1 + dx + w, 1 + dy:1 + dy + h] + step
+                         for (dx, dy), step in zip(OFFSETS, STEPS)])
+
+    def repair(self, blocked: NDArray[np.bool_], added: NDArray[np.bool_]) -> None:
+        """ work out the distances again, after the cells in added were blocked, and
+        maybe others unblocked; the rest of the old distances are kept as a start """
+        distance = self.distance.copy()
+        w, h = distance.shape
+        # everything downstream of a newly blocked cell has to be worked out again
+        stale = added.copy()
+        i, j = np.indices(distance.shape)
+        ni = np.clip(i + OFFSETS[self.next, 0], 0, w - 1)
+        nj = np.clip(j + OFFSETS[self.next, 1], 0, h - 1)
+        on_the_way = np.isfinite(distance) & (distance > 0)
+        while True:
+            spread = stale | (on_the_way & stale[ni, nj])
+            if np.array_equal(spread, stale):
+                break
+            stale = spread
+        distance[stale | blocked] = np.inf
+        free = ~blocked
+        distance[self.goal & free] = 0
+        while True:
+            relaxed = np.minimum(distance, np.min(self.around(distance), axis=0))
+            relaxed[blocked] = np.inf
+            if np.array_equal(relaxed, distance):
+                break
+            distance = relaxed
+        self.distance = distance
+        self.next = np.argmin(self.around(distance), axis=0)
+        self.arrived = distance == 0
+        reachable = np.isfinite(distance) & ~self.arrived
+        offset = OFFSETS[self.next] / STEPS[self.next][:, :, np.newaxis]
+        straight = np.array(self.point) - self.centers
+        straight /= np.maximum(np.hypot(straight[..., 0], straight[..., 1]), 1e-9)[..., np.newaxis]
+        self.direction = np.where(reachable[..., np.newaxis], offset,
+                                  np.where(self.arrived[..., np.newaxis], 0, straight))
+
+class Navigator:
+    def __init__(self, size_m: R2, obstacles: List[Tuple[float, float, float]],
+                 radius_m: float, goals: Goals) -> None:
+        """ size_m: the field's x and y
+            obstacles: x, y, and radius of each
+            radius_m: of the robots
+            goals: by name
+        """
+        self.size_m = size_m
+        self.radius_m = radius_m
+        self.shape = (int(np.ceil(size_m[0] / CELL_M)), int(np.ceil(size_m[1] / CELL_M)))
+        i, j = np.indices(self.shape)
+        self.centers = np.stack(((i + 0.5) * CELL_M, (j + 0.5) * CELL_M), axis=2)
+        x = self.centers[..., 0]
+        y = self.centers[..., 1]
+        self.static = ((x < radius_m) | (x > size_m[0] - radius_m)
+                       | (y < radius_m) | (y > size_m[1] - radius_m))
+        for ox, oy, r in obstacles:
+            self.static |= self.near(ox, oy, r + radius_m)
+        self.blocked = self.static.copy()
+        # around the obstacles only, and around the robots in the way too, see block()
+        self.plain: Dict[str, Field] = {
+            name: Field(point, self.near(point[0], point[1], reach), self.centers, self.static)
+            for name, (point, reach) in goals.items()}
+        self.fields = self.plain
+
+    def near(self, x: float, y: float, r: float) -> NDArray[np.bool_]:
+        """ (W, H) the cells with centers within r of x, y """
+        return np.hypot(self.centers[..., 0] - x, self.centers[..., 1] - y) < r
+
+    def copy(self) -> 'Navigator':
+        """ for block(), sharing the plain fields """
+        twin = object.__new__(Navigator)
+        twin.__dict__ = dict(self.__dict__)
+        twin.blocked = self.blocked.copy()
+        if self.fields is not self.plain:
+            twin.fields = {name: field.copy() for name, field in self.fields.items()}
+        return twin
+
+    def cells(self, xy: NDArray[np.float64]) -> Tuple[NDArray[np.int64], NDArray[np.int64]]:
+        """ the cell each point is in, (..., 2) to two (...) """
+        i = np.clip((xy[..., 0] // CELL_M).astype(np.int64), 0, self.shape[0] - 1)
+        j = np.clip((xy[..., 1] // CELL_M).astype(np.int64), 0, self.shape[1] - 1)
+        return i, j
+
+    def steer(self, goal: str, xy: NDArray[np.float64]) -> Tuple[NDArray[np.float64],
+                                                                 NDArray[np.bool_]]:
+        """ (..., 2) unit vectors towards the goal, and (...) true where it's there.  in a
+        cell blocked by a robot, probably the one asking, the plain field is used. """
+        i, j = self.cells(xy)
+        plain = self.plain[goal]
+        field = self.fields[goal]
+        mine = (self.blocked & ~self.static)[i, j]
+        return (np.where(mine[..., np.newaxis], plain.direction[i, j], field.direction[i, j]),
+                np.where(mine, plain.arrived[i, j], field.arrived[i, j]))
+
+    def block(self, xy: NDArray[np.float64]) -> None:
+        """ robots at xy, (n, 2), are in the way, instead of the last ones """
+        blocked = self.static.copy()
+        for x, y in xy.tolist():
+            blocked |= self.near(x, y, 2 * self.radius_m)
+        if np.array_equal(blocked, self.blocked):
+            return
+        added = blocked & ~self.blocked
+        self.blocked = blocked
+        if self.fields is self.plain:
+            self.fields = {name: field.copy() for name, field in self.plain.items()}
+        for field in self.fields.values():
+            field.repair(blocked, added)
+
+# by model class, see RobotFlockers.make_navigator()
+NAVIGATORS: Dict[type, Navigator] = {}
@@ -0,0 +1,225 @@
+""" one big field stepped by several worker processes, each owning a strip of it.
+
+the field is cut into equal strips along x.  each tick, every agent belongs to the
+strip it's in, and each worker handles the contacts of the agents it owns, reading
+the ones nearby in the strips next door (the halo) straight out of shared memory.
+
+a tick has two parallel phases, with a barrier after each:
+ * contacts: each worker finds the touching pairs whose lower-numbered agent it
+   owns, so every pair is handled exactly once, and writes the velocity and
+   position changes into its own rows of the shared dv and dp arrays.
+ * advance: each worker adds up all the rows for its own agents, always in worker
+   order, and then applies driving, friction, gravity on the floor, walls, and motion to them.
+the rest (terminals, the hub, delays, behaviour, intake, shooting and flight) is cheap, and runs in the
+main process between ticks, like BatchFlockers.  nothing depends on timing, so runs
+with the same number of strips come out the same, with or without processes.
+
+    with ParallelFlockers(strips=4, seed=0, cargo_per_alliance=250) as field:
+        field.run(1000)
+"""
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from numpy.typing import NDArray
+from .agent import MAX_RADIUS_M
+from .batch import (BatchFlockers, CARGO, OBSTACLE, OUT_OF_BOUNDS_DELAY, RELEASES,
+                    impulses)
+from .model import X_MAX_M, RobotFlockers
+
+# anything touching an agent is within this distance of it in x
+HALO_M = 2 * MAX_RADIUS_M
+
+# worker commands
+STEP = 0
+QUIT = 1
+
+class ParallelFlockers(BatchFlockers):
+    def __init__(self, strips: int = 2, seed: Optional[int] = None,
+                 cargo_per_alliance: Optional[int] = None, processes: bool = True,
+                 model: Optional[RobotFlockers] = None) -> None:
+        """ strips: number of strips, and workers
+            seed: for repeatable runs, seeds the layout and the robot noise
+            cargo_per_alliance: passed to RobotFlockers if given
+            processes: false to do the strips one after the other in this process
+            model: a fresh model to start from, instead of making one
+        """
+        if strips < 1:
+            raise ValueError(f"strips {strips} < 1")
+        if model is None:
+            kwargs: Dict[str, Any] = {}
+            if seed is not None:
+                kwargs['seed'] = seed
+            if cargo_per_alliance is not None:
+                kwargs['cargo_per_alliance'] = cargo_per_alliance
+            model = RobotFlockers(**kwargs)
+        self.load([model], seed)
+        self.strips = strips
+        self.strip_m = X_MAX_M / strips
+        n = len(self.ids)
+        r = len(self.robots)
+        self._blocks: Dict[str, Tuple[SharedMemory, Tuple[int, ...], str]] = {}
+        self.share('pos', self.pos)
+        self.share('vel', self.vel)
+        self.share('stepping', np.zeros(n, dtype=bool))
+        self.share('owner', np.zeros(n, dtype=np.int64))
+        self.share('heading', np.zeros((1, r, 2)))
+        self.share('chasing', np.zeros((1, r), dtype=bool))
+        self.share('noise', np.zeros((1, r, 2)))
+        self.share('dv', np.zeros((strips, n, 3)))
+        self.share('dp', np.zeros((strips, n, 3)))
+        self.share('touched', np.zeros((strips, n), dtype=bool))
+        self.share('out', np.zeros(n, dtype=bool))
+        self.share('command', np.zeros(1, dtype=np.int64))
+        self._processes: List[Any] = []
+        self._barrier: Any = None
+        if processes and strips > 1:
+            context = get_context()
+            self._barrier = context.Barrier(strips + 1)
+            self._processes = [context.Process(target=self.work, args=(w,), daemon=True)
+                               for w in range(strips)]
+            for process in self._processes:
+                process.start()
+
+    def share(self, name: str, array: NDArray[Any]) -> None:
+        """ move the array into shared memory, keeping the attribute name """
+        block = SharedMemory(create=True, size=max(array.nbytes, 1))
+        view: NDArray[Any] = np.ndarray(array.shape, array.dtype, buffer=block.buf)
+        view[...] = array
+        self._blocks[name] = (block, array.shape, array.dtype.str)
+        setattr(self, name, view)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """ for starting workers: the shared arrays go by name """
+        state = self.__dict__.copy()
+        for name in self._blocks:
+            del state[name]
+        state['_processes'] = []
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        for name, (block, shape, dtype) in self._blocks.items():
+            setattr(self, name, np.ndarray(shape, np.dtype(dtype), buffer=block.buf))
+
+    def __enter__(self) -> 'ParallelFlockers':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """ stop the workers and free the shared memory """
+        if self._processes:
+            self.command[0] = QUIT
+            self._barrier.wait()
+            for process in self._processes:
+                process.join()
+            self._processes = []
+        blocks = self._blocks
+        self._blocks = {}
+        for name, (block, _, _) in blocks.items():
+            setattr(self, name, np.array(getattr(self, name))) # keep a copy
+            block.close()
+            block.unlink()
+
+    def work(self, w: int) -> None:
+        """ the worker loop """
+        while True:
+            self._barrier.wait()
+            if self.command[0] == QUIT:
+                return
+            self.contacts(w)
+            self._barrier.wait()
+            self.advance(w)
+            self._barrier.wait()
+
+    def step(self) -> None:
+        t = self.model_time
+        self.terminals(t)
+        self.hub(t)
+        for delay, pos, velocity in RELEASES:
+            self.release(delay, t, pos, velocity)
+        self.hub_release(t)
+        stepping = self.on_field & (self.kind != OBSTACLE)
+        self.heading[...], self.chasing[...], self.noise[...] = self.steer()
+        self.intake()
+        self.shoot()
+        stepping &= self.on_field
+        self.fly(stepping)
+        self.stepping[...] = stepping[0]
+        self.owner[...] = np.clip((self.pos[0, :, 0] // self.strip_m).astype(np.int64),
+                                  0, self.strips - 1)
+        self.out[...] = False
+        if self._processes:
+            self.command[0] = STEP
+            self._barrier.wait()
+            self._barrier.wait()
+            self._barrier.wait()
+        else:
+            for w in range(self.strips):
+                self.contacts(w)
+            for w in range(self.strips):
+                self.advance(w)
+        self.put(OUT_OF_BOUNDS_DELAY, self.out[np.newaxis], t)
+        self.steps += 1
+
+    def contacts(self, w: int) -> None:
+        """ first phase: the contacts of the agents in strip w, read only """
+        dv = self.dv[w]
+        dp = self.dp[w]
+        touched = self.touched[w]
+        dv[...] = 0
+        dp[...] = 0
+        touched[...] = False
+        x = self.pos[0, :, 0]
+        obstacle = self.kind == OBSTACLE
+        lo_m = w * self.strip_m - HALO_M
+        hi_m = (w + 1) * self.strip_m + HALO_M
+        near = np.flatnonzero((self.stepping | obstacle) & (x >= lo_m) & (x < hi_m))
+        ia, ib = np.triu_indices(len(near), 1)
+        a = near[ia]
+        b = near[ib]
+        keep = ((self.owner[a] == w) & (self.stepping[a] | self.stepping[b]))
+        a = a[keep]
+        b = b[keep]
+        cylinder = (self.kind[a] != CARGO) | (self.kind[b] != CARGO)
+        lo, hi = self.extent()
+        d = self.pos[0, b] - self.pos[0, a]
+        d[:, 2] = np.where(cylinder, 0, d[:, 2])
+        d2 = np.sum(d * d, axis=1)
+        reach = self.radius[a] + self.radius[b]
+        touching = ((lo[0, a] <= hi[0, b]) & (lo[0, b] <= hi[0, a])
+                    & (d2 < reach * reach) & (d2 > 0))
+        a = a[touching]
+        b = b[touching]
+        if len(a) == 0:
+            return
+        inverse_mass = 1 / self.mass
+        total = inverse_mass[a] + inverse_mass[b]
+        dv_a, dv_b, dp_a, dp_b = impulses(
+            d[touching], self.vel[0, a], self.vel[0, b], reach[touching],
+            np.maximum(self.elasticity[a], self.elasticity[b]),
+            inverse_mass[a] / total, inverse_mass[b] / total)
+        np.add.at(dv, a, dv_a)
+        np.add.at(dv, b, dv_b)
+        np.add.at(dp, a, dp_a)
+        np.add.at(dp, b, dp_b)
+        touched[a] = True
+        touched[b] = True
+
+    def advance(self, w: int) -> None:
+        """ second phase: everything else for the agents in strip w, which only touches
+        their own rows """
+        own = self.stepping & (self.owner == w)
+        rows = np.flatnonzero(own)
+        self.vel[0, rows] += np.sum(self.dv[:, rows], axis=0)
+        self.pos[0, rows] += np.sum(self.dp[:, rows], axis=0)
+        collided = (own & np.any(self.touched, axis=0))[np.newaxis]
+        self.upright(collided)
+        free = own[np.newaxis] & ~collided
+        self.drive(free, self.heading, self.chasing, self.noise)
+        self.roll(free)
+        out = self.walls(own[np.newaxis])[0]
+        self.out[rows] = out[rows]
+        self.move((own & ~out)[np.newaxis])
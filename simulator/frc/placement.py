@@ -0,0 +1,115 @@
+""" puts things down at random without overlap, quickly, however crowded it gets.
+
+trying random spots and checking each one against everything placed so far gets
+slow as the field fills up, and goes on forever once it's full.  here the disks
+placed so far are kept in a grid, so a try only looks at the few nearby.  after a
+run of misses the placer stops throwing darts and grows outward from what's already
+there (Bridson's poisson-disk sampling), which finds the gaps that are left, or finds
+out there aren't any.
+"""
+import math
+import random
+from typing import Dict, List, Tuple
+
+Cell = Tuple[int, int]
+# x0, y0, x1, y1, where centers may go
+Region = Tuple[float, float, float, float]
+
+# about the size of a ball, so a try only looks at a few cells
+PLACEMENT_CELL_M: float = 0.5
+# random tries in a row before growing from the disks already placed
+MISSES: int = 30
+# tries around each disk while growing
+TRIES: int = 20
+
+class DiskPlacer:
+    def __init__(self, rng: random.Random, cell_m: float = PLACEMENT_CELL_M,
+                 misses: int = MISSES, tries: int = TRIES) -> None:
+        """
+            rng: where the randomness comes from, e.g. model.random
+            cell_m: grid spacing
+            misses: random tries before growing
+            tries: tries around each disk while growing
+        """
+        self.rng = rng
+        self.cell_m = cell_m
+        self.misses = misses
+        self.tries = tries
+        self.x: List[float] = []
+        self.y: List[float] = []
+        self.r: List[float] = []
+        # indices of the disks touching each cell
+        self.cells: Dict[Cell, List[int]] = {}
+        # disks that might still have room around them, by region and radius
+        self.frontiers: Dict[Tuple[Region, float], List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.r)
+
+    def covered(self, x: float, y: float, r: float) -> List[Cell]:
+        """ the cells under the disk's bounding box """
+        c = self.cell_m
+        i0, i1 = math.floor((x - r) / c), math.floor((x + r) / c)
+        j0, j1 = math.floor((y - r) / c), math.floor((y + r) / c)
+        return [(i, j) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1)]
+
+    def add(self, x: float, y: float, r: float) -> None:
+        """ something that's there already, or just placed """
+        k = len(self.r)
+        self.x.append(x)
+        self.y.append(y)
+        self.r.append(r)
+        for cell in self.covered(x, y, r):
+            self.cells.setdefault(cell, []).append(k)
+
+    def fits(self, x: float, y: float, r: float) -> bool:
+        """ overlapping disks share a cell, so only those need checking """
+        for cell in self.covered(x, y, r):
+            for k in self.cells.get(cell, ()):
+                dx = x - self.x[k]
+                dy = y - self.y[k]
+                d = r + self.r[k]
+                if dx * dx + dy * dy < d * d:
+                    return False
+        return True
+
+    def place(self, region: Region, r: float) -> Tuple[float, float]:
+        """ a random spot in the region for a disk of radius r, now taken """
+        x0, y0, x1, y1 = region
+        if x1 < x0 or y1 < y0:
+            raise ValueError(f"empty region {region}")
+        key = (region, r)
+        if key not in self.frontiers:
+            for _ in range(self.misses):
+                x = x0 + self.rng.random() * (x1 - x0)
+                y = y0 + self.rng.random() * (y1 - y0)
+                if self.fits(x, y, r):
+                    self.add(x, y, r)
+                    return (x, y)
+            # crowded, grow from now on
+            self.frontiers[key] = [k for k in range(len(self.r))
+                                   if x0 - self.r[k] - 4 * r <= self.x[k] <= x1 + self.r[k] + 4 * r
+                                   and y0 - self.r[k] - 4 * r <= self.y[k] <= y1 + self.r[k] + 4 * r]
+        return self.grow(key)
+
+    def grow(self, key: Tuple[Region, float]) -> Tuple[float, float]:
+        """ a spot near one of the frontier disks, dropping the ones with no room """
+        (x0, y0, x1, y1), r = key
+        frontier = self.frontiers[key]
+        while frontier:
+            n = self.rng.randrange(len(frontier))
+            k = frontier[n]
+            # from just touching to twice that
+            d = self.r[k] + r
+            for _ in range(self.tries):
+                angle = self.rng.random() * 2 * math.pi
+                distance = d * (1 + self.rng.random())
+                x = self.x[k] + distance * math.cos(angle)
+                y = self.y[k] + distance * math.sin(angle)
+                if x0 <= x <= x1 and y0 <= y <= y1 and self.fits(x, y, r):
+                    self.add(x, y, r)
+                    frontier.append(len(self.r) - 1)
+                    return (x, y)
+            frontier[n] = frontier[-1]
+            frontier.pop()
+        raise ValueError(f"no room for radius {r} in {(x0, y0, x1, y1)}")
@@ -0,0 +1,227 @@
+""" match recordings, written a tick at a time, and played back without any physics.
+
+a recording is a directory: meta.json says what the agents are and what the columns
+look like, and each column is a raw file, one fixed-size row per tick, so the whole
+thing can be memory mapped, and jumping to any tick is just indexing.
+
+    with Recorder(model, "match") as recorder:
+        for _ in range(3000):
+            model.step()
+            recorder.record()
+
+    recording = Recording("match")
+    recording.pos[1000] # every agent, at tick 1000
+
+ReplayModel plays a recording in the visualization, see server.py:
+
+    $ python3 -m frc.recording 3000 match
+    $ python3 run.py match
+"""
+import json
+import os
+import sys
+from typing import Any, BinaryIO, Dict, List, Tuple
+import numpy as np
+from numpy.typing import NDArray
+from mesa import Model # type: ignore
+from mesa.datacollection import DataCollector # type: ignore
+from mesa.time import BaseScheduler # type: ignore
+from .agent import Cargo, Obstacle, Robot, Thing
+from .alliance import Alliance
+from .model import RobotFlockers
+from .snapshot import everything
+
+VERSION = 1
+META = "meta.json"
+# the replay knows how to make these
+KINDS = {'Cargo': Cargo, 'Robot': Robot, 'Obstacle': Obstacle}
+# same names as the model's datacollector, so the text element works on replays
+COUNTS = ('blue_terminal_population', 'red_terminal_population', 'out_of_bounds_population',
+          'upper_hub_count', 'lower_hub_count')
+# an empty robot slot
+EMPTY = -1
+
+def kind_of(agent: Thing) -> str:
+    for name, kind in KINDS.items():
+        if isinstance(agent, kind):
+            return name
+    raise ValueError(f"can't record {type(agent).__name__} {agent.unique_id}")
+
+def columns(agents: int, robots: int) -> Dict[str, Tuple[str, Tuple[int, ...]]]:
+    """ name: (dtype, shape of one tick) """
+    return {
+        'time': ('<f8', ()),
+        'pos': ('<f4', (agents, 3)), # nan if not on the field
+        'velocity': ('<f4', (agents, 3)),
+        'on_field': ('|b1', (agents,)),
+        'slots': ('<i4', (robots, 2)), # rows held by each robot
+        'counts': ('<i4', (len(COUNTS),)),
+    }
+
+class Recorder:
+    def __init__(self, model: RobotFlockers, path: str) -> None:
+        """ writes the static part now, and a tick each time record() is called """
+        self.model = model
+        self.path = path
+        self.agents = everything(model)
+        self.row = {a.unique_id: k for k, a in enumerate(self.agents)}
+        self.robots: List[Robot] = [a for a in self.agents if isinstance(a, Robot)]
+        self.columns = columns(len(self.agents), len(self.robots))
+        os.makedirs(path, exist_ok=True)
+        meta = {
+            'version': VERSION,
+            'seconds_per_step': model.seconds_per_step,
+            'ids': [a.unique_id for a in self.agents],
+            'kinds': [kind_of(a) for a in self.agents],
+            'alliances': [getattr(a, 'alliance', Alliance.NULL).name for a in self.agents],
+            'radius': [a.radius_m for a in self.agents],
+            'height': [getattr(a, 'z_height_m', 0) for a in self.agents],
+            'contact_height': [getattr(a, 'contact_height_m', 0) for a in self.agents],
+            'robots': [self.row[r.unique_id] for r in self.robots],
+            'columns': {name: [dtype, list(shape)] for name, (dtype, shape) in self.columns.items()},
+        }
+        with open(os.path.join(path, META), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        self.files: Dict[str, BinaryIO] = {
+            name: open(os.path.join(path, name + ".bin"), 'wb') # pylint: disable=consider-using-with
+            for name in self.columns}
+
+    def __enter__(self) -> 'Recorder':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for f in self.files.values():
+            f.close()
+        self.files = {}
+
+    def record(self) -> None:
+        """ append the state of the model now """
+        model = self.model
+        pos = np.array([(np.nan, np.nan, np.nan) if a._pos is None else a._pos # pylint: disable=protected-access
+                        for a in self.agents], dtype=float).reshape(-1, 3)
+        slots = [(EMPTY if r.slot1 is None else self.row[r.slot1.unique_id],
+                  EMPTY if r.slot2 is None else self.row[r.slot2.unique_id]) for r in self.robots]
+        values = {
+            'time': model.model_time,
+            'pos': pos,
+            'velocity': [a._velocity for a in self.agents], # pylint: disable=protected-access
+            'on_field': ~np.isnan(pos[:, 0]),
+            'slots': slots,
+            'counts': (model.blue_terminal.length, model.red_terminal.length,
+                       model.out_of_bounds.length, model.hub.upper_count, model.hub.lower_count),
+        }
+        for name, (dtype, shape) in self.columns.items():
+            self.files[name].write(np.asarray(values[name], dtype=dtype).reshape(shape).tobytes())
+
+class Recording:
+    """ a recording, memory mapped; each column is indexed by tick first """
+    def __init__(self, path: str) -> None:
+        with open(os.path.join(path, META), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if self.meta['version'] != VERSION:
+            raise ValueError(f"recording version {self.meta['version']} is not {VERSION}")
+        self.ids: List[int] = self.meta['ids']
+        self.robots: List[int] = self.meta['robots']
+        self.seconds_per_step: float = self.meta['seconds_per_step']
+        shapes = {name: (np.dtype(dtype), tuple(shape))
+                  for name, (dtype, shape) in self.meta['columns'].items()}
+        # a tick that didn't get all the way written doesn't count
+        self.ticks = min(os.path.getsize(os.path.join(path, name + ".bin"))
+                         // max(dtype.itemsize * int(np.prod(shape)), 1)
+                         for name, (dtype, shape) in shapes.items())
+        self.columns: Dict[str, NDArray[Any]] = {}
+        for name, (dtype, shape) in shapes.items():
+            if self.ticks == 0:
+                self.columns[name] = np.zeros((0,) + shape, dtype=dtype)
+            else:
+                self.columns[name] = np.memmap(os.path.join(path, name + ".bin"), dtype=dtype,
+                                               mode='r', shape=(self.ticks,) + shape)
+        self.time = self.columns['time']
+        self.pos = self.columns['pos']
+        self.velocity = self.columns['velocity']
+        self.on_field = self.columns['on_field']
+        self.slots = self.columns['slots']
+        self.counts = self.columns['counts']
+
+    def __len__(self) -> int:
+        return self.ticks
+
+class ReplayModel(Model): # type:ignore
+    """ plays a recording, one tick per step """
+    def __init__(self, path: str, start: int = 0) -> None:
+        """
+            path: the recording directory
+            start: the first tick to show
+        """
+        super().__init__()
+        self.recording = Recording(path)
+        meta = self.recording.meta
+        self.agents: List[Thing] = []
+        for k, i in enumerate(self.recording.ids):
+            kind = meta['kinds'][k]
+            alliance = Alliance[meta['alliances'][k]]
+            if kind == 'Obstacle':
+                agent: Thing = Obstacle(i, self, (0, 0, 0), meta['radius'][k], meta['height'][k],
+                                        meta['contact_height'][k])
+            else:
+                agent = KINDS[kind](i, self, (0, 0, 0), alliance)
+            self.agents.append(agent)
+        self.tick = 0
+        self.schedule = BaseScheduler(self)
+        self.datacollector = DataCollector(
+            model_reporters=dict({"time": lambda m: m.model_time},
+                                 **{name: (lambda m, j=j: int(m.recording.counts[m.tick, j]))
+                                    for j, name in enumerate(COUNTS)}))
+        self.running = True
+        self.seek(start)
+
+    @property
+    def model_time(self) -> float:
+        return float(self.recording.time[self.tick])
+
+    def seek(self, tick: int) -> None:
+        """ show the given tick """
+        if not 0 <= tick < len(self.recording):
+            raise ValueError(f"tick {tick} not in recording of {len(self.recording)}")
+        self.tick = tick
+        recording = self.recording
+        on_field = recording.on_field[tick]
+        pos = recording.pos[tick].tolist()
+        velocity = recording.velocity[tick].tolist()
+        schedule = BaseScheduler(self)
+        for k, agent in enumerate(self.agents):
+            agent._velocity = velocity[k] # pylint: disable=protected-access
+            if on_field[k]:
+                agent._pos = pos[k] # pylint: disable=protected-access
+                schedule.add(agent)
+            else:
+                agent._pos = None # pylint: disable=protected-access
+        schedule.steps = tick
+        self.schedule = schedule
+        for r, (slot1, slot2) in zip(recording.robots, recording.slots[tick].tolist()):
+            robot = self.agents[r]
+            robot.slot1 = None if slot1 == EMPTY else self.agents[slot1]
+            robot.slot2 = None if slot2 == EMPTY else self.agents[slot2]
+        self.datacollector.collect(self)
+
+    def step(self) -> None:
+        if self.tick + 1 >= len(self.recording):
+            self.running = False
+            return
+        self.seek(self.tick + 1)
+
+def record(steps: int, path: str) -> None:
+    """ record a match; python -m frc.recording [steps] [path] """
+    model = RobotFlockers()
+    with Recorder(model, path) as recorder:
+        recorder.record()
+        for _ in range(steps):
+            model.step()
+            recorder.record()
+
+if __name__ == '__main__':
+    record(int(sys.argv[1]) if len(sys.argv) > 1 else 3000,
+           sys.argv[2] if len(sys.argv) > 2 else "match")
@@ -1,20 +1,29 @@
-from typing import Any, Dict
-from mesa.visualization.ModularVisualization import ModularServer # type: ignore
+from typing import Any, Dict, Optional
 from mesa.visualization.modules import TextElement # type: ignore
+from mesa.visualization.UserParam import UserSettableParameter # type: ignore
 from mesa import Agent, Model # type: ignore
 import numpy as np
 
 from .agent import Cargo, Robot, Obstacle
 from .alliance import Alliance
 #from .model import CalRobotFlockers, CalV, RobotFlockers
+from .broadcast import BroadcastServer
+from .frames import FrameServer
+from .live import LiveServer
 from .model import RobotFlockers
+from .recording import Recording, ReplayModel
 from .SimpleContinuousModule import SimpleCanvas
 from .Simple3dContinuousModule import Simple3dCanvas
 
+# the model steps 0.05 s at a time
+REAL_TIME_TICKS_PER_SECOND = 20
+
 # renderer scale is just meters, just like the back end
+# the id is stable, so the browser can keep the same mesh for each agent
 def robot_draw(agent: Agent) -> Dict[Any, Any]:
     if isinstance(agent, Cargo):
         return {
+            "id": agent.unique_id,
             "Shape": "cargo",
             "color": agent.alliance.color,
             #"z": agent.z_m
@@ -22,6 +31,7 @@ def robot_draw(agent: Agent) -> Dict[Any, Any]:
     if isinstance(agent, Robot):
         #pylint: disable=no-member
         return {
+            "id": agent.unique_id,
             "Shape": "robot",
             "w": 2 * agent.radius_m,
             "h": 2 * agent.radius_m,
@@ -34,11 +44,14 @@ def robot_draw(agent: Agent) -> Dict[Any, Any]:
         }
     if isinstance(agent, Obstacle):
         return {
+            "id": agent.unique_id,
             "Shape": "obstacle",
+            "static": True, # obstacles never move
             "h": agent.z_height_m,
             "r": agent.radius_m,
         }
     return {
+        "id": agent.unique_id,
         "Shape": "circle",
         "r": agent.radius_m,
         "color": "gray"
@@ -52,11 +65,15 @@ class SomeText(TextElement): # type:ignore
         blue_terminal = model.datacollector.model_vars['blue_terminal_population'][-1]
         red_terminal = model.datacollector.model_vars['red_terminal_population'][-1]
         out_of_bounds = model.datacollector.model_vars['out_of_bounds_population'][-1]
+        upper_hub = model.datacollector.model_vars['upper_hub_count'][-1]
+        lower_hub = model.datacollector.model_vars['lower_hub_count'][-1]
         return (
             f"Model time: {minutes:.0f}:{seconds:05.2f}<br>"
             f"Blue terminal population: {blue_terminal:.0f}<br>"
             f"Red terminal population: {red_terminal:.0f}<br>"
             f"Out of bounds population: {out_of_bounds:.0f}<br>"
+            f"Upper hub count: {upper_hub:.0f}<br>"
+            f"Lower hub count: {lower_hub:.0f}<br>"
         )
 
 
@@ -90,9 +107,38 @@ text_element = SomeText()
 model_params: Dict[str, float] = {
 }
 
-server = ModularServer(
+server = FrameServer(
     #CalV, [robot_canvas, robot_canvas_2], "Robots", model_params
     #CalRobotFlockers, [robot_canvas, text_element, speed_chart], "Robots", model_params
     RobotFlockers, [robot_canvas, robot_canvas_2, text_element], "Robots", model_params
 )
 server.verbose = False
+
+def replay_server(path: str) -> FrameServer:
+    """ plays a recording instead of running the model, see recording.py """
+    ticks = len(Recording(path))
+    replay = FrameServer(
+        ReplayModel, [robot_canvas, robot_canvas_2, text_element], "Replay",
+        {"path": path,
+         "start": UserSettableParameter('slider', "Start tick", 0, 0, max(ticks - 1, 0), 1)}
+    )
+    replay.verbose = False
+    return replay
+
+def live_server(ticks_per_second: Optional[float] = None) -> LiveServer:
+    """ runs the model on its own thread, see live.py; real time by default """
+    if ticks_per_second is None:
+        ticks_per_second = REAL_TIME_TICKS_PER_SECOND
+    live = LiveServer(RobotFlockers, [robot_canvas, robot_canvas_2, text_element], "Robots",
+                      model_params, ticks_per_second)
+    live.verbose = False
+    return live
+
+def broadcast_server(ticks_per_second: Optional[float] = None) -> BroadcastServer:
+    """ one model for every viewer, see broadcast.py; real time by default """
+    if ticks_per_second is None:
+        ticks_per_second = REAL_TIME_TICKS_PER_SECOND
+    broadcast = BroadcastServer(RobotFlockers, [robot_canvas, robot_canvas_2, text_element],
+                                "Robots", model_params, ticks_per_second)
+    broadcast.verbose = False
+    return broadcast
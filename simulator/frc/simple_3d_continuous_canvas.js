@@ -1,5 +1,6 @@
 import * as THREE from 'https://threejs.org/build/three.module.js';
 import { OrbitControls } from 'https://threejs.org/examples/jsm/controls/OrbitControls.js';
+import { Frames } from './frames.js';
 
 // scale of this rendering is 1 meter per scale unit
 // i tried to reverse the y coordinate with this:
@@ -136,29 +137,160 @@ var Continuous3dVisualization = function() {
         return material;
     };
 
-    this.draw = function(objects) {
-        group.clear(); // the group contains all the updatable objects
+    // everything on the field stays in the scene from frame to frame, and only moves;
+    // the meshes share geometries and materials, and all the cargo is one instanced mesh.
+    var meshes = new Map(); // id => mesh, for everything but cargo
+    var geometries = new Map(); // by shape and size
+    var materials = new Map(); // by color
+    var cargo = null; // instanced mesh
+    var cargoIndex = new Map(); // id => instance
+    var cargoIds = []; // instance => id
+    var matrix = new THREE.Matrix4();
+    var color = new THREE.Color();
+
+    this.shared = function(cache, key, make) {
+        var value = cache.get(key);
+        if (value === undefined) {
+            value = make();
+            cache.set(key, value);
+        }
+        return value;
+    };
 
-        for (var i in objects) {
-            var p = objects[i];
-            if (p.Shape == "robot") this.drawRobot(p);
-            else if (p.Shape == "cargo") this.drawCargo(p);
-            else if (p.Shape == "obstacle") this.drawObstacle(p);
-            else this.drawCircle(p.x, p.y, p.r, p.color);
-        };
+    this.sharedMaterial = function(color) {
+        return this.shared(materials, color, () => this.material(color));
     };
 
-    this.drawObstacle = function(p) {
-        var thing = new THREE.Mesh(
-            new THREE.CylinderGeometry(p.r, p.r, p.h, 32, 1, true),
-            this.material("gray")
-        );
-        thing.rotateX(Math.PI/2)
-        thing.position.set(p.x, -p.y, p.h/2); // FIXME z dimension
-        thing.side = THREE.DoubleSide;
-        thing.castShadow = true;     // on the field
-        thing.receiveShadow = true;  // on the bottom
-        group.add(thing);
+    // frames: see frames.js
+    this.draw = function(frames) {
+        if (frames.keyframe) this.clear();
+        for (const id of frames.removed) this.remove(id);
+        for (const id of frames.changed) this.update(id, frames.portrayal(id));
+        if (cargo !== null) {
+            cargo.instanceMatrix.needsUpdate = true;
+            if (cargo.instanceColor) cargo.instanceColor.needsUpdate = true;
+        }
+    };
+
+    this.clear = function() {
+        for (const mesh of meshes.values()) group.remove(mesh);
+        meshes.clear();
+        cargoIndex.clear();
+        cargoIds = [];
+        if (cargo !== null) cargo.count = 0;
+    };
+
+    this.remove = function(id) {
+        if (cargoIndex.has(id)) {
+            this.removeCargo(id);
+            return;
+        }
+        var mesh = meshes.get(id);
+        if (mesh === undefined) return;
+        group.remove(mesh);
+        meshes.delete(id);
+    };
+
+    this.update = function(id, p) {
+        if (p.Shape == "cargo") {
+            this.updateCargo(id, p);
+            return;
+        }
+        var mesh = meshes.get(id);
+        if (mesh === undefined) {
+            mesh = this.makeMesh(p);
+            meshes.set(id, mesh);
+            group.add(mesh);
+        }
+        if (p.color !== undefined) mesh.material = this.sharedMaterial(p.color);
+        if (p.Shape == "robot") {
+            mesh.rotation.z = p.angle;
+            mesh.position.set(p.x, -p.y, 0.125); // 19-(13/2)=12.5
+        }
+        else if (p.Shape == "obstacle") mesh.position.set(p.x, -p.y, p.h/2); // FIXME z dimension
+        else mesh.position.set(p.x, -p.y, p.r); // FIXME z dimension
+    };
+
+    this.makeMesh = function(p) {
+        var mesh;
+        if (p.Shape == "robot") {
+            mesh = new THREE.Mesh(
+                this.shared(geometries, "robot " + p.w + " " + p.h, () => this.robotGeometry(p)),
+                this.sharedMaterial(p.color));
+        } else if (p.Shape == "obstacle") {
+            mesh = new THREE.Mesh(
+                this.shared(geometries, "obstacle " + p.r + " " + p.h, () =>
+                    new THREE.CylinderGeometry(p.r, p.r, p.h, 32, 1, true).rotateX(Math.PI/2)),
+                this.sharedMaterial("gray"));
+        } else {
+            mesh = new THREE.Mesh(
+                this.shared(geometries, "circle " + p.r, () => new THREE.SphereGeometry(p.r)),
+                this.sharedMaterial(p.color));
+        }
+        mesh.castShadow = true;     // on the field
+        mesh.receiveShadow = true;  // on the bottom
+        return mesh;
+    };
+
+    // room for at least n balls
+    this.cargoCapacity = function(n) {
+        if (cargo !== null && cargo.instanceMatrix.count >= n) return;
+        var capacity = Math.max(64, 2 * n);
+        var bigger = new THREE.InstancedMesh(
+            this.shared(geometries, "cargo", () => new THREE.SphereGeometry(0.12)), // FIXME radius
+            this.sharedMaterial("white"), // the instance colors multiply this
+            capacity);
+        bigger.castShadow = true;     // on the field
+        bigger.receiveShadow = true;  // on the bottom
+        bigger.count = 0;
+        bigger.frustumCulled = false; // the bounds are for one ball at the origin
+        if (cargo !== null) {
+            for (var i = 0; i < cargo.count; i++) {
+                cargo.getMatrixAt(i, matrix);
+                bigger.setMatrixAt(i, matrix);
+                if (cargo.instanceColor) {
+                    cargo.getColorAt(i, color);
+                    bigger.setColorAt(i, color);
+                }
+            }
+            bigger.count = cargo.count;
+            group.remove(cargo);
+            cargo.dispose();
+        }
+        cargo = bigger;
+        group.add(cargo);
+    };
+
+    this.updateCargo = function(id, p) {
+        var i = cargoIndex.get(id);
+        if (i === undefined) {
+            i = cargoIds.length;
+            this.cargoCapacity(i + 1);
+            cargoIds.push(id);
+            cargoIndex.set(id, i);
+            cargo.count = cargoIds.length;
+        }
+        matrix.makeTranslation(p.x, -p.y, p.z + 0.12);
+        cargo.setMatrixAt(i, matrix);
+        cargo.setColorAt(i, color.set(p.color));
+    };
+
+    // the last ball takes its place
+    this.removeCargo = function(id) {
+        var i = cargoIndex.get(id);
+        var last = cargoIds.length - 1;
+        if (i != last) {
+            var lastId = cargoIds[last];
+            cargo.getMatrixAt(last, matrix);
+            cargo.setMatrixAt(i, matrix);
+            cargo.getColorAt(last, color);
+            cargo.setColorAt(i, color);
+            cargoIds[i] = lastId;
+            cargoIndex.set(lastId, i);
+        }
+        cargoIds.pop();
+        cargoIndex.delete(id);
+        cargo.count = cargoIds.length;
     };
 
     this.robotGeometry = function(p) {
@@ -186,48 +318,6 @@ var Continuous3dVisualization = function() {
         return geometry;
     }
 
-    this.drawRobot = function(p) {
-        var g = this.robotGeometry(p);
-        var robot = new THREE.Mesh(g, this.material(p.color));
-        robot.rotateZ(p.angle);
-        robot.position.set(p.x, -p.y, 0.125); // 19-(13/2)=12.5
-        robot.side = THREE.FrontSide;
-        robot.castShadow = true;     // on the field
-        robot.receiveShadow = true;  // on the bottom
-        group.add(robot);
-    };
-
-    this.drawCargo = function(p) {
-        var cx = p.x;
-        var cy = p.y;
-        var cz = p.z + 0.12;
-        var cargo = new THREE.Mesh(
-            new THREE.SphereGeometry(0.12), // FIXME radius
-            this.material(p.color)
-        );
-        cargo.position.set(cx, -cy, cz);
-        cargo.side = THREE.FrontSide;
-        cargo.castShadow = true;     // on the field
-        cargo.receiveShadow = true;  // on the bottom
-        group.add(cargo);
-    };
-
-    this.drawCircle = function(x, y, radius, color) {
-        var cx = x;
-        var cy = y;
-        var r = radius;
-
-        var thing = new THREE.Mesh(
-            new THREE.SphereGeometry(r),
-            this.material(color)
-        );
-        thing.position.set(cx, -cy, r); // FIXME z dimension
-        thing.side = THREE.FrontSide;
-        thing.castShadow = true;     // on the field
-        thing.receiveShadow = true;  // on the bottom
-        group.add(thing);
-    };
-
     this.animate = function() {
         requestAnimationFrame(() => this.animate() );
         controls.update();
@@ -239,9 +329,15 @@ var Simple_3d_Continuous_Module = function() {
     var canvasDraw2 = new Continuous3dVisualization();
     canvasDraw2.init();
     canvasDraw2.animate();
+    var frames = new Frames();
 
     this.render = function(data) {
-        canvasDraw2.draw(data);
+        frames.update(data);
+        canvasDraw2.draw(frames);
+    };
+
+    this.reset = function() {
+        frames.reset();
     };
 };
 
@@ -1,3 +1,5 @@
+import { Frames } from './frames.js';
+
 // data scale is 1m per unit
 // rendering scale is 1cm per pixel
 var ContinuousVisualization = function(width, height, context) {
@@ -114,13 +116,15 @@ var Simple_Continuous_Module = function(canvas_width, canvas_height) {
 	// Create the context and the drawing controller:
 	var context = canvas.getContext("2d");
 	var canvasDraw = new ContinuousVisualization(canvas_width, canvas_height, context);
+	var frames = new Frames();
 
 	this.render = function(data) {
 		canvasDraw.resetCanvas();
-		canvasDraw.draw(data);
+		canvasDraw.draw(frames.apply(data));
 	};
 
 	this.reset = function() {
+		frames.reset();
 		canvasDraw.resetCanvas();
 	};
 
@@ -0,0 +1,184 @@
+""" the whole state of a match at one moment, to go back to, or to branch from.
+
+a snapshot is taken between steps, and never changes, so any number of branches can
+share it.  restore() puts a model back the way it was, and fork() makes a new model
+from it without placing anything again, so trying something out in the middle of a
+match only costs the steps after it:
+
+    snapshot = model.snapshot()
+    for choice in choices:
+        branch = model.fork(snapshot)
+        ... make the choice, run the rest of the match ...
+
+the space is made again in the same order it was in, and the shuffle and the noise
+come from the same generator states, so a model that goes on from a snapshot and any
+model restored from it do exactly the same thing.  each branch gets its own copies of
+the generators, so branches can be run in any order, or interleaved.
+"""
+import copy
+import random
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from numpy.typing import NDArray
+from .agent import Cargo, Robot, Thing
+from .delay import MultiDelay
+from .space import PartitionKey
+
+# the model's delays, by attribute name
+DELAYS = ('blue_terminal', 'red_terminal', 'lower_hub', 'upper_hub', 'out_of_bounds')
+# an empty robot slot
+EMPTY = -1
+
+def frozen(array: NDArray[Any]) -> NDArray[Any]:
+    """ read only, so branches can share it """
+    array.flags.writeable = False
+    return array
+
+def everything(model: 'Model') -> List[Thing]: # type:ignore
+    """ all the agents, on the field, in delays, or held by robots, in the order of ids """
+    scheduled: List[Thing] = list(model.schedule._agents.values()) # pylint: disable=protected-access
+    by_id: Dict[int, Thing] = {a.unique_id: a for a in scheduled}
+    for name in DELAYS:
+        for item, _ in getattr(model, name).deque:
+            by_id[item.unique_id] = item
+    for robot in scheduled:
+        if isinstance(robot, Robot):
+            for item in (robot.slot1, robot.slot2):
+                if item is not None:
+                    by_id[item.unique_id] = item
+    return [by_id[i] for i in sorted(by_id)]
+
+class DelayState:
+    """ what's in one delay, and when it comes out """
+    def __init__(self, delay: MultiDelay[Cargo], row: Dict[int, int]) -> None:
+        self.rows = frozen(np.array([row[item.unique_id] for item, _ in delay.deque],
+                                    dtype=np.int64))
+        self.release_times = frozen(np.array([t for _, t in delay.deque], dtype=float))
+        self.free_times = tuple(delay.free_times)
+        self.latest_put_time: float = delay.latest_put_time
+        self.latest_get_time: float = delay.latest_get_time
+
+    def restore(self, delay: MultiDelay[Cargo], agents: List[Thing]) -> None:
+        delay.deque = deque(zip([agents[k] for k in self.rows], self.release_times.tolist()))
+        delay.free_times = list(self.free_times)
+        delay.latest_put_time = self.latest_put_time
+        delay.latest_get_time = self.latest_get_time
+
+class Snapshot:
+    """ agent state is in arrays by row, in the order of ids, with nan positions for
+    things that aren't on the field; the rest says which rows are where. """
+    def __init__(self, model: 'Model') -> None: # type:ignore
+        # from here on the model finds neighbors the way a restored one would
+        model.space.invalidate()
+        self.model = model
+        scheduled: List[Thing] = list(model.schedule._agents.values()) # pylint: disable=protected-access
+        robots = [a for a in scheduled if isinstance(a, Robot)]
+        # the originals, for what never changes, like the radius or the alliance
+        self.agents = everything(model)
+        self.ids = frozen(np.array([a.unique_id for a in self.agents], dtype=np.int64))
+        row = {i: k for k, i in enumerate(self.ids.tolist())}
+        self.on_field = frozen(np.array([a._pos is not None for a in self.agents], # pylint: disable=protected-access
+                                        dtype=bool))
+        self.pos = frozen(np.array([(np.nan, np.nan, np.nan) if a._pos is None else a._pos # pylint: disable=protected-access
+                                    for a in self.agents], dtype=float).reshape(-1, 3))
+        self.vel = frozen(np.array([a._velocity for a in self.agents], # pylint: disable=protected-access
+                                   dtype=float).reshape(-1, 3))
+        # robot, slot1, slot2
+        self.slots = frozen(np.array(
+            [(row[r.unique_id],
+              EMPTY if r.slot1 is None else row[r.slot1.unique_id],
+              EMPTY if r.slot2 is None else row[r.slot2.unique_id]) for r in robots],
+            dtype=np.int64).reshape(-1, 3))
+        # what each of those robots is doing, see behaviour.py
+        self.states = frozen(np.array([r.state for r in robots], dtype=np.int64))
+        self.schedule = frozen(np.array([row[a.unique_id] for a in scheduled], dtype=np.int64))
+        space = model.space
+        self.space = frozen(np.array(
+            [row[space._index_to_agent[i].unique_id] # pylint: disable=protected-access
+             for i in range(len(space._agent_to_index))], dtype=np.int64)) # pylint: disable=protected-access
+        self.partitions: List[Tuple[PartitionKey, NDArray[np.int64]]] = [
+            (key, frozen(np.array([row[a.unique_id] for a in p.agents], dtype=np.int64)))
+            for key, p in space._partitions.items()] # pylint: disable=protected-access
+        self.delays = {name: DelayState(getattr(model, name), row) for name in DELAYS}
+        self.upper_count: int = model.hub.upper_count
+        self.lower_count: int = model.hub.lower_count
+        self.exit: int = model.hub.exit
+        self.steps: int = model.schedule.steps
+        self.time: float = model.schedule.time
+        self.running: bool = model.running
+        self.random = model.random.getstate()
+        self.rng = model.rng.bit_generator.state
+        collector = model.datacollector
+        self.model_vars = {k: tuple(v) for k, v in collector.model_vars.items()}
+        self.agent_records = dict(collector._agent_records) # pylint: disable=protected-access
+
+def restore(model: 'Model', snapshot: Snapshot, # type:ignore
+            agents: Optional[List[Thing]] = None) -> None:
+    """ put the model back the way it was when the snapshot was taken.
+
+        agents: in the order of snapshot.ids, the snapshot's own if not given
+    """
+    if agents is None:
+        if model is not snapshot.model:
+            raise ValueError("snapshot of another model, use fork()")
+        agents = snapshot.agents
+    for k, agent in enumerate(agents):
+        agent._pos = snapshot.pos[k].tolist() if snapshot.on_field[k] else None # pylint: disable=protected-access
+        agent._velocity = snapshot.vel[k].tolist() # pylint: disable=protected-access
+    for (r, slot1, slot2), robot_state in zip(snapshot.slots.tolist(), snapshot.states.tolist()):
+        agents[r].slot1 = None if slot1 == EMPTY else agents[slot1]
+        agents[r].slot2 = None if slot2 == EMPTY else agents[slot2]
+        agents[r].state = robot_state
+
+    old = model.space
+    space = type(old)(old.skin_m, old.loose_limit, old.cell_m)
+    for k in snapshot.space:
+        space.place_agent(agents[k], agents[k].pos)
+    space.arrange([(key, [agents[k] for k in rows]) for key, rows in snapshot.partitions])
+    model.space = space
+
+    schedule = type(model.schedule)(model)
+    for k in snapshot.schedule:
+        schedule.add(agents[k])
+    schedule.steps = snapshot.steps
+    schedule.time = snapshot.time
+    model.schedule = schedule
+
+    for name, state in snapshot.delays.items():
+        state.restore(getattr(model, name), agents)
+    model.hub.upper_count = snapshot.upper_count
+    model.hub.lower_count = snapshot.lower_count
+    model.hub.exit = snapshot.exit
+    model.running = snapshot.running
+    # mesa keeps one generator per model class, and forks start out sharing the
+    # source's rng, so give this model its own of each
+    model.random = random.Random()
+    model.random.setstate(snapshot.random)
+    model.rng = np.random.default_rng()
+    model.rng.bit_generator.state = snapshot.rng
+    collector = model.datacollector
+    collector.model_vars = {k: list(v) for k, v in snapshot.model_vars.items()}
+    collector._agent_records = dict(snapshot.agent_records) # pylint: disable=protected-access
+
+def clone(agent: Thing, model: 'Model') -> Thing: # type:ignore
+    """ a copy belonging to the model; restore() sets the rest """
+    twin = copy.copy(agent)
+    twin.model = model
+    return twin
+
+def fork(snapshot: Snapshot) -> 'Model': # type:ignore
+    """ a new model in the state of the snapshot, with its own agents """
+    source = snapshot.model
+    # not copy.copy(), since mesa's __new__ would reseed the class generator
+    branch = object.__new__(type(source))
+    branch.__dict__.update(source.__dict__)
+    for name in DELAYS:
+        setattr(branch, name, copy.copy(getattr(source, name)))
+    branch.hub = copy.copy(source.hub)
+    branch.hub.upper = branch.upper_hub
+    branch.hub.lower = branch.lower_hub
+    branch.datacollector = copy.copy(source.datacollector)
+    branch.navigator = source.navigator.copy()
+    restore(branch, snapshot, [clone(a, branch) for a in snapshot.agents])
+    return branch
@@ -1,4 +1,5 @@
-from typing import Dict, List, Optional, Set, Tuple, Union
+import math
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
 import numpy as np
 from numpy.typing import NDArray
 from mesa.agent import Agent # type:ignore
@@ -6,6 +7,8 @@ from mesa.agent import Agent # type:ignore
 GridContent = Union[Optional[Agent], Set[Agent]]
 # used in Continuous3dSpace
 FloatCoordinate = Union[Tuple[float, float, float], np.ndarray]
+# bottom and top
+ZRange = Tuple[float, float]
 
 class Continuous3dSpace:
     """Continuous space where each agent can have an arbitrary position.
@@ -205,28 +208,324 @@ class Continuous3dSpace:
             return True
         return False
 
+# the grid behind the nearest-neighbor and segment queries
+GRID_CELL_M = 1.0
+
+Cell = Tuple[int, int]
+
+class GridIndex:
+    """ agents bucketed by xy cell, so searches can start close and grow outward """
+    def __init__(self, cell_m: float = GRID_CELL_M) -> None:
+        self.cell_m = cell_m
+        self.cells: Dict[Cell, Dict[Agent, None]] = {}
+        self.cell_of: Dict[Agent, Cell] = {}
+        # for padding searches by the biggest thing
+        self.max_radius_m: float = 0
+        # every cell ever used is inside these, min i, min j, max i, max j
+        self.bounds: Optional[Tuple[int, int, int, int]] = None
+
+    def key(self, x: float, y: float) -> Cell:
+        return (math.floor(x / self.cell_m), math.floor(y / self.cell_m))
+
+    def put(self, agent: Agent, cell: Cell) -> None:
+        members = self.cells.get(cell)
+        if members is None:
+            members = {}
+            self.cells[cell] = members
+            if self.bounds is None:
+                self.bounds = (cell[0], cell[1], cell[0], cell[1])
+            else:
+                b = self.bounds
+                self.bounds = (min(b[0], cell[0]), min(b[1], cell[1]),
+                               max(b[2], cell[0]), max(b[3], cell[1]))
+        members[agent] = None
+        self.cell_of[agent] = cell
+
+    def add(self, agent: Agent, x: float, y: float) -> None:
+        self.put(agent, self.key(x, y))
+        self.max_radius_m = max(self.max_radius_m, getattr(agent, 'radius_m', 0))
+
+    def move(self, agent: Agent, x: float, y: float) -> None:
+        cell = self.key(x, y)
+        if cell == self.cell_of[agent]:
+            return
+        self.remove(agent)
+        self.put(agent, cell)
+
+    def remove(self, agent: Agent) -> None:
+        cell = self.cell_of.pop(agent)
+        members = self.cells[cell]
+        del members[agent]
+        if not members:
+            del self.cells[cell]
+
+    def ring(self, center: Cell, r: int) -> Iterator[Dict[Agent, None]]:
+        """ the occupied cells exactly r cells away from center """
+        cx, cy = center
+        if r == 0:
+            cells = [center]
+        else:
+            cells = ([(cx + i, cy - r) for i in range(-r, r + 1)]
+                     + [(cx + i, cy + r) for i in range(-r, r + 1)]
+                     + [(cx - r, cy + j) for j in range(-r + 1, r)]
+                     + [(cx + r, cy + j) for j in range(-r + 1, r)])
+        for cell in cells:
+            members = self.cells.get(cell)
+            if members:
+                yield members
+
+    def rings_to_cover(self, center: Cell) -> int:
+        """ the ring beyond which there's nothing """
+        if self.bounds is None:
+            return 0
+        b = self.bounds
+        return max(center[0] - b[0], center[1] - b[1], b[2] - center[0], b[3] - center[1], 0)
+
+    def box(self, x0: float, y0: float, x1: float, y1: float) -> Iterator[Dict[Agent, None]]:
+        """ the occupied cells touching the rectangle from (x0, y0) up to (x1, y1) """
+        lo = self.key(x0, y0)
+        hi = self.key(x1, y1)
+        for i in range(lo[0], hi[0] + 1):
+            for j in range(lo[1], hi[1] + 1):
+                members = self.cells.get((i, j))
+                if members:
+                    yield members
+
+def matches(agent: Agent, kind: Any, alliance: Any) -> bool:
+    """ kind is a class or a tuple of classes, as for isinstance """
+    if kind is not None and not isinstance(agent, kind):
+        return False
+    return alliance is None or getattr(agent, 'alliance', None) is alliance
+
+# the type and the alliance, if any
+PartitionKey = Tuple[type, Any]
+
+class Partition:
+    """ the agents of one type and alliance, e.g. red cargo, with their own points and
+    grid, so queries for just those don't look at anything else. """
+    def __init__(self, key: PartitionKey, cell_m: float) -> None:
+        self.key = key
+        self.agents: List[Agent] = []
+        self.index: Dict[Agent, int] = {}
+        # rows past len(agents) are spare room
+        self.points: NDArray[np.float64] = np.zeros((8, 3))
+        self.extents: NDArray[np.float64] = np.zeros((8, 2))
+        self.grid = GridIndex(cell_m)
+
+    def matches(self, kind: Any, alliance: Any) -> bool:
+        if kind is not None and not issubclass(self.key[0], kind):
+            return False
+        return alliance is None or self.key[1] is alliance
+
+    def add(self, agent: Agent, pos: FloatCoordinate, lo: float, hi: float) -> None:
+        n = len(self.agents)
+        if n == self.points.shape[0]:
+            self.points = np.concatenate((self.points, np.zeros_like(self.points)))
+            self.extents = np.concatenate((self.extents, np.zeros_like(self.extents)))
+        self.agents.append(agent)
+        self.index[agent] = n
+        self.set(n, pos, lo, hi)
+        self.grid.add(agent, pos[0], pos[1])
+
+    def set(self, i: int, pos: FloatCoordinate, lo: float, hi: float) -> None:
+        self.points[i, 0] = pos[0]
+        self.points[i, 1] = pos[1]
+        self.points[i, 2] = pos[2]
+        self.extents[i, 0] = lo
+        self.extents[i, 1] = hi
+
+    def move(self, agent: Agent, pos: FloatCoordinate, lo: float, hi: float) -> None:
+        self.set(self.index[agent], pos, lo, hi)
+        self.grid.move(agent, pos[0], pos[1])
+
+    def remove(self, agent: Agent) -> None:
+        """ the last one takes its place, so order isn't kept """
+        i = self.index.pop(agent)
+        last = self.agents.pop()
+        if last is not agent:
+            n = len(self.agents)
+            self.agents[i] = last
+            self.index[last] = i
+            self.points[i] = self.points[n]
+            self.extents[i] = self.extents[n]
+        self.grid.remove(agent)
+
+    def within(self, pos: FloatCoordinate, radius: float, include_center: bool,
+               z_range: Optional[ZRange]) -> List[Agent]:
+        n = len(self.agents)
+        dx = self.points[:n, 0] - pos[0]
+        dy = self.points[:n, 1] - pos[1]
+        dists = dx * dx + dy * dy
+        inside = dists <= radius ** 2
+        if not include_center:
+            inside &= dists > 0
+        if z_range is not None:
+            inside &= (self.extents[:n, 0] <= z_range[1]) & (self.extents[:n, 1] >= z_range[0])
+        (idxs,) = np.where(inside)
+        return [self.agents[i] for i in idxs]
+
+# neighbor lists are built this much bigger than asked for, and reused until
+# something moves more than half of it, so most ticks don't scan the whole field.
+SKIN_M = 0.5
+# things placed, or moved further than that, are checked by every query until
+# there are this many of them, then the lists are built again.
+LOOSE_LIMIT = 32
+
 # Similar but simpler than above, no limit, no torus.
 class LimitlessContinuous3dSpace:
-    def __init__(self) -> None:
+    def __init__(self, skin_m: float = SKIN_M, loose_limit: int = LOOSE_LIMIT,
+                 cell_m: float = GRID_CELL_M) -> None:
         self._agent_points: Optional[NDArray[np.float64]] = None
         self._index_to_agent: Dict[int, Agent] = {}
         self._agent_to_index: Dict[Agent, int] = {}
+        # vertical extent of each agent, see z_extent()
+        self._agent_extents: Optional[NDArray[np.float64]] = None
+        # x, y, bottom, top, quicker to read one at a time
+        self._boxes: List[Tuple[float, float, float, float]] = []
+        self.skin_m = skin_m
+        self.loose_limit = loose_limit
+        self._half_skin_squared = (skin_m / 2) ** 2
+        # verlet lists: candidates by (agent, radius), from the positions at the epoch
+        self._lists: Dict[Tuple[Agent, float, Any, Any], List[Agent]] = {}
+        self._epoch_points: Optional[NDArray[np.float64]] = None
+        self._epoch_agents: List[Agent] = []
+        self._epoch_xy: Dict[Agent, Tuple[float, float]] = {}
+        # agents the lists don't cover, in the order they got loose
+        self._loose: Dict[Agent, None] = {}
+        self.hits: int = 0 # queries answered from a list
+        self.builds: int = 0 # lists built
+        self.rebuilds: int = 0 # times all the lists were thrown away
+        self.cell_m = cell_m
+        # see Partition
+        self._partitions: Dict[PartitionKey, Partition] = {}
+        self._partition_of: Dict[Agent, Partition] = {}
+        self._selections: Dict[Tuple[Any, Any], List[Partition]] = {}
+
+    def invalidate(self) -> None:
+        """ forget the neighbor lists, they're built again as needed """
+        if self._epoch_points is not None:
+            self.rebuilds += 1
+        self._lists = {}
+        self._epoch_points = None
+        self._epoch_agents = []
+        self._epoch_xy = {}
+        self._loose = {}
+
+    def start_epoch(self) -> None:
+        self._epoch_points = np.array(self._agent_points[:, :2]) # type:ignore
+        self._epoch_agents = [self._index_to_agent[i] for i in range(len(self._boxes))]
+        self._epoch_xy = {a: (b[0], b[1]) for a, b in zip(self._epoch_agents, self._boxes)}
+
+    def check_loose(self, agent: Agent, pos: FloatCoordinate) -> None:
+        """ mark the agent loose if the lists don't cover it at pos """
+        if self._epoch_points is None or agent in self._loose:
+            return
+        epoch_xy = self._epoch_xy.get(agent)
+        if epoch_xy is not None:
+            dx = pos[0] - epoch_xy[0]
+            dy = pos[1] - epoch_xy[1]
+            if dx * dx + dy * dy <= self._half_skin_squared:
+                return
+        self._loose[agent] = None
+        if len(self._loose) > self.loose_limit:
+            self.invalidate()
+
+    def partitions(self, kind: Any = None, alliance: Any = None) -> List[Partition]:
+        """ the partitions holding things of kind (a class or a tuple of classes) and
+        alliance, None for any """
+        selection = self._selections.get((kind, alliance))
+        if selection is None:
+            selection = [p for p in self._partitions.values() if p.matches(kind, alliance)]
+            self._selections[(kind, alliance)] = selection
+        return selection
+
+    def partition_for(self, agent: Agent) -> Partition:
+        key = (type(agent), getattr(agent, 'alliance', None))
+        partition = self._partitions.get(key)
+        if partition is None:
+            partition = Partition(key, self.cell_m)
+            self._partitions[key] = partition
+            self._selections = {}
+        return partition
+
+    def arrange(self, orders: List[Tuple[PartitionKey, List[Agent]]]) -> None:
+        """ make the partitions again in this order, each with its agents in this order,
+        which is the order queries return them in.  every agent in the space must be in
+        one of them. """
+        partitions: Dict[PartitionKey, Partition] = {}
+        for key, agents in orders:
+            partition = Partition(key, self.cell_m)
+            for agent in agents:
+                idx = self._agent_to_index[agent]
+                b = self._boxes[idx]
+                partition.add(agent, self._agent_points[idx], b[2], b[3]) # type:ignore
+                self._partition_of[agent] = partition
+            partitions[key] = partition
+        self._partitions = partitions
+        self._selections = {}
+
+    @staticmethod
+    def z_extent(agent: Agent, pos: FloatCoordinate) -> ZRange:
+        """ the agent's own idea of its extent if it has one, otherwise it's a point """
+        extent: Optional[ZRange] = getattr(agent, 'z_extent_m', None)
+        if extent is None:
+            return (pos[2], pos[2])
+        return extent
 
     def place_agent(self, agent: Agent, pos: FloatCoordinate) -> None:
+        agent.pos = pos
+        lo, hi = self.z_extent(agent, pos)
         if self._agent_points is None:
             self._agent_points = np.array([pos])
+            self._agent_extents = np.array([(lo, hi)])
         else:
             self._agent_points = np.append(self._agent_points, np.array([pos]), axis=0)
+            self._agent_extents = np.append(self._agent_extents, np.array([(lo, hi)]), axis=0)
         self._index_to_agent[self._agent_points.shape[0] - 1] = agent
         self._agent_to_index[agent] = self._agent_points.shape[0] - 1
-        agent.pos = pos
+        self._boxes.append((pos[0], pos[1], lo, hi))
+        partition = self.partition_for(agent)
+        partition.add(agent, pos, lo, hi)
+        self._partition_of[agent] = partition
+        self.check_loose(agent, pos)
+
+    def place_agents(self, agents: List[Agent], points: NDArray[np.float64]) -> None:
+        """ like place_agent for each, in order, but growing the arrays just once """
+        if not agents:
+            return
+        extents = np.array([self.z_extent(agent, pos) for agent, pos in zip(agents, points)])
+        n = 0 if self._agent_points is None else self._agent_points.shape[0]
+        if self._agent_points is None:
+            self._agent_points = np.array(points, dtype=np.float64)
+            self._agent_extents = extents
+        else:
+            self._agent_points = np.concatenate((self._agent_points, points))
+            self._agent_extents = np.concatenate((self._agent_extents, extents)) # type:ignore
+        for k, agent in enumerate(agents):
+            pos = self._agent_points[n + k]
+            agent.pos = pos
+            lo, hi = extents[k]
+            self._index_to_agent[n + k] = agent
+            self._agent_to_index[agent] = n + k
+            self._boxes.append((float(pos[0]), float(pos[1]), float(lo), float(hi)))
+            partition = self.partition_for(agent)
+            partition.add(agent, pos, lo, hi)
+            self._partition_of[agent] = partition
+            self.check_loose(agent, pos)
 
     def move_agent(self, agent: Agent, pos: FloatCoordinate) -> None:
         idx = self._agent_to_index[agent]
+        agent.pos = pos
+        lo, hi = self.z_extent(agent, pos)
         if self._agent_points is not None:
             self._agent_points[idx, 0] = pos[0]
             self._agent_points[idx, 1] = pos[1]
-        agent.pos = pos
+            self._agent_points[idx, 2] = pos[2]
+            self._agent_extents[idx, 0] = lo # type:ignore
+            self._agent_extents[idx, 1] = hi # type:ignore
+        self._boxes[idx] = (pos[0], pos[1], lo, hi)
+        self._partition_of[agent].move(agent, pos, lo, hi)
+        self.check_loose(agent, pos)
 
     def remove_agent(self, agent: Agent) -> None:
         if agent not in self._agent_to_index:
@@ -236,6 +535,9 @@ class LimitlessContinuous3dSpace:
         max_idx = max(self._index_to_agent.keys())
         # Delete the agent's position and decrement the index/agent mapping
         self._agent_points = np.delete(self._agent_points, idx, axis=0)
+        self._agent_extents = np.delete(self._agent_extents, idx, axis=0)
+        del self._boxes[idx]
+        self._partition_of.pop(agent).remove(agent)
         for a, index in self._agent_to_index.items():
             if index > idx:
                 self._agent_to_index[a] = index - 1
@@ -245,17 +547,174 @@ class LimitlessContinuous3dSpace:
         agent.pos = None
 
     def get_neighbors(
-        self, pos: FloatCoordinate, radius: float, include_center: bool = True
+        self, pos: FloatCoordinate, radius: float, include_center: bool = True,
+        z_range: Optional[ZRange] = None, kind: Any = None, alliance: Any = None
     ) -> List[GridContent]:
+        """ within radius in xy, and, if z_range is given, overlapping it vertically.
+        given kind or alliance, only those partitions are searched. """
+        if kind is not None or alliance is not None:
+            found: List[GridContent] = []
+            for partition in self.partitions(kind, alliance):
+                found.extend(partition.within(pos, radius, include_center, z_range))
+            return found
         deltas = np.abs(self._agent_points - np.array(pos))
         dists = deltas[:, 0] ** 2 + deltas[:, 1] ** 2
 
-        (idxs,) = np.where(dists <= radius ** 2)
+        inside = dists <= radius ** 2
+        if z_range is not None:
+            inside &= ((self._agent_extents[:, 0] <= z_range[1]) # type:ignore
+                       & (self._agent_extents[:, 1] >= z_range[0])) # type:ignore
+        (idxs,) = np.where(inside)
         neighbors = [
             self._index_to_agent[x] for x in idxs if include_center or dists[x] > 0
         ]
         return neighbors
 
+    def get_agent_neighbors(self, agent: Agent, radius: float, kind: Any = None,
+                            alliance: Any = None) -> List[GridContent]:
+        """ like get_neighbors(agent.pos, radius, False) but never the agent itself,
+        only things overlapping it vertically, and usually without scanning everything. """
+        pos = agent.pos
+        lo, hi = self.z_extent(agent, pos)
+        if self._epoch_points is None:
+            self.start_epoch()
+        self.check_loose(agent, pos)
+        if self._epoch_points is None:
+            self.start_epoch() # that was one too many loose agents
+        if agent in self._loose:
+            return [a for a in self.get_neighbors(pos, radius, False, (lo, hi), kind, alliance)
+                    if a is not agent]
+        key = (agent, radius, kind, alliance)
+        candidates = self._lists.get(key)
+        if candidates is None:
+            reach = radius + self.skin_m
+            epoch_xy = self._epoch_xy[agent]
+            deltas = self._epoch_points - epoch_xy # type:ignore
+            (rows,) = np.where(deltas[:, 0] ** 2 + deltas[:, 1] ** 2 <= reach ** 2)
+            candidates = [self._epoch_agents[i] for i in rows
+                          if self._epoch_agents[i] is not agent
+                          and matches(self._epoch_agents[i], kind, alliance)]
+            self._lists[key] = candidates
+            self.builds += 1
+        else:
+            self.hits += 1
+        x = pos[0]
+        y = pos[1]
+        radius_squared = radius ** 2
+        loose = self._loose
+        index = self._agent_to_index
+        boxes = self._boxes
+        neighbors = []
+        for other in candidates:
+            if other in loose:
+                continue
+            idx = index.get(other)
+            if idx is None:
+                continue # removed
+            b = boxes[idx]
+            if b[2] > hi or b[3] < lo:
+                continue # above or below
+            dx = b[0] - x
+            dy = b[1] - y
+            if 0 < dx * dx + dy * dy <= radius_squared:
+                neighbors.append(other)
+        selected = (kind is not None or alliance is not None)
+        for other in loose:
+            idx = index.get(other)
+            if idx is None or other is agent:
+                continue
+            if selected and not matches(other, kind, alliance):
+                continue
+            b = boxes[idx]
+            if b[2] > hi or b[3] < lo:
+                continue
+            dx = b[0] - x
+            dy = b[1] - y
+            if 0 < dx * dx + dy * dy <= radius_squared:
+                neighbors.append(other)
+        return neighbors
+
+    def get_nearest(self, pos: FloatCoordinate, k: int = 1, kind: Any = None,
+                    alliance: Any = None, max_radius: float = math.inf,
+                    z_range: Optional[ZRange] = None,
+                    exclude: Optional[Agent] = None) -> List[Agent]:
+        """ the k nearest in xy, nearest first, optionally only of one kind (class or tuple
+        of classes), one alliance, within max_radius, or overlapping z_range vertically. """
+        found: List[Tuple[float, int, Agent]] = []
+        for partition in self.partitions(kind, alliance):
+            found.extend(self.nearest_in(partition.grid, pos, k, max_radius, z_range, exclude))
+        found.sort(key=lambda f: (f[0], f[1]))
+        return [f[2] for f in found[:k]]
+
+    def nearest_in(self, grid: GridIndex, pos: FloatCoordinate, k: int, max_radius: float,
+                   z_range: Optional[ZRange],
+                   exclude: Optional[Agent]) -> List[Tuple[float, int, Agent]]:
+        """ up to k (squared distance, index, agent) from one grid, a ring at a time """
+        x = pos[0]
+        y = pos[1]
+        center = grid.key(x, y)
+        last_ring = grid.rings_to_cover(center)
+        found: List[Tuple[float, int, Agent]] = []
+        max_squared = max_radius * max_radius
+        for r in range(last_ring + 1):
+            for members in grid.ring(center, r):
+                for agent in members:
+                    if agent is exclude:
+                        continue
+                    idx = self._agent_to_index[agent]
+                    b = self._boxes[idx]
+                    if z_range is not None and (b[2] > z_range[1] or b[3] < z_range[0]):
+                        continue
+                    dx = b[0] - x
+                    dy = b[1] - y
+                    d = dx * dx + dy * dy
+                    if d <= max_squared:
+                        found.append((d, idx, agent))
+            # everything further out is at least r cells away
+            if len(found) >= k:
+                found.sort(key=lambda f: (f[0], f[1]))
+                del found[k:]
+                edge = r * grid.cell_m
+                if found[-1][0] <= edge * edge:
+                    break
+            if r * grid.cell_m > max_radius:
+                break
+        return found
+
+    def get_intersecting(self, start: FloatCoordinate, end: FloatCoordinate,
+                         pad_m: float = 0, kind: Any = None,
+                         exclude: Optional[Agent] = None) -> List[Agent]:
+        """ things the straight segment from start to end passes through, nearest start
+        first: within radius_m + pad_m in xy of the segment, and with the segment's height
+        at the closest point inside the thing's vertical extent, padded. """
+        sx, sy, sz = start[0], start[1], start[2]
+        dx, dy, dz = end[0] - sx, end[1] - sy, end[2] - sz
+        length_squared = dx * dx + dy * dy
+        hits: List[Tuple[float, Agent]] = []
+        for partition in self.partitions(kind):
+            margin = partition.grid.max_radius_m + pad_m
+            for members in partition.grid.box(
+                    min(sx, end[0]) - margin, min(sy, end[1]) - margin,
+                    max(sx, end[0]) + margin, max(sy, end[1]) + margin):
+                for agent in members:
+                    if agent is exclude:
+                        continue
+                    b = self._boxes[self._agent_to_index[agent]]
+                    t = 0.0
+                    if length_squared > 0:
+                        t = min(1.0, max(0.0, ((b[0] - sx) * dx + (b[1] - sy) * dy)
+                                         / length_squared))
+                    cx = sx + t * dx - b[0]
+                    cy = sy + t * dy - b[1]
+                    reach = getattr(agent, 'radius_m', 0) + pad_m
+                    if cx * cx + cy * cy > reach * reach:
+                        continue
+                    z = sz + t * dz
+                    if b[2] - pad_m <= z <= b[3] + pad_m:
+                        hits.append((t, agent))
+        hits.sort(key=lambda h: h[0])
+        return [h[1] for h in hits]
+
     def get_heading(
         self, pos_1: FloatCoordinate, pos_2: FloatCoordinate
     ) -> FloatCoordinate:
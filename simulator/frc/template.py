@@ -0,0 +1,42 @@
+""" the field's fixed parts, made once and copied into each new model.
+
+the hub, the hangars and the terminals are the same in every match, but making them
+one obstacle at a time, growing the space's arrays each time, costs every new model
+the same again, which adds up in batch runs.  the first model of each class makes
+them as usual and they're kept here, without the model, so later models of that
+class just get copies, put into the space all at once.  making obstacles doesn't
+use any randomness, so the copies leave seeded runs exactly as they were.
+"""
+from typing import Any, Dict, List
+import numpy as np
+from numpy.typing import NDArray
+from mesa import Agent, Model # type: ignore
+
+class FieldTemplate:
+    def __init__(self, agents: List[Agent]) -> None:
+        """ agents: the fixed ones, already placed, in the order they were """
+        self.points: NDArray[np.float64] = np.array([a.pos for a in agents], dtype=np.float64)
+        self.points.flags.writeable = False
+        self.protos = [self.copy(agent, None) for agent in agents]
+
+    def __len__(self) -> int:
+        return len(self.protos)
+
+    @staticmethod
+    def copy(agent: Agent, model: Any) -> Agent:
+        """ a new agent with the same state, belonging to model """
+        clone = object.__new__(type(agent))
+        clone.__dict__ = {k: list(v) if isinstance(v, list) else v
+                          for k, v in agent.__dict__.items()}
+        clone.model = model
+        return clone
+
+    def stamp(self, model: Model) -> None:
+        """ copies of the agents into model's space and schedule """
+        agents = [self.copy(proto, model) for proto in self.protos]
+        model.space.place_agents(agents, self.points)
+        for agent in agents:
+            model.schedule.add(agent)
+
+# by model class, see RobotFlockers.make_field()
+TEMPLATES: Dict[type, FieldTemplate] = {}
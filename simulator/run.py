@@ -1,2 +1,9 @@
-from frc.server import server
-server.launch()
+import sys
+from frc.server import broadcast_server, live_server, replay_server, server
+if len(sys.argv) > 1 and sys.argv[1] in ("--live", "--broadcast"):
+    make = live_server if sys.argv[1] == "--live" else broadcast_server
+    make(float(sys.argv[2]) if len(sys.argv) > 2 else None).launch()
+elif len(sys.argv) > 1:
+    replay_server(sys.argv[1]).launch()
+else:
+    server.launch()
@@ -2,7 +2,8 @@ import unittest
 from typing import Any
 import numpy as np
 
-from frc.agent import Thing # pylint: disable=import-error
+from frc.agent import Cargo, Obstacle, Robot, Thing # pylint: disable=import-error
+from frc.alliance import Alliance # pylint: disable=import-error
 
 class FakeSpace():
     def move_agent(self, x: Any, y: Any) -> None:
@@ -24,3 +25,35 @@ class TestAgent(unittest.TestCase):
         self.assertFalse(x.is_colliding(y))
         x.check_wall_collision(10, 10)
         x.check_ball_collision(y)
+
+    def test_extent(self) -> None:
+        m = FakeModel()
+        self.assertEqual((1, 1.24), Cargo(0, m, (0, 0, 1), Alliance.RED).z_extent_m)
+        self.assertEqual((0, 1.32), Robot(0, m, (0, 0, 0), Alliance.RED).z_extent_m)
+        self.assertEqual((0, 0.57), Obstacle(0, m, (0, 0, 0), 0.19, 0.57).z_extent_m)
+        self.assertEqual((0, 1.32), Obstacle(0, m, (0, 0, 0), 0.67, 2.64, 1.32).z_extent_m)
+        with self.assertRaises(ValueError):
+            Obstacle(0, m, (0, 0, 0), 2, 1)
+
+    def test_over_post(self) -> None:
+        m = FakeModel()
+        post = Obstacle(0, m, (0, 0, 0), 0.19, 0.57)
+        ball = Cargo(1, m, (0.2, 0, 0.6), Alliance.RED) # just above
+        ball.velocity = (-1, 0, 0)
+        self.assertFalse(post.check_ball_collision(ball))
+        ball.pos = (0.2, 0, 0.5) # hits the side
+        self.assertTrue(post.check_ball_collision(ball))
+        # pushed out and bounced sideways, not up
+        np.testing.assert_almost_equal((0.31, 0, 0.5), ball.pos)
+        np.testing.assert_almost_equal((1, 0, 0), ball.velocity)
+
+    def test_over_robot(self) -> None:
+        m = FakeModel()
+        robot = Robot(0, m, (0, 0, 0), Alliance.RED)
+        ball = Cargo(1, m, (0.3, 0, 1.4), Alliance.RED)
+        self.assertFalse(robot.check_ball_collision(ball))
+        ball.pos = (0.3, 0, 1.0)
+        self.assertTrue(robot.check_ball_collision(ball))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import numpy as np
+
+from frc.agent import Cargo # pylint: disable=import-error
+from frc.alliance import Alliance # pylint: disable=import-error
+from frc.batch import BatchFlockers, UPPER_HUB_DELAY # pylint: disable=import-error
+from frc.model import CalRobotFlockers, CalV, RobotFlockers # pylint: disable=import-error
+
+class Bump(RobotFlockers):
+    # override
+    def make_agents(self) -> None:
+        # two balls rolling into each other
+        for i, x, v in ((0, 5, 1), (1, 5.2, -1)):
+            cargo = Cargo(i, self, (x, 4, 0), Alliance.RED)
+            cargo.velocity = (v, 0, 0)
+            self.space.place_agent(cargo, (x, 4, 0))
+            self.schedule.add(cargo)
+
+class Lob(RobotFlockers):
+    # override
+    def make_agents(self) -> None:
+        # one ball thrown up the field, to test drag
+        cargo = Cargo(0, self, (2, 4, 1), Alliance.RED)
+        cargo.velocity = (6, 1, 7)
+        self.space.place_agent(cargo, (2, 4, 1))
+        self.schedule.add(cargo)
+
+class TestBatch(unittest.TestCase):
+    def check_same_as_model(self, a: RobotFlockers, b: RobotFlockers, steps: int) -> None:
+        batch = BatchFlockers.from_models([b])
+        for _ in range(steps):
+            a.step()
+            batch.step()
+        for k, agent in enumerate(sorted(a.schedule.agents, key=lambda x: x.unique_id)):
+            np.testing.assert_almost_equal(agent.pos, batch.pos[0, k])
+            np.testing.assert_almost_equal(agent.velocity, batch.vel[0, k])
+
+    def test_rolling(self) -> None:
+        self.check_same_as_model(CalRobotFlockers(), CalRobotFlockers(), 600)
+
+    def test_falling(self) -> None:
+        self.check_same_as_model(CalV(), CalV(), 300)
+
+    def test_lob(self) -> None:
+        self.check_same_as_model(Lob(), Lob(), 60)
+
+    def test_drag(self) -> None:
+        # in the air, the ball slows down the way the sweep's shots do
+        model = Lob()
+        steps = 0
+        while model.schedule.agents[0].velocity[2] > 0:
+            model.step()
+            steps += 1
+        vx, vy, _ = model.schedule.agents[0].velocity
+        self.assertLess(vx, 6 * 0.9)
+        self.assertAlmostEqual(6, vx / vy, 9) # against the velocity
+        self.assertGreater(steps * model.seconds_per_step, 0.6) # not quite 7/9.8
+
+    def test_bump(self) -> None:
+        # the model resolves contacts one agent at a time, in random order, so just
+        # check the collision itself
+        batch = BatchFlockers.from_models([Bump()])
+        batch.step()
+        np.testing.assert_almost_equal([[-0.5, 0, 0], [0.5, 0, 0]], batch.vel[0])
+        self.assertAlmostEqual(0.24 + 0.05, batch.pos[0, 1, 0] - batch.pos[0, 0, 0])
+
+    def test_layout(self) -> None:
+        batch = BatchFlockers(2, seed=3)
+        model = RobotFlockers(seed=4)
+        agents = sorted(model.schedule.agents, key=lambda x: x.unique_id)
+        np.testing.assert_equal([a.unique_id for a in agents], batch.ids)
+        np.testing.assert_almost_equal([a.pos for a in agents], batch.pos[1])
+        with self.assertRaises(ValueError):
+            BatchFlockers.from_models([RobotFlockers(), RobotFlockers(cargo_per_alliance=12)])
+
+    def test_conserved(self) -> None:
+        batch = BatchFlockers(4, seed=0)
+        batch.run(400)
+        cargo = batch.cargo
+        held = batch.holder[:, cargo] >= 0
+        delayed = batch.delay[:, cargo] >= 0
+        on_field = batch.on_field[:, cargo]
+        # every ball is in exactly one place
+        np.testing.assert_equal(1, held.astype(int) + delayed + on_field)
+        self.assertTrue(np.all(batch.on_field[:, batch.robots]))
+        # robots hold two at most
+        for robot in batch.robots:
+            self.assertTrue(np.all(np.sum(batch.holder == robot, axis=1) <= 2))
+        # aimed shots go in, rather than over
+        self.assertLess(0, np.min(batch.population(UPPER_HUB_DELAY)))
+        # nothing left the field
+        self.assertTrue(np.all(batch.pos[:, :, 0] >= 0))
+        self.assertTrue(np.all(batch.pos[:, :, 2] >= 0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import numpy as np
+
+from frc.behaviour import (CHASING_BOTS, CHASING_CARGO, CLIMBING, ENDGAME_S, HANGARS_M, # pylint: disable=import-error
+                           SHOOTING, StateMachine, plan)
+from frc.model import RobotFlockers # pylint: disable=import-error
+
+class TestBehaviour(unittest.TestCase):
+    def test_machine(self) -> None:
+        machine = StateMachine(['a', 'b', 'c'], [('go', 'a', 'b'), ('go', 'b', 'c'),
+                                                 ('reset', '*', 'a')])
+        state = np.array([[0, 0, 1, 2]])
+        # one move each, the first that fires
+        np.testing.assert_equal([[1, 0, 2, 2]],
+                                machine.step(state, {'go': np.array([[True, False, True, True]]),
+                                                     'reset': np.asarray(False)}))
+        np.testing.assert_equal([[1, 1, 2, 0]],
+                                machine.step(state, {'go': np.asarray(True),
+                                                     'reset': np.asarray(True)}))
+        seen = {}
+        machine.dispatch(state, {'a': lambda mask: seen.update(a=mask),
+                                 'b': lambda mask: seen.update(b=mask)})
+        np.testing.assert_equal([[True, True, False, False]], seen['a'])
+        np.testing.assert_equal([[False, False, True, False]], seen['b'])
+        with self.assertRaises(ValueError):
+            StateMachine(['a'], [('go', 'a', 'z')])
+
+    def test_plan(self) -> None:
+        # two red robots and a blue one, in two matches; one red ball, near robot 0
+        robot_xy = np.array([[[2.0, 2.0], [8.0, 1.0], [12.0, 6.0]]] * 2)
+        alliance = np.array([0, 0, 1], dtype=np.int8)
+        cargo_xy = np.array([[[4.0, 2.0]]] * 2)
+        state = np.full((2, 3), CHASING_CARGO)
+        held = np.array([[0, 2, 0], [1, 1, 0]])
+        low = np.array([[True], [False]]) # in the second match, the ball's gone by
+        navigator = RobotFlockers(seed=0).navigator
+        after, heading, driving, intaking, shooting = plan(
+            state, 0, robot_xy, alliance, held, cargo_xy, np.array([0], dtype=np.int8), low,
+            navigator)
+        np.testing.assert_equal([[CHASING_CARGO, SHOOTING, CHASING_BOTS],
+                                 [SHOOTING, SHOOTING, CHASING_BOTS]], after)
+        np.testing.assert_almost_equal([1, 0], heading[0, 0]) # to the ball
+        np.testing.assert_almost_equal([-4, -5] / np.hypot(4, 5), heading[0, 2]) # nearest red
+        np.testing.assert_equal([[True, True, True], [True, True, True]], driving)
+        np.testing.assert_equal(True, intaking)
+        np.testing.assert_equal(after == SHOOTING, shooting)
+        # defenders that pick something up shoot it, whether there's more to chase or not
+        bots = np.full((2, 3), CHASING_BOTS)
+        pushed, _, _, _, pushing = plan(
+            bots, 0, robot_xy, alliance, np.array([[1, 2, 0], [1, 2, 0]]), cargo_xy,
+            np.array([0], dtype=np.int8), low, navigator)
+        np.testing.assert_equal([[SHOOTING, SHOOTING, CHASING_BOTS]] * 2, pushed)
+        np.testing.assert_equal(pushed == SHOOTING, pushing)
+        # the endgame beats everything
+        after, heading, driving, intaking, shooting = plan(
+            after, ENDGAME_S, robot_xy, alliance, held, cargo_xy, np.array([0], dtype=np.int8),
+            low, navigator)
+        np.testing.assert_equal(CLIMBING, after)
+        # around the hub, more or less that way
+        to_hangar = HANGARS_M[1] - robot_xy[0, 2]
+        self.assertLess(0.5, np.dot(to_hangar / np.linalg.norm(to_hangar), heading[0, 2]))
+        np.testing.assert_equal(False, intaking | shooting)
+
+    def test_match(self) -> None:
+        model = RobotFlockers(seed=0)
+        for _ in range(400):
+            model.step()
+        self.assertLess(0, model.hub.upper_count)
@@ -0,0 +1,88 @@
+import json
+import unittest
+from typing import Any, Dict, List
+
+from frc.broadcast import Broadcaster # pylint: disable=import-error
+from frc.frames import FrameEncoder # pylint: disable=import-error
+from frc.model import RobotFlockers # pylint: disable=import-error
+
+class Write:
+    def __init__(self, done: bool) -> None:
+        self.finished = done
+
+    def done(self) -> bool:
+        return self.finished
+
+class Viewer:
+    """ what the browser does with the messages, and how fast it takes them """
+    def __init__(self, slow: bool = False) -> None:
+        self.slow = slow
+        self.writes: List[Write] = []
+        self.objects: Dict[str, Any] = {}
+        self.text = ""
+        self.messages: List[bytes] = []
+
+    def write_message(self, message: bytes) -> Write:
+        self.messages.append(message)
+        msg = json.loads(message)
+        if msg["type"] == "viz_state":
+            frame = msg["data"][0]
+            self.text = msg["data"][-1]
+            if frame["keyframe"]:
+                self.objects = {}
+            for i in frame["removed"]:
+                del self.objects[str(i)]
+            for i, change in frame["changes"].items():
+                self.objects.setdefault(i, {}).update(change)
+        write = Write(not self.slow)
+        self.writes.append(write)
+        return write
+
+class TestBroadcast(unittest.TestCase):
+    def test_viewers(self) -> None:
+        model = RobotFlockers(seed=0)
+        encoder = FrameEncoder(lambda a: {"Shape": "circle"})
+        broadcaster = Broadcaster(None) # type: ignore
+        fast = Viewer()
+        slow = Viewer(slow=True)
+        late = Viewer()
+        broadcaster.join(fast)
+        broadcaster.join(slow)
+        for tick in range(100):
+            if tick == 50:
+                broadcaster.join(late)
+            if tick % 10 == 0 and slow.writes:
+                slow.writes[-1].finished = True # catches up now and then
+            broadcaster.publish([encoder.frame(model), f"tick {tick}"])
+            model.step()
+        everything = {str(i): p for i, p in encoder.sent.items()}
+        self.assertEqual(everything, fast.objects)
+        self.assertEqual(everything, late.objects)
+        self.assertEqual("tick 99", late.text)
+        # only the keyframes were sent to the slow one
+        self.assertEqual(10, len(slow.messages))
+        self.assertTrue(all(json.loads(m)["data"][0]["keyframe"] for m in slow.messages))
+        slow.writes[-1].finished = True
+        broadcaster.publish([encoder.frame(model), "tick 100"])
+        self.assertEqual({str(i): p for i, p in encoder.sent.items()}, slow.objects)
+        # everyone got the same bytes
+        self.assertIs(fast.messages[-1], late.messages[-1])
+        # once a tick, not once a viewer: 100 changes, and keyframes for the start, the
+        # slow one catching up 9 times and then at the end, and the late one
+        self.assertEqual(100 + 1 + 9 + 1 + 1, broadcaster.sent)
+
+    def test_reset(self) -> None:
+        model = RobotFlockers(seed=0)
+        encoder = FrameEncoder(lambda a: {"Shape": "circle"})
+        broadcaster = Broadcaster(None) # type: ignore
+        viewer = Viewer()
+        broadcaster.join(viewer)
+        broadcaster.publish([encoder.frame(model)])
+        model.step()
+        broadcaster.publish([encoder.frame(model)])
+        viewer.objects = {} # the browser started over
+        broadcaster.join(viewer)
+        self.assertEqual({str(i): p for i, p in encoder.sent.items()}, viewer.objects)
+        broadcaster.leave(viewer)
+        broadcaster.end()
+        self.assertEqual(3, len(viewer.messages))
@@ -1,7 +1,7 @@
 import unittest
 from typing import Tuple
 import numpy as np
-from frc.delay import Delay # pylint: disable=import-error
+from frc.delay import Delay, MultiDelay # pylint: disable=import-error
 
 class TestDelay(unittest.TestCase):
     def test_delay(self) -> None:
@@ -21,5 +21,39 @@ class TestDelay(unittest.TestCase):
         self.assertEqual("foo", x.get(21)) # duplicate items is fine
         self.assertIsNone(x.get(16))
 
+    def test_multi_delay_one_worker(self) -> None:
+        x: MultiDelay[str] = MultiDelay(5, 0.2)
+        self.assertIsNone(x.get(0)) # nothing there yet
+        self.assertIsNone(x.next_release_time)
+        x.put("foo", 0)
+        self.assertEqual(5, x.next_release_time)
+        self.assertIsNone(x.get(0)) # not time yet
+        self.assertIsNone(x.get(5)) # not time yet
+        self.assertEqual("foo", x.get(6))
+        self.assertIsNone(x.get(7)) # empty again
+        x.put("foo", 10)
+        with self.assertRaises(ValueError):
+            x.put("foo", 0) # no writing into the past
+        x.put("bar", 10)
+        self.assertEqual(["foo"], x.get_all(16)) # one worker, one at a time
+        self.assertEqual(20, x.next_release_time)
+        self.assertEqual([], x.get_all(20))
+        self.assertEqual(["bar"], x.get_all(21))
+        with self.assertRaises(ValueError):
+            x.get(16) # no reading from the past
+
+    def test_multi_delay_workers(self) -> None:
+        x: MultiDelay[int] = MultiDelay(5, 2/5, 2) # two workers, five seconds each
+        for i in range(5):
+            x.put(i, 0)
+        self.assertEqual(5, x.length)
+        self.assertEqual([0, 1], x.get_all(6)) # both workers at once
+        self.assertEqual([], x.get_all(9))
+        self.assertEqual([2, 3], x.get_all(11))
+        self.assertEqual([4], x.get_all(100))
+        self.assertEqual(0, x.length)
+        x.put(5, 100) # idle workers start right away
+        self.assertEqual(105, x.next_release_time)
+
 if __name__ == '__main__':
     unittest.main()
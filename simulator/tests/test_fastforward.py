@@ -0,0 +1,111 @@
+import unittest
+import numpy as np
+
+from frc.agent import Cargo, Robot # pylint: disable=import-error
+from frc.alliance import Alliance # pylint: disable=import-error
+from frc.fastforward import clear_steps, wall_gaps # pylint: disable=import-error
+from frc.model import CalRobotFlockers, CalV, RobotFlockers # pylint: disable=import-error
+
+class Drive(RobotFlockers):
+    # override
+    def make_agents(self) -> None:
+        # a robot and a ball of its color each, far apart in the open
+        self.make_field()
+        self.place_robot(0, (5, 2, 0), Alliance.RED)
+        self.place_robot(10, (11.5, 6, 0), Alliance.BLUE)
+        self.place_cargo(100, (5, 6.5, 0), Alliance.RED)
+        self.place_cargo(200, (11.5, 1.5, 0), Alliance.BLUE)
+
+class TestFastForward(unittest.TestCase):
+    def check_same_as_step(self, a: RobotFlockers, b: RobotFlockers, steps: int) -> None:
+        for _ in range(steps):
+            a.step()
+        calls = 0
+        while b.model_steps < steps:
+            b.advance(steps - b.model_steps)
+            calls += 1
+        self.assertEqual(steps, b.model_steps)
+        self.assertLess(calls, steps / 10)
+        ca = a.schedule.agents[0]
+        cb = b.schedule.agents[0]
+        np.testing.assert_almost_equal(ca.pos, cb.pos)
+        np.testing.assert_almost_equal(ca.velocity, cb.velocity)
+        # samples at the same times
+        np.testing.assert_almost_equal(a.datacollector.model_vars['time'],
+                                       b.datacollector.model_vars['time'])
+        np.testing.assert_almost_equal(a.datacollector.model_vars['mean_speed'],
+                                       b.datacollector.model_vars['mean_speed'])
+
+    def test_rolling(self) -> None:
+        # rolls all the way to the far wall, and bounces
+        self.check_same_as_step(CalRobotFlockers(collect_period=20),
+                                CalRobotFlockers(collect_period=20), 600)
+
+    def test_falling(self) -> None:
+        self.check_same_as_step(CalV(collect_period=20), CalV(collect_period=20), 300)
+
+    def test_release(self) -> None:
+        m = CalRobotFlockers(collect_period=1000)
+        cargo = m.schedule.agents[0]
+        m.space.remove_agent(cargo)
+        m.schedule.remove(cargo)
+        m.blue_terminal.put(cargo, 0) # comes back in the first step after 5s
+        self.assertEqual(101, m.steps_until_release())
+        self.assertEqual(101, m.fast_forward(500))
+        self.assertIsNone(cargo.pos)
+        self.assertEqual(0, m.steps_until_release())
+        self.assertEqual(0, m.fast_forward(500))
+        m.step()
+        self.assertIsNotNone(cargo.pos)
+
+    def test_contact(self) -> None:
+        m = CalRobotFlockers(collect_period=1000)
+        other = Cargo(1, m, (0, 0, 0), Alliance.RED)
+        m.space.place_agent(other, (3, m.schedule.agents[0].pos[1], 0))
+        m.schedule.add(other)
+        skipped = m.fast_forward(500)
+        self.assertLess(0, skipped)
+        self.assertLess(skipped, 30) # 2m at 2m/s, minus the gap
+        mover = m.schedule.agents[0]
+        self.assertLess(other.pos[0] - mover.pos[0], 0.4)
+
+    def test_model(self) -> None:
+        m = RobotFlockers(collect_period=10)
+        while m.model_steps < 200:
+            m.advance(200 - m.model_steps)
+        self.assertEqual(200, m.model_steps)
+        self.assertEqual(21, len(m.datacollector.model_vars['time']))
+
+    def test_driving(self) -> None:
+        m = Drive(seed=0)
+        calls = 0
+        while m.model_steps < 40:
+            m.advance(40 - m.model_steps)
+            calls += 1
+        self.assertLess(calls, 10)
+        # most of the way to their balls, like step() gets, and still going
+        red, blue = [a for a in m.schedule.agents if isinstance(a, Robot)]
+        self.assertLess(4.5, red.pos[1])
+        self.assertLess(blue.pos[1], 4)
+        self.assertIsNotNone(red.heading)
+        self.assertIsNotNone(blue.heading)
+        self.assertEqual(41, len(m.datacollector.model_vars['time']))
+
+    def test_every_step(self) -> None:
+        # sampling every step doesn't stop it skipping
+        self.check_same_as_step(CalRobotFlockers(), CalRobotFlockers(), 200)
+
+    def test_clear_steps(self) -> None:
+        # 1m apart, closing at 2m/s, is 0.5s less a step and the clearance
+        np.testing.assert_equal([9, 0, 0, np.inf], clear_steps(
+            np.array([1.0, 0.1, 0.0, 1.0]), np.array([2.0, 2.0, 0.0, 0.0]), 0.05))
+
+    def test_wall_gaps(self) -> None:
+        radii = np.array([0.12] * 4)
+        pos = np.array([[1.0, 4, 1.0], [1.0, 4, 0.0], [4, 1.0, 0.0], [15, 4, 5.0]])
+        vel = np.array([[0, 0, 0], [0, 0, 0], [0, 0, 4.0], [0, 0, 0]])
+        np.testing.assert_almost_equal([3.88, np.inf, 0.88, 0.88],
+                                       wall_gaps(pos, vel, radii, 16, 8))
+
+if __name__ == '__main__':
+    unittest.main()
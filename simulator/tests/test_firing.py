@@ -0,0 +1,72 @@
+import unittest
+import numpy as np
+
+from frc.agent import CENTER, Cargo, Robot # pylint: disable=import-error
+from frc.alliance import Alliance # pylint: disable=import-error
+from frc.firing import FIRING_HEIGHT_M, FiringSolutions, solutions # pylint: disable=import-error
+from frc.model import RobotFlockers # pylint: disable=import-error
+
+class Shot(RobotFlockers):
+    # override
+    def make_agents(self) -> None:
+        # one loaded robot four meters from the hub, nothing else
+        robot = Robot(0, self, (CENTER[0] - 4, CENTER[1], 0), Alliance.RED)
+        robot.slot1 = Cargo(1, self, (0, 0, 0), Alliance.RED)
+        self.space.place_agent(robot, robot.pos)
+        self.schedule.add(robot)
+
+class TestFiring(unittest.TestCase):
+    def test_table(self) -> None:
+        table = FiringSolutions(np.array([1.0, 2.0]), np.array([8.0, 10.0]),
+                                np.array([80.0, 60.0]), np.array([0.9, 0.5]), 0.1)
+        ranges = np.array([0.0, 1.5, 1.52, 3.0])
+        v, el = table.solve(ranges)
+        np.testing.assert_almost_equal([8, 9, 9, 10], v)
+        np.testing.assert_almost_equal([80, 70, 70, 60], el)
+        np.testing.assert_almost_equal([0.9, 0.7, 0.7, 0.5], table.chance(ranges))
+        with self.assertRaises(ValueError):
+            FiringSolutions(np.array([2.0, 1.0]), np.zeros(2), np.zeros(2), np.zeros(2))
+
+    def test_sweep(self) -> None:
+        ranges = np.array([2.0, 5.0, 8.0])
+        v, el = solutions().solve(ranges)
+        p = solutions().chance(ranges)
+        # further is faster and flatter, and misses more
+        self.assertTrue(np.all(np.diff(v) > 0))
+        self.assertTrue(np.all(np.diff(el) < 0))
+        self.assertTrue(np.all(np.diff(p) < 0))
+        self.assertTrue(np.all((p > 0) & (p <= 1)))
+        with self.assertRaises(ValueError):
+            FiringSolutions.from_sweep(gun_precision=0.5)
+
+    def test_shot(self) -> None:
+        model = Shot()
+        model.step()
+        ball = [a for a in model.schedule.agents if isinstance(a, Cargo)][0]
+        v, el = solutions().solve(np.array([4 - Robot.RADIUS_M - 0.14]))
+        self.assertAlmostEqual(FIRING_HEIGHT_M, ball.pos[2], 1)
+        self.assertAlmostEqual(v[0], np.linalg.norm(ball.velocity), 0)
+        self.assertAlmostEqual(0, ball.velocity[1])
+        self.assertGreater(ball.velocity[0], 0) # towards the hub
+        self.assertAlmostEqual(np.tan(np.radians(el[0])), ball.velocity[2] / ball.velocity[0], 1)
+        for _ in range(100):
+            model.step()
+        self.assertEqual(1, model.hub.upper_count)
+
+    def test_aim(self) -> None:
+        model = Shot()
+        robot = model.schedule.agents[0]
+        model.aim()
+        self.assertIsNotNone(robot.aim)
+        model.step()
+        self.assertIsNone(robot.aim) # used up
+        # nothing left to shoot, or not shooting, so nothing to aim
+        model.aim()
+        self.assertIsNone(robot.aim)
+        robot.slot1 = Cargo(2, model, (0, 0, 0), Alliance.RED)
+        robot.shooting = False
+        model.aim()
+        self.assertIsNone(robot.aim)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import json
+import unittest
+from typing import Any, Dict
+
+from frc.agent import Obstacle # pylint: disable=import-error
+from frc.frames import FrameEncoder, FrameSync, Portrayal # pylint: disable=import-error
+from frc.model import RobotFlockers # pylint: disable=import-error
+
+def draw(agent: Any) -> Portrayal:
+    if isinstance(agent, Obstacle):
+        return {"Shape": "obstacle", "static": True, "r": agent.radius_m}
+    return {"Shape": "thing", "angle": agent.velocity[0]}
+
+class Browser:
+    """ what frames.js does """
+    def __init__(self) -> None:
+        self.objects: Dict[str, Portrayal] = {}
+
+    def apply(self, frame: Dict[str, Any]) -> None:
+        frame = json.loads(json.dumps(frame)) # keys become strings, like in js
+        if frame["keyframe"]:
+            self.objects = {}
+        for i in frame["removed"]:
+            del self.objects[str(i)]
+        for i, change in frame["changes"].items():
+            self.objects.setdefault(i, {}).update(change)
+
+class TestFrames(unittest.TestCase):
+    def test_frames(self) -> None:
+        model = RobotFlockers(seed=0)
+        encoder = FrameEncoder(draw, ("x", "y", "z"))
+        browser = Browser()
+        full = FrameEncoder(draw, ("x", "y", "z"))
+        sizes = []
+        for tick in range(200):
+            frame = encoder.frame(model)
+            self.assertEqual(tick == 0, frame["keyframe"])
+            browser.apply(frame)
+            sizes.append(len(json.dumps(frame)))
+            # the same as starting over every time
+            full.model = None
+            expected = full.frame(model)["changes"]
+            self.assertEqual({str(i): p for i, p in expected.items()}, browser.objects)
+            model.step()
+        # obstacles only go once
+        obstacles = [a.unique_id for a in model.schedule.agents if isinstance(a, Obstacle)]
+        self.assertTrue(all(i not in frame["changes"] for i in obstacles))
+        self.assertLess(max(sizes[1:]), sizes[0] / 2)
+
+    def test_quantised(self) -> None:
+        model = RobotFlockers(seed=0)
+        encoder = FrameEncoder(draw)
+        portrayal = encoder.frame(model)["changes"][0]
+        self.assertIsInstance(portrayal["x"], int)
+        self.assertEqual(round(100 * model.schedule._agents[0].pos[0]), portrayal["x"]) # pylint: disable=protected-access
+
+    def test_new_model(self) -> None:
+        encoder = FrameEncoder(draw)
+        encoder.frame(RobotFlockers(seed=0))
+        self.assertTrue(encoder.frame(RobotFlockers(seed=0))["keyframe"])
+
+    def test_two_browsers(self) -> None:
+        model = RobotFlockers(seed=0)
+        encoder = FrameEncoder(draw, ("x", "y", "z"))
+        browsers = [Browser(), Browser()]
+        syncs = [FrameSync(), FrameSync()]
+        keyframes = [0, 0]
+        for tick in range(100):
+            # they take turns, and the second one opens a bit later
+            k = tick % 2 if tick > 10 else 0
+            data = syncs[k].fit([encoder.frame(model), "text"])
+            self.assertEqual("text", data[1])
+            browsers[k].apply(data[0])
+            keyframes[k] += data[0]["keyframe"]
+            full = FrameEncoder(draw, ("x", "y", "z"))
+            expected = full.frame(model)["changes"]
+            self.assertEqual({str(i): p for i, p in expected.items()}, browsers[k].objects)
+            model.step()
+        self.assertGreater(keyframes[1], 1)
+        # one browser alone gets changes
+        for tick in range(10):
+            data = syncs[0].fit([encoder.frame(model)])
+            self.assertEqual(tick == 0, data[0]["keyframe"])
+            model.step()
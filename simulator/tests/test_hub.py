@@ -0,0 +1,104 @@
+import unittest
+import numpy as np
+
+from frc.agent import Cargo # pylint: disable=import-error
+from frc.alliance import Alliance # pylint: disable=import-error
+from frc.delay import MultiDelay # pylint: disable=import-error
+from frc.hub import Hub, FUNNEL_BASE_M, UPPER_HUB_HEIGHT_M # pylint: disable=import-error
+from frc.model import RobotFlockers # pylint: disable=import-error
+
+class FakeModel():
+    def __init__(self) -> None:
+        self.seconds_per_step = 0.05
+
+class TestHub(unittest.TestCase):
+    def setUp(self) -> None:
+        self.upper: MultiDelay[Cargo] = MultiDelay(7, 4/7, 4)
+        self.lower: MultiDelay[Cargo] = MultiDelay(5, 4/5, 4)
+        self.hub = Hub((0, 0, 0), self.upper, self.lower)
+        self.model = FakeModel()
+
+    def test_above(self) -> None:
+        c = Cargo(0, self.model, (0.2, 0, 4), Alliance.RED)
+        c.velocity = (0, 0, -1)
+        self.assertIsNone(self.hub.check(c, 0.05))
+        np.testing.assert_almost_equal((0, 0, -1), c.velocity)
+
+    def test_bottom(self) -> None:
+        c = Cargo(0, self.model, (0.05, 0, FUNNEL_BASE_M - 0.12), Alliance.RED)
+        c.velocity = (0, 0, -1)
+        self.assertIs(self.upper, self.hub.check(c, 0.05))
+
+    def test_funnel_wall(self) -> None:
+        # inside the funnel, touching the wall, heading out
+        c = Cargo(0, self.model, (0.5, 0, UPPER_HUB_HEIGHT_M - 0.3), Alliance.RED)
+        c.velocity = (2, 0, 0)
+        self.assertIsNone(self.hub.check(c, 0.05))
+        self.assertLess(c.velocity[0], 0) # bounced back in
+        self.assertGreater(c.velocity[2], 0) # and up, the wall slopes
+        self.assertLess(c.pos[0], 0.5) # pushed away from the wall
+
+    def test_outside(self) -> None:
+        c = Cargo(0, self.model, (0.7, 0, 2), Alliance.RED)
+        c.velocity = (-2, 0, 0)
+        self.assertIsNone(self.hub.check(c, 0.05))
+        np.testing.assert_almost_equal((1, 0, 0), c.velocity)
+        self.assertAlmostEqual(0.79, c.pos[0])
+
+    def test_rim(self) -> None:
+        c = Cargo(0, self.model, (0.64, 0, UPPER_HUB_HEIGHT_M - 0.05), Alliance.RED)
+        c.velocity = (0, 0, -2)
+        self.assertIsNone(self.hub.check(c, 0.05))
+        np.testing.assert_almost_equal((0, 0, 1), c.velocity)
+        self.assertAlmostEqual(UPPER_HUB_HEIGHT_M, c.pos[2])
+
+    def test_lower(self) -> None:
+        c = Cargo(0, self.model, (0.75, 0, 1.0), Alliance.RED)
+        c.velocity = (0, 0, -1)
+        self.assertIs(self.lower, self.hub.check(c, 0.05))
+        c.velocity = (0, 0, 1) # going up doesn't count
+        self.assertIsNone(self.hub.check(c, 0.05))
+
+    def test_model(self) -> None:
+        m = RobotFlockers()
+        c = Cargo(999, m, (0, 0, 0), Alliance.BLUE)
+        c.velocity = (0, 0, -3)
+        m.space.place_agent(c, (m.hub.center[0] + 0.2, m.hub.center[1], 3))
+        m.schedule.add(c)
+        for _ in range(40):
+            m.step()
+        self.assertLessEqual(1, m.hub.upper_count) # robots might score too
+        self.assertIn(c, [item for item, _ in m.upper_hub.deque])
+        self.assertIsNone(c.pos) # it's in the delay
+
+    def test_model_lower(self) -> None:
+        m = RobotFlockers()
+        balls = []
+        for i, angle in enumerate(np.linspace(0, 2 * np.pi, 12, endpoint=False)):
+            # falling into the ring between the upper hub and the rim
+            c = Cargo(990 + i, m, (0, 0, 0), Alliance.BLUE)
+            c.velocity = (0, 0, -1)
+            m.space.place_agent(c, (m.hub.center[0] + 0.77 * np.cos(angle),
+                                    m.hub.center[1] + 0.77 * np.sin(angle), 1.1))
+            m.schedule.add(c)
+            balls.append(c)
+        for _ in range(5):
+            m.step()
+        caught = [item for item, _ in m.lower_hub.deque]
+        self.assertTrue(all(c in caught for c in balls))
+
+    def test_exits(self) -> None:
+        m = RobotFlockers()
+        balls = [Cargo(990 + i, m, (0, 0, 0), Alliance.BLUE) for i in range(4)]
+        for i, c in enumerate(balls):
+            m.upper_hub.put(c, i) # one a second
+        for _ in range(300):
+            m.schedule.steps += 1
+            m.hub.release(m)
+        # one at a time, still round robin
+        self.assertTrue(all(c.pos is not None for c in balls))
+        exits = {(round(c.velocity[0], 3), round(c.velocity[1], 3)) for c in balls}
+        self.assertEqual(4, len(exits))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+
+from frc.agent import Obstacle, Robot # pylint: disable=import-error
+from frc.instrument import Profiler # pylint: disable=import-error
+from frc.model import RobotFlockers # pylint: disable=import-error
+from frc.space import LimitlessContinuous3dSpace # pylint: disable=import-error
+
+class TestInstrument(unittest.TestCase):
+    def test_off(self) -> None:
+        step = RobotFlockers.__dict__['step']
+        get_neighbors = LimitlessContinuous3dSpace.__dict__['get_neighbors']
+        profiler = Profiler()
+        with profiler:
+            self.assertTrue(profiler.enabled)
+            self.assertIsNot(step, RobotFlockers.__dict__['step'])
+        self.assertFalse(profiler.enabled)
+        # the originals are back
+        self.assertIs(step, RobotFlockers.__dict__['step'])
+        self.assertIs(get_neighbors, LimitlessContinuous3dSpace.__dict__['get_neighbors'])
+        m = RobotFlockers()
+        m.step()
+        self.assertEqual({}, profiler.calls)
+
+    def test_counts(self) -> None:
+        m = RobotFlockers()
+        profiler = Profiler()
+        with profiler:
+            for _ in range(10):
+                m.step()
+        self.assertEqual(10, profiler.calls['step'])
+        self.assertEqual(10, profiler.calls['agents'])
+        self.assertEqual(10, profiler.calls['collect'])
+        self.assertEqual(60, profiler.calls['Robot.step'])
+        for label in ('behave', 'aim', 'fly_cargo'):
+            self.assertEqual(10, profiler.calls[label])
+        # one row of neighbor counts per step
+        self.assertEqual(10, len(profiler.neighbors))
+        self.assertEqual(list(range(1, 11)), [row[0] for row in profiler.neighbors])
+        self.assertEqual(profiler.calls['get_neighbors'] + profiler.calls['get_agent_neighbors'],
+                         sum(row[1] for row in profiler.neighbors))
+        # self time adds up to the total
+        self.assertAlmostEqual(profiler.total_s['step'], sum(profiler.self_s.values()))
+        self.assertLess(profiler.self_s['agents'], profiler.total_s['agents'])
+
+    def test_contacts(self) -> None:
+        m = RobotFlockers()
+        robot = [a for a in m.schedule.agents if isinstance(a, Robot)][0]
+        post = [a for a in m.schedule.agents if isinstance(a, Obstacle)][0]
+        robot.pos = (post.pos[0] + post.radius_m + robot.radius_m - 0.05, post.pos[1],
+                     robot.pos[2])
+        profiler = Profiler()
+        with profiler:
+            self.assertTrue(robot.check_ball_collision(post))
+        # robots and obstacles are cylinders
+        self.assertEqual(1, profiler.calls['collide_cylindrical'])
+        self.assertEqual(1, profiler.calls['collide_pos_cylindrical'])
+        self.assertNotIn('collide', profiler.calls)
+
+    def test_queries(self) -> None:
+        m = RobotFlockers()
+        robot = [a for a in m.schedule.agents if isinstance(a, Robot)][0]
+        profiler = Profiler()
+        with profiler:
+            robot.target()
+            robot.has_clear_shot()
+        self.assertEqual(1, profiler.calls['get_nearest'])
+        self.assertEqual(1, profiler.calls['get_intersecting'])
+
+    def test_export(self) -> None:
+        m = RobotFlockers()
+        profiler = Profiler()
+        with profiler:
+            m.step()
+        lines = profiler.csv().splitlines()
+        self.assertEqual("phase,calls,total_s,self_s", lines[0])
+        self.assertIn("step,1,", "\n".join(lines))
+        for line in profiler.folded().splitlines():
+            stack, micros = line.rsplit(" ", 1)
+            self.assertTrue(stack.startswith("step"))
+            self.assertLess(0, int(micros))
+        self.assertIn("step;agents;Robot.step", profiler.folded())
+        self.assertEqual("step,queries,found,most", profiler.neighbors_csv().splitlines()[0])
+
+if __name__ == '__main__':
+    unittest.main()
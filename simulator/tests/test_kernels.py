@@ -0,0 +1,38 @@
+import math
+import unittest
+import numpy as np
+
+from frc import collision, kernels # pylint: disable=import-error
+
+class TestKernels(unittest.TestCase):
+    def test_same(self) -> None:
+        """ the same as the numpy versions, for lots of random cases """
+        rng = np.random.default_rng(0)
+        for _ in range(500):
+            p1, v1, p2, v2 = (tuple(rng.normal(size=3)) for _ in range(4))
+            m1, m2 = rng.choice([0.27, 56, math.inf], size=2)
+            if math.isinf(m1) and math.isinf(m2):
+                continue
+            e1, e2 = rng.uniform(size=2)
+            r1, r2 = rng.uniform(0.1, 1, size=2)
+            for name in ("collide", "collide_cylindrical"):
+                expected = getattr(collision, name)(p1, v1, m1, e1, p2, v2, m2, e2)
+                actual = getattr(kernels, name)(p1, v1, m1, e1, p2, v2, m2, e2)
+                np.testing.assert_allclose(expected, actual, rtol=1e-12, atol=1e-12)
+            for name in ("collide_pos", "collide_pos_cylindrical"):
+                expected = getattr(collision, name)(p1, m1, r1, p2, m2, r2)
+                actual = getattr(kernels, name)(p1, m1, r1, p2, m2, r2)
+                np.testing.assert_allclose(expected, actual, rtol=1e-12, atol=1e-12)
+            self.assertEqual(collision.overlap(p1, p2, r1, r2), kernels.overlap(p1, p2, r1, r2))
+
+    def test_same_place(self) -> None:
+        with np.errstate(invalid='ignore'):
+            expected = collision.collide((1, 1, 0), (1, 0, 0), 1, 1, (1, 1, 0), (0, 0, 0), 1, 1)
+        actual = kernels.collide((1, 1, 0), (1, 0, 0), 1, 1, (1, 1, 0), (0, 0, 0), 1, 1)
+        self.assertTrue(np.all(np.isnan(expected)))
+        self.assertTrue(np.all(np.isnan(actual)))
+
+    def test_ints(self) -> None:
+        newv1, newv2 = kernels.collide((0, 0, 0), (1, 0, 0), 1, 1, (1, 0, 0), (-1, 0, 0), 1, 1)
+        self.assertEqual((-1, 0, 0), newv1)
+        self.assertEqual((1, 0, 0), newv2)
@@ -0,0 +1,80 @@
+import threading
+import time
+import unittest
+from typing import Any, Dict
+
+from frc.frames import FrameEncoder # pylint: disable=import-error
+from frc.live import END, ModelWorker # pylint: disable=import-error
+from frc.model import RobotFlockers # pylint: disable=import-error
+
+class Short(RobotFlockers):
+    """ stops after a while """
+    def step(self) -> None:
+        super().step()
+        if self.model_steps >= 100:
+            self.running = False
+
+def draw(agent: Any) -> Dict[str, Any]:
+    return {"Shape": "thing"}
+
+class TestLive(unittest.TestCase):
+    def test_slow_browser(self) -> None:
+        model = Short(seed=0)
+        encoder = FrameEncoder(draw)
+        worker = ModelWorker(model, lambda: encoder.frame(model))
+        worker.start()
+        seen: Dict[int, Dict[str, Any]] = {}
+        while True:
+            frame = worker.next_frame(timeout=10)
+            if frame is END:
+                break
+            if frame["keyframe"]:
+                seen = {}
+            for i in frame["removed"]:
+                del seen[i]
+            for i, change in frame["changes"].items():
+                seen.setdefault(i, {}).update(change)
+            time.sleep(0.01) # slower than the model
+        worker.stop()
+        self.assertEqual(100, worker.ticks)
+        self.assertGreater(worker.skipped, 0)
+        self.assertEqual(worker.made, worker.delivered)
+        self.assertLess(worker.delivered, worker.ticks)
+        # nothing was lost, the browser has the last tick
+        self.assertEqual(FrameEncoder(draw).frame(model)["changes"], seen)
+
+    def test_pace(self) -> None:
+        model = RobotFlockers(seed=0)
+        worker = ModelWorker(model, lambda: {}, ticks_per_second=50, queue_size=1000)
+        worker.start()
+        time.sleep(0.5)
+        worker.stop()
+        self.assertGreater(worker.ticks, 10)
+        self.assertLess(worker.ticks, 30)
+        self.assertIn("ticks/s", worker.report())
+
+    def test_stop(self) -> None:
+        # stops even when nobody takes the frames
+        worker = ModelWorker(RobotFlockers(seed=0), lambda: {}, queue_size=1)
+        worker.start()
+        time.sleep(0.1)
+        worker.stop()
+        self.assertEqual(0, worker.delivered)
+
+    def test_stop_wakes(self) -> None:
+        # anyone waiting for a frame gets END, however full the queue was
+        worker = ModelWorker(RobotFlockers(seed=0), lambda: {}, ticks_per_second=0.1,
+                             queue_size=1)
+        worker.start()
+        for _ in range(2): # the first tick goes right away, the next one not for a while
+            self.assertEqual({}, worker.next_frame(timeout=10))
+        got = []
+        waiting = [threading.Thread(target=lambda: got.append(worker.next_frame(timeout=10)))
+                   for _ in range(2)]
+        for thread in waiting:
+            thread.start()
+        time.sleep(0.1)
+        worker.stop()
+        for thread in waiting:
+            thread.join()
+        self.assertEqual([END, END], got)
@@ -0,0 +1,65 @@
+import unittest
+import numpy as np
+
+from frc.agent import Cargo, Robot # pylint: disable=import-error
+from frc.alliance import Alliance # pylint: disable=import-error
+from frc.model import RobotFlockers # pylint: disable=import-error
+
+class Chase(RobotFlockers):
+    # override
+    def make_agents(self) -> None:
+        # one robot, a ball of its color in front and one of the other color, closer, aside
+        self.place_robot(0, (2, 2, 0), Alliance.RED)
+        self.place_cargo(100, (6, 2, 0), Alliance.RED)
+        self.place_cargo(200, (2, 4, 0), Alliance.BLUE)
+        for a in self.schedule.agents:
+            a.velocity = (0, 0, 0)
+
+class TestModel(unittest.TestCase):
+    def play(self, seed: int) -> RobotFlockers:
+        m = RobotFlockers(seed=seed)
+        for _ in range(20):
+            m.step()
+        return m
+
+    def test_seed(self) -> None:
+        # one after the other, since the generators are shared
+        a = self.play(3)
+        b = self.play(3)
+        for x, y in zip(a.schedule.agents, b.schedule.agents):
+            self.assertEqual(x.unique_id, y.unique_id)
+            np.testing.assert_almost_equal(x.pos, y.pos)
+
+    def test_cargo_per_alliance(self) -> None:
+        m = RobotFlockers(cargo_per_alliance=50)
+        ids = [a.unique_id for a in m.schedule.agents if isinstance(a, Cargo)]
+        self.assertEqual(100, len(ids))
+        self.assertEqual(list(range(100, 111)), ids[:11]) # the usual ones first
+        self.assertEqual(10011, ids[11])
+        self.assertEqual(len(m.schedule.agents), len(set(a.unique_id for a in m.schedule.agents)))
+
+    def test_chase(self) -> None:
+        m = Chase(seed=0)
+        robot = m.schedule.agents[0]
+        self.assertEqual(100, robot.target().unique_id)
+        ball = m.schedule.agents[1]
+        for _ in range(200):
+            m.step()
+            if ball.pos is not None and ball.pos[2] > 0:
+                break
+        # picked up, held for a step or two, and shot; the other one is the wrong color
+        self.assertLess(0, ball.pos[2])
+        self.assertIsNone(robot.target())
+
+    def test_blocked_shot(self) -> None:
+        m = RobotFlockers(seed=0)
+        robot = [a for a in m.schedule.agents if isinstance(a, Robot)][1]
+        self.assertTrue(robot.has_clear_shot())
+        # park another robot in the way, where the shot is still low enough to hit it
+        other = [a for a in m.schedule.agents if isinstance(a, Robot)][2]
+        between = np.add(robot.pos, np.divide(m.space.get_heading(robot.pos, (8.23, 4.115, 0)), 4))
+        m.space.move_agent(other, (between[0], between[1], other.pos[2]))
+        self.assertFalse(robot.has_clear_shot())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import numpy as np
+
+from frc.agent import Robot # pylint: disable=import-error
+from frc.behaviour import CLIMBING, ENDGAME_S, HANGARS_M # pylint: disable=import-error
+from frc.model import RobotFlockers # pylint: disable=import-error
+from frc.navigation import CELL_M, Field, Navigator # pylint: disable=import-error
+
+class TestNavigation(unittest.TestCase):
+    def follow(self, navigator: Navigator, xy: np.ndarray, goal: str) -> float:
+        """ the length of the way along the flow field, a cell at a time """
+        length = 0.0
+        for _ in range(1000):
+            heading, there = navigator.steer(goal, xy)
+            if there:
+                return length
+            self.assertFalse(navigator.blocked[navigator.cells(xy)])
+            step = CELL_M * heading / np.max(np.abs(heading))
+            xy = xy + step
+            length += float(np.linalg.norm(step))
+        raise AssertionError("never got there")
+
+    def test_detour(self) -> None:
+        # a wall of posts between the start and the goal, with a gap at the top
+        posts = [(5.0, y, 0.2) for y in np.arange(0, 7, 0.3)]
+        navigator = Navigator((10, 10), posts, 0.5, {'there': ((8.0, 2.0), 0.5)})
+        self.assertTrue(navigator.blocked[0, 0]) # walls
+        self.assertTrue(navigator.blocked[navigator.cells(np.array([5.4, 3.0]))])
+        # up and over, not through
+        self.assertGreater(self.follow(navigator, np.array([2.0, 2.0]), 'there'), 2 * 6)
+        # blocked cells point straight at it
+        heading, there = navigator.steer('there', np.array([5.0, 2.0]))
+        np.testing.assert_almost_equal([1, 0], heading, 1) # from the middle of the cell
+        self.assertFalse(there)
+
+    def test_block(self) -> None:
+        navigator = Navigator((10, 10), [], 0.5, {'there': ((8.0, 5.0), 0.5)}).copy()
+        straight = self.follow(navigator, np.array([2.0, 5.0]), 'there')
+        navigator.block(np.array([[5.0, 5.0]]))
+        around = self.follow(navigator, np.array([2.0, 5.0]), 'there')
+        self.assertGreater(around, straight)
+        # the same as working it out from scratch
+        fresh = Field((8.0, 5.0), navigator.plain['there'].goal, navigator.centers,
+                      navigator.blocked)
+        np.testing.assert_equal(fresh.distance, navigator.fields['there'].distance)
+        # the blocker itself goes the plain way
+        heading, _ = navigator.steer('there', np.array([5.0, 5.0]))
+        np.testing.assert_almost_equal([1, 0], heading)
+        # and when it's gone, so is the detour
+        navigator.block(np.zeros((0, 2)))
+        self.assertAlmostEqual(straight, self.follow(navigator, np.array([2.0, 5.0]), 'there'))
+
+    def test_climb(self) -> None:
+        model = RobotFlockers(seed=0, traffic=True)
+        model.schedule.steps = int(ENDGAME_S / model.seconds_per_step) # skip ahead
+        for _ in range(300):
+            model.step()
+        robots = [a for a in model.schedule.agents if isinstance(a, Robot)]
+        self.assertTrue(all(a.state == CLIMBING for a in robots))
+        for robot in robots:
+            hangar = HANGARS_M[0 if robot.alliance.name == 'RED' else 1]
+            self.assertLess(np.hypot(*(np.array(robot.pos[:2]) - hangar)), 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+import numpy as np
+
+from frc.batch import BatchFlockers # pylint: disable=import-error
+from frc.model import RobotFlockers # pylint: disable=import-error
+from frc.parallel import ParallelFlockers # pylint: disable=import-error
+
+class TestParallel(unittest.TestCase):
+    def test_same_as_batch(self) -> None:
+        batch = BatchFlockers.from_models([RobotFlockers(seed=1)], seed=1)
+        with ParallelFlockers(3, seed=1, processes=False) as field:
+            for _ in range(50):
+                batch.step()
+                field.step()
+            # only the order of the sums differs
+            np.testing.assert_almost_equal(batch.pos, field.pos)
+            np.testing.assert_almost_equal(batch.vel, field.vel)
+            np.testing.assert_equal(batch.on_field, field.on_field)
+
+    def test_processes(self) -> None:
+        # the same, bit for bit, with or without workers
+        with ParallelFlockers(3, seed=2, processes=False) as a, ParallelFlockers(3, seed=2) as b:
+            a.run(50)
+            b.run(50)
+            np.testing.assert_equal(a.pos, b.pos)
+            np.testing.assert_equal(a.vel, b.vel)
+            np.testing.assert_equal(a.delay, b.delay)
+
+    def test_close(self) -> None:
+        field = ParallelFlockers(2, seed=0)
+        field.run(5)
+        pos = np.array(field.pos)
+        field.close()
+        np.testing.assert_equal(pos, field.pos) # still there
+        with self.assertRaises(ValueError):
+            ParallelFlockers(0)
+
+if __name__ == '__main__':
+    unittest.main()
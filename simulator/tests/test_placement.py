@@ -0,0 +1,43 @@
+import random
+import unittest
+import numpy as np
+
+from frc.agent import Cargo, MAX_RADIUS_M, Robot # pylint: disable=import-error
+from frc.model import RobotFlockers # pylint: disable=import-error
+from frc.placement import DiskPlacer # pylint: disable=import-error
+
+class TestPlacement(unittest.TestCase):
+    def test_radii(self) -> None:
+        placer = DiskPlacer(random.Random(0))
+        placer.add(5, 5, 2) # in the way
+        region = (0, 0, 10, 10)
+        big = [placer.place(region, 0.5) for _ in range(20)]
+        small = [placer.place((0, 0, 5, 5), 0.1) for _ in range(200)]
+        x = np.array([(5, 5)] + big + small)
+        r = np.array([2] + [0.5] * len(big) + [0.1] * len(small))
+        d = np.hypot(*(x[:, None] - x[None, :]).transpose(2, 0, 1))
+        np.fill_diagonal(d, np.inf)
+        self.assertTrue(np.all(d >= r[:, None] + r[None, :]))
+        self.assertTrue(np.all((x[21:] >= 0) & (x[21:] <= 5)))
+
+    def test_full(self) -> None:
+        placer = DiskPlacer(random.Random(0))
+        # room for 25 or so, not 100
+        with self.assertRaises(ValueError):
+            for _ in range(100):
+                placer.place((0, 0, 1, 1), 0.1)
+        self.assertGreater(len(placer), 15)
+        with self.assertRaises(ValueError):
+            placer.place((1, 1, 0, 0), 0.1)
+
+    def test_model(self) -> None:
+        m = RobotFlockers(seed=0, cargo_per_alliance=400)
+        things = [a for a in m.schedule.agents if isinstance(a, (Cargo, Robot))]
+        for a in things:
+            for b in m.space.get_neighbors(a.pos, a.radius_m + MAX_RADIUS_M, False):
+                if b is not a:
+                    self.assertGreaterEqual(np.hypot(a.pos[0] - b.pos[0], a.pos[1] - b.pos[1]),
+                                            a.radius_m + b.radius_m)
+        # red robots on the red side
+        self.assertTrue(all(a.pos[0] > 10 for a in things
+                            if isinstance(a, Robot) and a.unique_id < 10))
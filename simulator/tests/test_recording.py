@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from frc.agent import Robot # pylint: disable=import-error
+from frc.model import RobotFlockers # pylint: disable=import-error
+from frc.recording import Recorder, Recording, ReplayModel # pylint: disable=import-error
+from frc.SimpleContinuousModule import SimpleCanvas # pylint: disable=import-error
+
+class TestRecording(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory() # pylint: disable=consider-using-with
+        self.path = os.path.join(self.directory.name, "match")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_record(self) -> None:
+        model = RobotFlockers(seed=0)
+        robot = next(a for a in model.schedule.agents if isinstance(a, Robot))
+        positions = []
+        with Recorder(model, self.path) as recorder:
+            for _ in range(100):
+                model.step()
+                recorder.record()
+                positions.append(robot.pos)
+        recording = Recording(self.path)
+        self.assertEqual(100, len(recording))
+        self.assertIsInstance(recording.pos, np.memmap)
+        np.testing.assert_almost_equal(0.05 * np.arange(1, 101), recording.time)
+        k = recording.ids.index(robot.unique_id)
+        np.testing.assert_allclose(positions, recording.pos[:, k], rtol=1e-6)
+        # everything is somewhere, on the field or not
+        self.assertEqual(len(recording.ids), recording.on_field.shape[1])
+        self.assertFalse(np.any(np.isnan(recording.velocity)))
+
+    def test_replay(self) -> None:
+        model = RobotFlockers(seed=0)
+        with Recorder(model, self.path) as recorder:
+            for _ in range(60):
+                model.step()
+                recorder.record()
+        replay = ReplayModel(self.path, start=10)
+        self.assertEqual(10, replay.tick)
+        while replay.running:
+            replay.step()
+        self.assertEqual(59, replay.tick)
+        self.assertEqual(sorted(a.unique_id for a in model.schedule.agents),
+                         sorted(a.unique_id for a in replay.schedule.agents))
+        for agent in replay.schedule.agents:
+            original = next(a for a in model.schedule.agents if a.unique_id == agent.unique_id)
+            np.testing.assert_allclose(original.pos, agent.pos, rtol=1e-6)
+        canvas = SimpleCanvas(lambda a: {"Shape": "circle"}, 100, 100)
+        self.assertEqual(len(model.schedule.agents), len(canvas.render(replay)["changes"]))
+        self.assertEqual(model.hub.upper_count,
+                         replay.datacollector.model_vars['upper_hub_count'][-1])
+        replay.seek(0)
+        self.assertAlmostEqual(0.05, replay.model_time)
+        with self.assertRaises(ValueError):
+            replay.seek(60)
+
+    def test_partial(self) -> None:
+        model = RobotFlockers(seed=0)
+        with Recorder(model, self.path) as recorder:
+            recorder.record()
+            recorder.files['pos'].write(b"\0" * 10) # a tick cut off partway
+        self.assertEqual(1, len(Recording(self.path)))
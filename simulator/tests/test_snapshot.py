@@ -0,0 +1,71 @@
+import unittest
+from typing import List, Tuple
+import numpy as np
+
+from frc.agent import Robot # pylint: disable=import-error
+from frc.model import RobotFlockers # pylint: disable=import-error
+
+State = List[Tuple[int, Tuple[float, float, float], Tuple[float, float, float]]]
+
+def state(model: RobotFlockers) -> State:
+    return sorted((a.unique_id, a.pos, a.velocity) for a in model.schedule.agents)
+
+class TestSnapshot(unittest.TestCase):
+    def test_restore(self) -> None:
+        model = RobotFlockers(seed=0)
+        for _ in range(100):
+            model.step()
+        snapshot = model.snapshot()
+        for _ in range(200):
+            model.step()
+        expected = state(model)
+        counts = (model.hub.upper_count, model.upper_hub.length)
+        self.assertNotEqual(0, counts[1]) # something went in in the meantime
+        model.restore(snapshot)
+        self.assertEqual(100, model.model_steps)
+        self.assertEqual(101, len(model.datacollector.model_vars['time']))
+        for _ in range(200):
+            model.step()
+        self.assertEqual(expected, state(model))
+        self.assertEqual(counts, (model.hub.upper_count, model.upper_hub.length))
+        self.assertEqual(301, len(model.datacollector.model_vars['time']))
+
+    def test_fork(self) -> None:
+        model = RobotFlockers(seed=1)
+        for _ in range(100):
+            model.step()
+        snapshot = model.snapshot()
+        branches = [model.fork(snapshot), model.fork(snapshot)]
+        for _ in range(100): # interleaved, each with its own noise
+            for branch in branches:
+                branch.step()
+        self.assertEqual(state(branches[0]), state(branches[1]))
+        # the original is where it was, with its own agents
+        self.assertEqual(100, model.model_steps)
+        self.assertFalse(set(model.schedule.agents) & set(branches[0].schedule.agents))
+        # and goes on the same way
+        for _ in range(100):
+            model.step()
+        self.assertEqual(state(model), state(branches[0]))
+
+    def test_what_if(self) -> None:
+        model = RobotFlockers(seed=2)
+        for _ in range(20):
+            model.step()
+        snapshot = model.snapshot()
+        stopped = model.fork(snapshot)
+        robot = next(a for a in stopped.schedule.agents if isinstance(a, Robot))
+        robot.velocity = (0, 0, 0)
+        stopped.step()
+        model.step()
+        self.assertNotEqual(state(model), state(stopped))
+
+    def test_shared(self) -> None:
+        model = RobotFlockers(seed=0)
+        snapshot = model.snapshot()
+        self.assertEqual(len(model.schedule.agents), len(snapshot.ids))
+        with self.assertRaises(ValueError):
+            snapshot.pos[0, 0] = 1
+        with self.assertRaises(ValueError):
+            RobotFlockers(seed=0).restore(snapshot)
+        np.testing.assert_equal(snapshot.on_field, True)
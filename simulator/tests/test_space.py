@@ -340,5 +340,199 @@ class TestLimitlessSpace(unittest.TestCase):
         for pos in OUTSIDE_POSITIONS:
             self.space.move_agent(a, pos)
 
+class TestVerletLists(unittest.TestCase):
+    """
+    The cached neighbor lists give the same answers as a fresh scan.
+    """
+
+    def check(self, space: LimitlessContinuous3dSpace, agents: Any, radius: float) -> None:
+        for a in agents:
+            if a.pos is None:
+                continue
+            expected = [x for x in space.get_neighbors(a.pos, radius, False) if x is not a]
+            self.assertEqual(set(expected), set(space.get_agent_neighbors(a, radius)))
+
+    def test_same_as_scan(self) -> None:
+        rng = np.random.default_rng(0)
+        space = LimitlessContinuous3dSpace(skin_m=0.5, loose_limit=4)
+        agents = [MockAgent(i, None) for i in range(50)]
+        for a in agents[:40]: # the rest come later
+            space.place_agent(a, (rng.uniform(0, 10), rng.uniform(0, 5), 0))
+        for step in range(100):
+            for a in agents:
+                if a.pos is None:
+                    continue
+                # mostly slow, sometimes fast
+                scale = 0.5 if rng.uniform() < 0.02 else 0.03
+                x, y, z = a.pos
+                space.move_agent(a, (x + rng.normal(0, scale), y + rng.normal(0, scale), z))
+            if step % 10 == 0:
+                k = step // 10
+                space.remove_agent(agents[k])
+                space.place_agent(agents[40 + k], (rng.uniform(0, 10), rng.uniform(0, 5), 0))
+                # out and back in somewhere else
+                space.remove_agent(agents[20 + k])
+                space.place_agent(agents[20 + k], (rng.uniform(0, 10), rng.uniform(0, 5), 0))
+            self.check(space, agents, 1.0)
+        self.assertLess(0, space.hits)
+        self.assertLess(0, space.rebuilds)
+        self.assertLess(space.builds, space.hits)
+
+    def test_counters(self) -> None:
+        space = LimitlessContinuous3dSpace(skin_m=0.5)
+        a = MockAgent(0, None)
+        b = MockAgent(1, None)
+        space.place_agent(a, (0, 0, 0))
+        space.place_agent(b, (0.9, 0, 0))
+        self.assertEqual([b], space.get_agent_neighbors(a, 1))
+        self.assertEqual((0, 1, 0), (space.hits, space.builds, space.rebuilds))
+        space.move_agent(b, (1.1, 0, 0)) # within half the skin
+        self.assertEqual([], space.get_agent_neighbors(a, 1))
+        self.assertEqual((1, 1, 0), (space.hits, space.builds, space.rebuilds))
+        space.move_agent(b, (0.5, 0, 0)) # too far, checked separately
+        self.assertEqual([b], space.get_agent_neighbors(a, 1))
+        space.remove_agent(b)
+        self.assertEqual([], space.get_agent_neighbors(a, 1))
+        self.assertEqual(3, space.hits)
+
+class ExtentAgent(MockAgent):
+    def __init__(self, unique_id: int, height: float) -> None:
+        super().__init__(unique_id, None)
+        self.height = height
+
+    @property
+    def z_extent_m(self) -> Any:
+        return (self.pos[2], self.pos[2] + self.height)
+
+class TestVerticalExtent(unittest.TestCase):
+    def setUp(self) -> None:
+        self.space = LimitlessContinuous3dSpace()
+        self.post = ExtentAgent(0, 0.5)
+        self.low = ExtentAgent(1, 0.24)
+        self.high = ExtentAgent(2, 0.24)
+        self.space.place_agent(self.post, (0, 0, 0))
+        self.space.place_agent(self.low, (0.3, 0, 0))
+        self.space.place_agent(self.high, (0, 0.3, 2))
+
+    def test_z_range(self) -> None:
+        self.assertEqual(3, len(self.space.get_neighbors((0, 0, 0), 1)))
+        self.assertEqual([self.post, self.low], self.space.get_neighbors((0, 0, 0), 1, True, (0, 1)))
+        self.assertEqual([self.high], self.space.get_neighbors((0, 0, 0), 1, True, (1, 3)))
+
+    def test_agent_neighbors(self) -> None:
+        self.assertEqual([self.low], self.space.get_agent_neighbors(self.post, 1))
+        self.assertEqual([], self.space.get_agent_neighbors(self.high, 1))
+        self.space.move_agent(self.high, (0, 0.3, 0.1)) # coming down
+        self.assertEqual([self.post, self.high], self.space.get_agent_neighbors(self.low, 1))
+        self.assertEqual(0.1, self.space._agent_points[2, 2]) # z is kept
+
+class RoundAgent(ExtentAgent):
+    def __init__(self, unique_id: int, radius_m: float, alliance: Any = None) -> None:
+        super().__init__(unique_id, 2 * radius_m)
+        self.radius_m = radius_m
+        self.alliance = alliance
+
+class TestGridQueries(unittest.TestCase):
+    def setUp(self) -> None:
+        self.space = LimitlessContinuous3dSpace()
+        self.near = RoundAgent(0, 0.12, 'red')
+        self.far = RoundAgent(1, 0.12, 'blue')
+        self.high = RoundAgent(2, 0.12, 'red')
+        self.post = ExtentAgent(3, 1.0)
+        self.space.place_agent(self.near, (1, 0, 0))
+        self.space.place_agent(self.far, (5.5, 0.5, 0))
+        self.space.place_agent(self.high, (2, 0, 1.5))
+        self.space.place_agent(self.post, (3, 0.05, 0))
+
+    def test_nearest(self) -> None:
+        self.assertEqual([self.near, self.high], self.space.get_nearest((0, 0, 0), 2))
+        self.assertEqual([self.far], self.space.get_nearest((0, 0, 0), 1, alliance='blue'))
+        self.assertEqual([self.near, self.high, self.far],
+                         self.space.get_nearest((0, 0, 0), 5, kind=RoundAgent))
+        self.assertEqual([self.near, self.far],
+                         self.space.get_nearest((0, 0, 0), 5, RoundAgent, z_range=(0, 0.5)))
+        self.assertEqual([self.high], self.space.get_nearest((1, 0, 0), 1, exclude=self.near))
+        self.assertEqual([], self.space.get_nearest((0, 0, 0), 1, alliance='blue', max_radius=5))
+        # follows moves and removals
+        self.space.move_agent(self.far, (0.5, 0, 0))
+        self.assertEqual([self.far], self.space.get_nearest((0, 0, 0)))
+        self.space.remove_agent(self.far)
+        self.assertEqual([self.near], self.space.get_nearest((0, 0, 0)))
+
+    def test_nearest_far_away(self) -> None:
+        lonely = RoundAgent(4, 0.12)
+        self.space.place_agent(lonely, (40, -30, 0))
+        self.assertEqual([lonely], self.space.get_nearest((45, -35, 0)))
+        self.assertEqual([lonely, self.far], self.space.get_nearest((20, -20, 0), 2, RoundAgent))
+
+    def test_intersecting(self) -> None:
+        # along the x axis at ground level: hits the near one, the post, and the far one
+        # with some padding, but goes under the high one
+        hits = self.space.get_intersecting((0, 0, 0.1), (6, 0, 0.1), pad_m=0.4)
+        self.assertEqual([self.near, self.post, self.far], hits)
+        self.assertEqual([self.near], self.space.get_intersecting((0, 0, 0.1), (6, 0, 0.1)))
+        self.assertEqual([self.near, self.far],
+                         self.space.get_intersecting((0, 0, 0.1), (6, 0, 0.1), 0.4, RoundAgent))
+        # climbing, over the near one and into the high one
+        self.assertEqual([self.high], self.space.get_intersecting((0, 0, 0.5), (2, 0, 1.6)))
+        self.assertEqual([self.near, self.high],
+                         self.space.get_intersecting((1, 0, 0.1), (2, 0, 1.6)))
+        self.assertEqual([self.high],
+                         self.space.get_intersecting((1, 0, 0.1), (2, 0, 1.6), exclude=self.near))
+        self.assertEqual([], self.space.get_intersecting((0, 1, 0), (6, 1, 0)))
+
+class OtherRoundAgent(RoundAgent):
+    pass
+
+class TestPartitions(unittest.TestCase):
+    def setUp(self) -> None:
+        self.space = LimitlessContinuous3dSpace()
+        self.red = [RoundAgent(i, 0.12, 'red') for i in range(3)]
+        self.blue = RoundAgent(3, 0.12, 'blue')
+        self.other = OtherRoundAgent(4, 0.5)
+        for i, a in enumerate(self.red):
+            self.space.place_agent(a, (i * 0.3, 0, 0))
+        self.space.place_agent(self.blue, (0, 0.3, 0))
+        self.space.place_agent(self.other, (0.3, 0.3, 0))
+
+    def test_partitions(self) -> None:
+        self.assertEqual(3, len(self.space.partitions()))
+        self.assertEqual(3, len(self.space.partitions(RoundAgent))) # subclasses too, like isinstance
+        self.assertEqual(1, len(self.space.partitions(OtherRoundAgent)))
+        self.assertEqual(1, len(self.space.partitions(RoundAgent, 'red')))
+        self.assertEqual(0, len(self.space.partitions(OtherRoundAgent, 'red')))
+
+    def test_neighbors(self) -> None:
+        everything = self.space.get_neighbors((0, 0, 0), 1)
+        self.assertEqual(5, len(everything))
+        self.assertEqual(self.red, self.space.get_neighbors((0, 0, 0), 1, alliance='red'))
+        self.assertEqual([self.other], self.space.get_neighbors((0, 0, 0), 1,
+                                                                kind=OtherRoundAgent))
+        self.assertEqual(self.red[1:], self.space.get_neighbors((0, 0, 0), 1, False,
+                                                                 kind=RoundAgent, alliance='red'))
+        self.assertEqual(4, len(self.space.get_agent_neighbors(self.red[0], 1)))
+        self.assertEqual([self.blue],
+                         self.space.get_agent_neighbors(self.red[0], 1, alliance='blue'))
+        self.assertEqual([self.other],
+                         self.space.get_agent_neighbors(self.red[0], 1, OtherRoundAgent))
+        self.assertEqual([self.red[1], self.red[2]],
+                         self.space.get_agent_neighbors(self.red[0], 1, RoundAgent, 'red'))
+
+    def test_remove(self) -> None:
+        # the last one fills the hole
+        self.space.remove_agent(self.red[0])
+        partition = self.space.partitions(RoundAgent, 'red')[0]
+        self.assertEqual([self.red[2], self.red[1]], partition.agents)
+        np.testing.assert_almost_equal((0.6, 0, 0), partition.points[0])
+        self.space.move_agent(self.red[1], (5, 5, 0))
+        self.assertEqual([self.red[2]], self.space.get_neighbors((0, 0, 0), 1, alliance='red'))
+        self.assertEqual([self.red[1]], self.space.get_nearest((4, 4, 0), 1, alliance='red'))
+        # and it can grow past the room it started with
+        for i in range(20):
+            self.space.place_agent(RoundAgent(10 + i, 0.12, 'red'), (i, 1, 0))
+        self.assertEqual(22, len(partition.agents))
+        self.assertEqual(23, len(self.space.get_neighbors((0, 0, 0), 100, alliance='red'))
+                         + len(self.space.get_neighbors((0, 0, 0), 100, alliance='blue')))
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+import numpy as np
+
+from frc.agent import Obstacle # pylint: disable=import-error
+from frc.model import RobotFlockers # pylint: disable=import-error
+from frc.template import TEMPLATES # pylint: disable=import-error
+
+class Empty(RobotFlockers):
+    # override
+    def make_obstacles(self) -> None:
+        self.place_obstacle(300, (8, 4, 0), 0.5, 1)
+
+class TestTemplate(unittest.TestCase):
+    def play(self) -> RobotFlockers:
+        m = RobotFlockers(seed=2)
+        for _ in range(50):
+            m.step()
+        return m
+
+    def test_same(self) -> None:
+        TEMPLATES.clear()
+        a = self.play() # makes the template
+        b = self.play() # uses it
+        self.assertIn(RobotFlockers, TEMPLATES)
+        for x, y in zip(a.schedule.agents, b.schedule.agents):
+            self.assertEqual(x.unique_id, y.unique_id)
+            np.testing.assert_almost_equal(x.pos, y.pos)
+        np.testing.assert_array_equal(a.space._agent_points, # pylint: disable=protected-access
+                                      b.space._agent_points) # pylint: disable=protected-access
+        # each model has its own obstacles
+        for x, y in zip(a.schedule.agents, b.schedule.agents):
+            if isinstance(x, Obstacle):
+                self.assertIsNot(x, y)
+                self.assertIs(b, y.model)
+                self.assertIsNot(x._pos, y._pos) # pylint: disable=protected-access
+
+    def test_subclass(self) -> None:
+        RobotFlockers()
+        for _ in range(2):
+            m = Empty()
+            obstacles = [a for a in m.schedule.agents if isinstance(a, Obstacle)]
+            self.assertEqual([300], [a.unique_id for a in obstacles])
+            self.assertEqual(obstacles, m.space.get_neighbors((8, 4, 0), 0.1, kind=Obstacle))